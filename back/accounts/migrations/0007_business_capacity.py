@@ -0,0 +1,24 @@
+# Generated by Django 5.1.5 on 2026-10-16 23:26
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_alter_user_email_alter_user_first_name_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='businessprofile',
+            name='booking_capacity',
+            field=models.PositiveSmallIntegerField(default=1, help_text='Bookings that can run in parallel (chairs, bays, staff)', validators=[django.core.validators.MinValueValidator(1)]),
+        ),
+        migrations.AddField(
+            model_name='businessprofile',
+            name='slot_interval',
+            field=models.PositiveSmallIntegerField(default=30, help_text='Slot granularity in minutes', validators=[django.core.validators.MinValueValidator(5), django.core.validators.MaxValueValidator(240)]),
+        ),
+    ]
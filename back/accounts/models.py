@@ -1,7 +1,7 @@
 # accounts/models.py
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.db import models
-from django.core.validators import RegexValidator
+from django.core.validators import MaxValueValidator, MinValueValidator, RegexValidator
 
 class UserManager(BaseUserManager):
     """Custom user manager for email-based authentication"""
@@ -148,6 +148,14 @@ class BusinessProfile(models.Model):
     working_hours = models.JSONField(default=dict)
     images = models.JSONField(default=list)
     rating = models.DecimalField(max_digits=3, decimal_places=2, default=0.00)
+    booking_capacity = models.PositiveSmallIntegerField(
+        default=1, validators=[MinValueValidator(1)],
+        help_text="Bookings that can run in parallel (chairs, bays, staff)"
+    )
+    slot_interval = models.PositiveSmallIntegerField(
+        default=30, validators=[MinValueValidator(5), MaxValueValidator(240)],
+        help_text="Slot granularity in minutes"
+    )
     is_active = models.BooleanField(default=True)
     qr_code = models.ImageField(upload_to='qr_codes/', blank=True)
     
@@ -1,7 +1,7 @@
 from django.contrib.auth.models import Permission
 from django.contrib.contenttypes.models import ContentType
-from django.core.cache import cache
 from enum import Enum
+from base.cache_manager import CacheManager
 import logging
 
 logger = logging.getLogger(__name__)
@@ -134,8 +134,10 @@ class RoleManager:
             return False
         
         # Cache key for permission check
-        cache_key = f'permission_{user.id}_{resource.value}_{action.value}'
-        cached_result = cache.get(cache_key)
+        cache_key = CacheManager.generate_key(
+            CacheManager.PREFIXES['permission'], user.id, f'{resource.value}:{action.value}'
+        )
+        cached_result = CacheManager.get_local(cache_key)
         if cached_result is not None:
             return cached_result
         
@@ -155,7 +157,7 @@ class RoleManager:
             )
         
         # Cache result for 5 minutes
-        cache.set(cache_key, has_basic_permission, 300)
+        CacheManager.set(cache_key, has_basic_permission, 'short')
         return has_basic_permission
     
     @classmethod
@@ -186,8 +188,8 @@ class RoleManager:
         if not user or not user.is_authenticated:
             return {}
         
-        cache_key = f'user_permissions_{user.id}'
-        cached_permissions = cache.get(cache_key)
+        cache_key = CacheManager.generate_key(CacheManager.PREFIXES['permission'], user.id, 'all')
+        cached_permissions = CacheManager.get_local(cache_key)
         if cached_permissions:
             return cached_permissions
         
@@ -199,8 +201,8 @@ class RoleManager:
         for resource, actions in permissions.items():
             serializable_permissions[resource.value] = [action.value for action in actions]
         
-        # Cache for 10 minutes
-        cache.set(cache_key, serializable_permissions, 600)
+        # Cache for 5 minutes
+        CacheManager.set(cache_key, serializable_permissions, 'short')
         return serializable_permissions
     
     @classmethod
@@ -258,13 +260,7 @@ class RoleManager:
     @classmethod
     def invalidate_user_cache(cls, user):
         """Invalidate all cached permissions for a user"""
-        cache_patterns = [
-            f'permission_{user.id}_*',
-            f'user_permissions_{user.id}',
-        ]
-        
-        for pattern in cache_patterns:
-            cache.delete(pattern)
+        CacheManager.invalidate_user_cache(user.id)
 
 
 class RolePermissionMixin:
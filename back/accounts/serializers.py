@@ -397,7 +397,7 @@ class BusinessProfileSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'user', 'service_type', 'description', 'description_ar', 
             'address', 'address_ar', 'latitude', 'longitude', 'working_hours', 
-            'images', 'rating', 'is_active', 'qr_code'
+            'images', 'rating', 'booking_capacity', 'slot_interval', 'is_active', 'qr_code'
         ]
         read_only_fields = ['id', 'rating', 'qr_code']
 
@@ -431,7 +431,8 @@ class BusinessProfileCreateSerializer(serializers.ModelSerializer):
         model = BusinessProfile
         fields = [
             'service_type', 'description', 'description_ar', 'address', 'address_ar',
-            'latitude', 'longitude', 'working_hours', 'images'
+            'latitude', 'longitude', 'working_hours', 'images',
+            'booking_capacity', 'slot_interval'
         ]
         extra_kwargs = {
             'description_ar': {'required': False},
@@ -1,7 +1,7 @@
 from django.utils import timezone
-from django.core.cache import cache
 from datetime import datetime, timedelta
 from .models import User, Subscription
+from base.cache_manager import CacheManager
 import logging
 
 logger = logging.getLogger(__name__)
@@ -44,8 +44,8 @@ class SubscriptionManager:
     @classmethod
     def get_active_subscription(cls, user: User) -> dict:
         """Get user's active subscription with caching"""
-        cache_key = f'subscription_{user.id}'
-        cached_subscription = cache.get(cache_key)
+        cache_key = cls._cache_key(user)
+        cached_subscription = CacheManager.get_local(cache_key)
         
         if cached_subscription:
             return cached_subscription
@@ -82,7 +82,7 @@ class SubscriptionManager:
                 }
             
             # Cache for 1 hour
-            cache.set(cache_key, subscription_data, 3600)
+            CacheManager.set(cache_key, subscription_data, 'long')
             return subscription_data
             
         except Exception as e:
@@ -264,8 +264,11 @@ class SubscriptionManager:
     @classmethod
     def invalidate_cache(cls, user: User):
         """Invalidate subscription cache for user"""
-        cache_key = f'subscription_{user.id}'
-        cache.delete(cache_key)
+        CacheManager.delete(cls._cache_key(user))
+    
+    @classmethod
+    def _cache_key(cls, user: User) -> str:
+        return CacheManager.generate_key(CacheManager.PREFIXES['subscription'], user.id, 'active')
 
 
 class SubscriptionEnforcementMixin:
@@ -1,5 +1,8 @@
 from django.contrib import admin
-from .models import Service, Customer, Booking, Review, BusinessHours, Notification
+from .models import (
+    Service, Customer, Booking, BookingSeries, WaitlistEntry, Review, BusinessHours,
+    BusinessHoursException, Notification, OutboxMessage
+)
 
 
 @admin.register(Service)
@@ -26,7 +29,7 @@ class BookingAdmin(admin.ModelAdmin):
     readonly_fields = ('booking_id', 'qr_code', 'created_at', 'updated_at')
     
     fieldsets = (
-        ('Booking Info', {'fields': ('booking_id', 'business', 'service', 'customer')}),
+        ('Booking Info', {'fields': ('booking_id', 'business', 'service', 'customer', 'series')}),
         ('Appointment', {'fields': ('appointment_date', 'appointment_time', 'status', 'booking_method')}),
         ('Payment', {'fields': ('total_price',)}),
         ('Additional Info', {'fields': ('notes', 'reminder_sent', 'qr_code')}),
@@ -34,6 +37,22 @@ class BookingAdmin(admin.ModelAdmin):
     )
 
 
+@admin.register(BookingSeries)
+class BookingSeriesAdmin(admin.ModelAdmin):
+    list_display = ('series_id', 'business', 'customer', 'service', 'frequency', 'start_date', 'occurrences')
+    list_filter = ('frequency', 'created_at')
+    search_fields = ('series_id', 'customer__name', 'customer__phone_number', 'business__user__business_name')
+    readonly_fields = ('series_id', 'created_at')
+
+
+@admin.register(WaitlistEntry)
+class WaitlistEntryAdmin(admin.ModelAdmin):
+    list_display = ('waitlist_id', 'business', 'customer', 'service', 'date', 'window_start', 'window_end', 'status')
+    list_filter = ('status', 'date')
+    search_fields = ('waitlist_id', 'customer__name', 'customer__phone_number', 'business__user__business_name')
+    readonly_fields = ('waitlist_id', 'hold_token', 'offered_time', 'offer_expires_at', 'booking', 'created_at')
+
+
 @admin.register(Review)
 class ReviewAdmin(admin.ModelAdmin):
     list_display = ('booking', 'rating', 'created_at')
@@ -49,9 +68,24 @@ class BusinessHoursAdmin(admin.ModelAdmin):
     search_fields = ('business__user__business_name',)
 
 
+@admin.register(BusinessHoursException)
+class BusinessHoursExceptionAdmin(admin.ModelAdmin):
+    list_display = ('business', 'start_date', 'end_date', 'open_time', 'close_time', 'is_closed', 'reason')
+    list_filter = ('is_closed', 'start_date')
+    search_fields = ('business__user__business_name', 'reason')
+
+
 @admin.register(Notification)
 class NotificationAdmin(admin.ModelAdmin):
     list_display = ('user', 'customer', 'notification_type', 'title', 'is_read', 'created_at')
     list_filter = ('notification_type', 'is_read', 'sent_via_whatsapp', 'created_at')
     search_fields = ('title', 'message', 'user__phone_number', 'customer__name')
     readonly_fields = ('created_at',)
+
+
+@admin.register(OutboxMessage)
+class OutboxMessageAdmin(admin.ModelAdmin):
+    list_display = ('dedup_key', 'status', 'attempts', 'available_at', 'created_at', 'sent_at')
+    list_filter = ('status', 'created_at')
+    search_fields = ('dedup_key', 'last_error')
+    readonly_fields = ('created_at', 'sent_at')
@@ -1,17 +1,33 @@
 from django.utils import timezone
 from django.db import transaction
+from django.db.models import F, Q
 from django.core.exceptions import ValidationError
 from datetime import datetime, timedelta
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
+from collections import deque
 import uuid
 import logging
 
+from .cache_manager import BookingLookupCacheManager, OccupancyCacheManager, SlotHoldCacheManager
+from .daily_stats_manager import DailyStatsManager
+from .schedule import BusinessSchedule
+
 logger = logging.getLogger(__name__)
 
 
 class BookingManager:
     """Manage customer bookings without registration requirement"""
     
+    # Booking statuses that occupy a time slot
+    ACTIVE_STATUSES = ['pending', 'confirmed', 'in_progress']
+    
+    # Step between generated slots (in minutes)
+    SLOT_INTERVAL_MINUTES = 30
+    
+    # Longest window served by a single availability range request (in days)
+    MAX_RANGE_DAYS = 31
+    MAX_SERIES_OCCURRENCES = 52
+    
     @classmethod
     def create_anonymous_booking(cls, booking_data: Dict) -> Dict:
         """
@@ -72,20 +88,7 @@ class BookingManager:
                 
                 # Parse and validate appointment date/time
                 try:
-                    if isinstance(booking_data['appointment_date'], str):
-                        appointment_date = datetime.strptime(
-                            booking_data['appointment_date'], '%Y-%m-%d'
-                        ).date()
-                    else:
-                        appointment_date = booking_data['appointment_date']
-                    
-                    if isinstance(booking_data['appointment_time'], str):
-                        appointment_time = datetime.strptime(
-                            booking_data['appointment_time'], '%H:%M'
-                        ).time()
-                    else:
-                        appointment_time = booking_data['appointment_time']
-                        
+                    appointment_date, appointment_time = cls._parse_appointment(booking_data)
                 except ValueError:
                     return {
                         'success': False,
@@ -94,7 +97,9 @@ class BookingManager:
                     }
                 
                 # Validate appointment is in the future
-                appointment_datetime = datetime.combine(appointment_date, appointment_time)
+                appointment_datetime = timezone.make_aware(
+                    datetime.combine(appointment_date, appointment_time)
+                )
                 if appointment_datetime <= timezone.now():
                     return {
                         'success': False,
@@ -113,9 +118,12 @@ class BookingManager:
                         'error_code': 'NOT_AVAILABLE'
                     }
                 
-                # Check for conflicts
+                # Serialize bookers for this business and day, then check for
+                # conflicts against the database rather than the cached index
+                cls._lock_business_day(business, appointment_date)
                 conflict_check = cls._check_booking_conflicts(
-                    business, service, appointment_date, appointment_time
+                    business, service, appointment_date, appointment_time,
+                    use_cache=False
                 )
                 if conflict_check['has_conflict']:
                     return {
@@ -124,6 +132,16 @@ class BookingManager:
                         'error_code': 'TIME_CONFLICT'
                     }
                 
+                # Respect slot holds taken by other customers
+                hold_token = booking_data.get('hold_token')
+                if cls._is_held_by_others(business, service, appointment_date, appointment_time,
+                                          hold_token, occupied=conflict_check['occupied']):
+                    return {
+                        'success': False,
+                        'error': 'Time slot is temporarily held by another customer',
+                        'error_code': 'TIME_CONFLICT'
+                    }
+                
                 # Get or create customer
                 customer, created = Customer.objects.get_or_create(
                     phone_number=phone,
@@ -146,6 +164,15 @@ class BookingManager:
                     status='pending'
                 )
                 
+                # Consume the customer's hold once the booking is committed
+                if hold_token:
+                    from .models import WaitlistEntry
+                    
+                    WaitlistEntry.objects.filter(
+                        hold_token=hold_token, status='waiting'
+                    ).update(status='booked', booking=booking)
+                    transaction.on_commit(lambda: SlotHoldCacheManager.release(hold_token))
+                
                 # Send confirmation notifications
                 cls._send_booking_notifications(booking)
                 
@@ -173,9 +200,370 @@ class BookingManager:
                 'error_code': 'CREATION_ERROR'
             }
     
+    @classmethod
+    def create_booking_series(cls, series_data: Dict) -> Dict:
+        """
+        Create a recurring booking series for a customer
+        
+        Every occurrence is validated against business hours and existing
+        bookings with one query for the whole date range, inserted with a
+        single bulk insert and confirmed with one summary notification.
+        
+        Args:
+            series_data: Booking fields plus ``frequency`` and ``occurrences``.
+                With ``skip_conflicts`` unavailable dates are left out instead
+                of rejecting the whole series.
+            
+        Returns:
+            Dictionary with series result and created and skipped dates
+        """
+        try:
+            with transaction.atomic():
+                required_fields = [
+                    'business_id', 'service_id', 'customer_name', 'customer_phone',
+                    'appointment_date', 'appointment_time', 'occurrences'
+                ]
+                
+                for field in required_fields:
+                    if field not in series_data or not series_data[field]:
+                        return {
+                            'success': False,
+                            'error': f'Missing required field: {field}',
+                            'error_code': 'MISSING_FIELD'
+                        }
+                
+                from .models import Service, Customer, Booking, BookingSeries
+                from accounts.models import BusinessProfile
+                
+                try:
+                    business = BusinessProfile.objects.select_related('user').get(
+                        id=series_data['business_id'],
+                        is_active=True
+                    )
+                    service = Service.objects.get(
+                        id=series_data['service_id'],
+                        business=business,
+                        is_active=True
+                    )
+                except (BusinessProfile.DoesNotExist, Service.DoesNotExist):
+                    return {
+                        'success': False,
+                        'error': 'Business or service not found',
+                        'error_code': 'NOT_FOUND'
+                    }
+                
+                phone = series_data['customer_phone'].strip()
+                if not phone.startswith('+966') or len(phone) != 13:
+                    return {
+                        'success': False,
+                        'error': 'Invalid phone number format. Use +966xxxxxxxxx',
+                        'error_code': 'INVALID_PHONE'
+                    }
+                
+                try:
+                    appointment_date, appointment_time = cls._parse_appointment(series_data)
+                    occurrences = int(series_data['occurrences'])
+                except ValueError:
+                    return {
+                        'success': False,
+                        'error': 'Invalid date, time or occurrence count',
+                        'error_code': 'INVALID_DATETIME'
+                    }
+                
+                frequency = series_data.get('frequency', 'weekly')
+                if frequency not in BookingSeries.FREQUENCY_DAYS:
+                    return {
+                        'success': False,
+                        'error': f'Invalid frequency: {frequency}',
+                        'error_code': 'INVALID_FREQUENCY'
+                    }
+                
+                if not 1 <= occurrences <= cls.MAX_SERIES_OCCURRENCES:
+                    return {
+                        'success': False,
+                        'error': f'Occurrences must be between 1 and {cls.MAX_SERIES_OCCURRENCES}',
+                        'error_code': 'INVALID_OCCURRENCES'
+                    }
+                
+                appointment_datetime = timezone.make_aware(
+                    datetime.combine(appointment_date, appointment_time)
+                )
+                if appointment_datetime <= timezone.now():
+                    return {
+                        'success': False,
+                        'error': 'Appointment must be in the future',
+                        'error_code': 'PAST_APPOINTMENT'
+                    }
+                
+                series = BookingSeries(
+                    business=business,
+                    service=service,
+                    frequency=frequency,
+                    start_date=appointment_date,
+                    appointment_time=appointment_time,
+                    occurrences=occurrences,
+                    notes=series_data.get('notes', '')
+                )
+                dates = series.occurrence_dates()
+                
+                # Validate every occurrence against one load of hours and bookings
+                schedule = BusinessSchedule.for_business(business.id)
+                cls._lock_business_days(business, dates)
+                occupancy = cls._load_occupancy(business, dates[0], dates[-1])
+                
+                start = cls._to_minutes(appointment_time)
+                end = start + cls._duration_minutes(service.duration)
+                capacity = business.booking_capacity
+                buckets = SlotHoldCacheManager.buckets_for(start, end)
+                held = SlotHoldCacheManager.get_held_buckets(
+                    business.id, {date: buckets for date in dates}, seats=capacity
+                )
+                
+                available_dates, unavailable = [], []
+                for date in dates:
+                    check = cls._hours_allow(schedule.hours_for(date), appointment_time)
+                    if check['available']:
+                        booked = [(s, e) for s, e, _ in occupancy.get(date, [])]
+                        conflict = cls._find_conflict(booked, start, end, capacity)
+                        if conflict['has_conflict']:
+                            check = {'available': False, 'reason': conflict['reason']}
+                        elif cls._find_conflict(
+                            booked + cls._held_intervals(held.get(date, {})), start, end, capacity
+                        )['has_conflict']:
+                            check = {
+                                'available': False,
+                                'reason': 'Time slot is temporarily held by another customer'
+                            }
+                    
+                    if check['available']:
+                        available_dates.append(date)
+                    else:
+                        unavailable.append({
+                            'date': date.strftime('%Y-%m-%d'),
+                            'reason': check['reason']
+                        })
+                
+                if not available_dates or (unavailable and not series_data.get('skip_conflicts')):
+                    return {
+                        'success': False,
+                        'error': 'Some occurrences are not available',
+                        'error_code': 'TIME_CONFLICT',
+                        'unavailable': unavailable
+                    }
+                
+                customer, created = Customer.objects.get_or_create(
+                    phone_number=phone,
+                    name=series_data['customer_name'].strip(),
+                    defaults={
+                        'email': series_data.get('customer_email', '').strip()
+                    }
+                )
+                series.customer = customer
+                series.save()
+                
+                bookings = []
+                for date in available_dates:
+                    appointment_start, appointment_end = Booking.compute_span(
+                        date, appointment_time, service.duration
+                    )
+                    bookings.append(Booking(
+                        business=business,
+                        service=service,
+                        customer=customer,
+                        series=series,
+                        appointment_date=date,
+                        appointment_time=appointment_time,
+                        appointment_start=appointment_start,
+                        appointment_end=appointment_end,
+                        total_price=service.price,
+                        notes=series.notes,
+                        booking_method='online',
+                        status='pending'
+                    ))
+                Booking.objects.bulk_create(bookings)
+                
+                # Bulk inserts bypass model signals, so drop the occupancy index
+                transaction.on_commit(lambda: OccupancyCacheManager.invalidate_business(business.id))
+                DailyStatsManager.rebuild_on_commit(business.id, available_dates)
+                
+                cls._send_series_notifications(series, bookings)
+                
+                return {
+                    'success': True,
+                    'series_id': str(series.series_id),
+                    'series': {
+                        'business_name': business.user.business_name,
+                        'service_name': service.name,
+                        'customer_name': customer.name,
+                        'frequency': frequency,
+                        'appointment_time': appointment_time.strftime('%H:%M'),
+                        'total_price': float(service.price) * len(bookings)
+                    },
+                    'bookings': [
+                        {
+                            'booking_id': str(booking.booking_id),
+                            'appointment_date': booking.appointment_date.strftime('%Y-%m-%d')
+                        }
+                        for booking in bookings
+                    ],
+                    'skipped': unavailable
+                }
+                
+        except Exception as e:
+            logger.error(f"Booking series creation failed: {str(e)}")
+            return {
+                'success': False,
+                'error': 'Booking series creation failed. Please try again.',
+                'error_code': 'CREATION_ERROR'
+            }
+    
+    @classmethod
+    def hold_slot(cls, hold_data: Dict, timeout: int = None) -> Dict:
+        """
+        Temporarily reserve a slot while the customer fills in the booking form
+        
+        The returned hold token is passed back as ``hold_token`` when creating
+        the booking. Held slots are hidden from slot listings and rejected
+        for other customers until the hold expires or is released.
+        """
+        timeout = timeout or SlotHoldCacheManager.HOLD_TIMEOUT
+        try:
+            required_fields = ['business_id', 'service_id', 'appointment_date', 'appointment_time']
+            for field in required_fields:
+                if field not in hold_data or not hold_data[field]:
+                    return {
+                        'success': False,
+                        'error': f'Missing required field: {field}',
+                        'error_code': 'MISSING_FIELD'
+                    }
+            
+            from .models import Service
+            from accounts.models import BusinessProfile
+            
+            try:
+                business = BusinessProfile.objects.get(id=hold_data['business_id'], is_active=True)
+                service = Service.objects.get(
+                    id=hold_data['service_id'], business=business, is_active=True
+                )
+                appointment_date, appointment_time = cls._parse_appointment(hold_data)
+            except (BusinessProfile.DoesNotExist, Service.DoesNotExist, ValueError):
+                return {
+                    'success': False,
+                    'error': 'Invalid business, service, date or time',
+                    'error_code': 'INVALID_REQUEST'
+                }
+            
+            appointment_datetime = timezone.make_aware(
+                datetime.combine(appointment_date, appointment_time)
+            )
+            if appointment_datetime <= timezone.now():
+                return {
+                    'success': False,
+                    'error': 'Appointment must be in the future',
+                    'error_code': 'PAST_APPOINTMENT'
+                }
+            
+            availability_check = cls._check_business_availability(
+                business, appointment_date, appointment_time
+            )
+            if not availability_check['available']:
+                return {
+                    'success': False,
+                    'error': availability_check['reason'],
+                    'error_code': 'NOT_AVAILABLE'
+                }
+            
+            conflict_check = cls._check_booking_conflicts(
+                business, service, appointment_date, appointment_time
+            )
+            if conflict_check['has_conflict']:
+                return {
+                    'success': False,
+                    'error': conflict_check['reason'],
+                    'error_code': 'TIME_CONFLICT'
+                }
+            
+            start = cls._to_minutes(appointment_time)
+            token = SlotHoldCacheManager.acquire(
+                business.id, service.id, appointment_date,
+                start, start + cls._duration_minutes(service.duration),
+                seats=business.booking_capacity - conflict_check['occupied'],
+                timeout=timeout
+            )
+            if not token:
+                return {
+                    'success': False,
+                    'error': 'Time slot is temporarily held by another customer',
+                    'error_code': 'TIME_CONFLICT'
+                }
+            
+            return {
+                'success': True,
+                'hold_token': token,
+                'expires_in': timeout,
+                'appointment_date': appointment_date.strftime('%Y-%m-%d'),
+                'appointment_time': appointment_time.strftime('%H:%M')
+            }
+            
+        except Exception as e:
+            logger.error(f"Slot hold failed: {str(e)}")
+            return {
+                'success': False,
+                'error': 'Failed to hold slot. Please try again.',
+                'error_code': 'HOLD_ERROR'
+            }
+    
+    @classmethod
+    def release_slot_hold(cls, hold_token: str) -> Dict:
+        """Release a slot hold before it expires"""
+        if SlotHoldCacheManager.release(hold_token):
+            return {'success': True, 'message': 'Slot hold released'}
+        return {
+            'success': False,
+            'error': 'Hold not found or already expired',
+            'error_code': 'HOLD_NOT_FOUND'
+        }
+    
+    @classmethod
+    def _is_held_by_others(cls, business, service, date, time, hold_token: Optional[str] = None,
+                           occupied: int = 0) -> bool:
+        """Check whether holds by other customers take the remaining seats of a slot"""
+        start = cls._to_minutes(time)
+        buckets = SlotHoldCacheManager.buckets_for(
+            start, start + cls._duration_minutes(service.duration)
+        )
+        held = SlotHoldCacheManager.get_held_buckets(
+            business.id, {date: buckets}, seats=business.booking_capacity
+        ).get(date, {})
+        held_by_others = max(
+            (sum(token != hold_token for token in tokens) for tokens in held.values()),
+            default=0
+        )
+        return occupied + held_by_others >= business.booking_capacity
+    
     @classmethod
     def get_booking_by_id(cls, booking_id: str) -> Optional[Dict]:
         """Get booking details by booking ID (for customers without accounts)"""
+        lookup = cls.get_booking_lookup(booking_id)
+        return lookup['data'] if lookup else None
+    
+    @classmethod
+    def get_booking_lookup(cls, booking_id: str) -> Optional[Dict]:
+        """
+        Get the cached lookup entry (``data`` and ``etag``) for a booking
+        
+        Repeated lookups are answered from the cache without touching the
+        database; misses run the joined query once and fill the cache.
+        """
+        try:
+            booking_id = str(uuid.UUID(str(booking_id)))
+        except ValueError:
+            return None
+        
+        cached = BookingLookupCacheManager.get(booking_id)
+        if cached:
+            return cached
+        
         try:
             from .models import Booking
             
@@ -183,7 +571,7 @@ class BookingManager:
                 'business__user', 'service', 'customer'
             ).get(booking_id=booking_id)
             
-            return {
+            data = {
                 'id': booking.id,
                 'booking_id': str(booking.booking_id),
                 'business_name': booking.business.user.business_name,
@@ -201,6 +589,14 @@ class BookingManager:
                 'created_at': booking.created_at.isoformat()
             }
             
+            return BookingLookupCacheManager.set(booking_id, data, {
+                'service': booking.service_id,
+                'business': booking.business_id,
+                'customer': booking.customer_id,
+            })
+            
+        except Booking.DoesNotExist:
+            return None
         except Exception as e:
             logger.error(f"Booking lookup failed: {str(e)}")
             return None
@@ -220,10 +616,10 @@ class BookingManager:
             )
             
             # Check if cancellation is allowed (e.g., not too close to appointment)
-            appointment_datetime = datetime.combine(
+            appointment_datetime = timezone.make_aware(datetime.combine(
                 booking.appointment_date, 
                 booking.appointment_time
-            )
+            ))
             
             # Allow cancellation up to 2 hours before appointment
             if appointment_datetime <= timezone.now() + timedelta(hours=2):
@@ -265,12 +661,14 @@ class BookingManager:
     def get_available_slots(cls, business_id: int, service_id: int, date: str) -> Dict:
         """Get available time slots for a specific business, service, and date"""
         try:
-            from .models import Service, Booking, BusinessHours
+            from .models import Service
             from accounts.models import BusinessProfile
             
             # Validate inputs
             try:
-                business = BusinessProfile.objects.get(id=business_id, is_active=True)
+                business = BusinessProfile.objects.select_related('user').get(
+                    id=business_id, is_active=True
+                )
                 service = Service.objects.get(id=service_id, business=business, is_active=True)
                 target_date = datetime.strptime(date, '%Y-%m-%d').date()
             except (BusinessProfile.DoesNotExist, Service.DoesNotExist, ValueError):
@@ -288,25 +686,15 @@ class BookingManager:
                     'available_slots': []
                 }
             
-            # Get business hours for the day
-            day_name = target_date.strftime('%A').lower()
+            # Get business hours for the day (None means default hours)
+            business_hours = BusinessSchedule.for_business(business.id).hours_for(target_date)
             
-            try:
-                business_hours = BusinessHours.objects.get(
-                    business=business,
-                    day=day_name
-                )
-                
-                if business_hours.is_closed:
-                    return {
-                        'success': True,
-                        'message': 'Business is closed on this day',
-                        'available_slots': []
-                    }
-                    
-            except BusinessHours.DoesNotExist:
-                # Default hours if not set
-                business_hours = None
+            if business_hours and business_hours.is_closed:
+                return {
+                    'success': True,
+                    'message': 'Business is closed on this day',
+                    'available_slots': []
+                }
             
             # Generate time slots
             available_slots = cls._generate_time_slots(
@@ -330,123 +718,516 @@ class BookingManager:
             }
     
     @classmethod
-    def _check_business_availability(cls, business, date, time) -> Dict:
-        """Check if business is open at the requested time"""
+    def get_available_slots_range(cls, business_id: int, service_id: int,
+                                  date_from: str, date_to: str) -> Dict:
+        """
+        Get available time slots for every day in a date window
+        
+        Business hours come from the compiled schedule and bookings for the
+        whole window are loaded with one query, so a two-week calendar costs
+        the same as a single day.
+        """
         try:
-            from .models import BusinessHours
-            
-            day_name = date.strftime('%A').lower()
+            from .models import Service
+            from accounts.models import BusinessProfile
             
+            # Validate inputs
             try:
-                hours = BusinessHours.objects.get(business=business, day=day_name)
+                business = BusinessProfile.objects.select_related('user').get(
+                    id=business_id, is_active=True
+                )
+                service = Service.objects.get(id=service_id, business=business, is_active=True)
+                start_date = datetime.strptime(date_from, '%Y-%m-%d').date()
+                end_date = datetime.strptime(date_to, '%Y-%m-%d').date()
+            except (BusinessProfile.DoesNotExist, Service.DoesNotExist, ValueError):
+                return {
+                    'success': False,
+                    'error': 'Invalid business, service, or date range',
+                    'days': []
+                }
+            
+            if start_date > end_date:
+                return {
+                    'success': False,
+                    'error': 'Start date must not be after end date',
+                    'days': []
+                }
+            
+            if (end_date - start_date).days + 1 > cls.MAX_RANGE_DAYS:
+                return {
+                    'success': False,
+                    'error': f'Date range cannot exceed {cls.MAX_RANGE_DAYS} days',
+                    'days': []
+                }
+            
+            # Check if range is in the future
+            if start_date <= timezone.now().date():
+                return {
+                    'success': False,
+                    'error': 'Date must be in the future',
+                    'days': []
+                }
+            
+            schedule = BusinessSchedule.for_business(business.id)
+            intervals_by_date = cls._get_booked_intervals_range(business, start_date, end_date)
+            
+            duration = cls._duration_minutes(service.duration)
+            hold_buckets_by_date = {}
+            current_date = start_date
+            while current_date <= end_date:
+                open_minute, close_minute = cls._day_window(schedule.hours_for(current_date))
+                hold_buckets_by_date[current_date] = SlotHoldCacheManager.buckets_for(
+                    open_minute, close_minute + duration
+                )
+                current_date += timedelta(days=1)
+            held_by_date = SlotHoldCacheManager.get_held_buckets(
+                business.id, hold_buckets_by_date, seats=business.booking_capacity
+            )
+            
+            days = []
+            current_date = start_date
+            while current_date <= end_date:
+                business_hours = schedule.hours_for(current_date)
                 
-                if hours.is_closed:
-                    return {
-                        'available': False,
-                        'reason': 'Business is closed on this day'
-                    }
+                if business_hours and business_hours.is_closed:
+                    days.append({
+                        'date': current_date.strftime('%Y-%m-%d'),
+                        'is_closed': True,
+                        'available_slots': []
+                    })
+                else:
+                    days.append({
+                        'date': current_date.strftime('%Y-%m-%d'),
+                        'is_closed': False,
+                        'available_slots': cls._generate_time_slots(
+                            business, service, current_date, business_hours,
+                            intervals=intervals_by_date.get(current_date, []),
+                            held_buckets=held_by_date.get(current_date, {})
+                        )
+                    })
                 
-                if time < hours.open_time or time > hours.close_time:
-                    return {
-                        'available': False,
-                        'reason': f'Business is closed at {time.strftime("%H:%M")}'
-                    }
-                    
-            except BusinessHours.DoesNotExist:
-                # If no specific hours set, assume open 9 AM to 9 PM
-                if time.hour < 9 or time.hour >= 21:
-                    return {
-                        'available': False,
-                        'reason': 'Outside business hours'
-                    }
+                current_date += timedelta(days=1)
             
-            return {'available': True, 'reason': ''}
+            return {
+                'success': True,
+                'from': start_date.strftime('%Y-%m-%d'),
+                'to': end_date.strftime('%Y-%m-%d'),
+                'business_name': business.user.business_name,
+                'service_name': service.name,
+                'days': days
+            }
+            
+        except Exception as e:
+            logger.error(f"Available slots range lookup failed: {str(e)}")
+            return {
+                'success': False,
+                'error': 'Failed to get available slots',
+                'days': []
+            }
+    
+    @classmethod
+    def warm_availability(cls, business, date_from, date_to) -> int:
+        """
+        Load the compiled schedule and occupancy of a date window into the cache
+        
+        These are everything slot lookups read besides slot holds, so the
+        first customers of the day get cached answers. Returns the number of
+        days with bookings.
+        """
+        BusinessSchedule.for_business(business.id)
+        return len(cls._get_booked_intervals_range(business, date_from, date_to))
+    
+    @classmethod
+    def _check_business_availability(cls, business, date, time) -> Dict:
+        """Check if business is open at the requested time"""
+        try:
+            hours = BusinessSchedule.for_business(business.id).hours_for(date)
+            
+            return cls._hours_allow(hours, time)
             
         except Exception as e:
             logger.error(f"Business availability check failed: {str(e)}")
             return {'available': False, 'reason': 'Unable to check availability'}
     
+    @staticmethod
+    def _hours_allow(hours, time) -> Dict:
+        """Check a time against a day's business hours (None means default hours)"""
+        if hours is None:
+            # If no specific hours set, assume open 9 AM to 9 PM
+            if time.hour < 9 or time.hour >= 21:
+                return {
+                    'available': False,
+                    'reason': 'Outside business hours'
+                }
+            return {'available': True, 'reason': ''}
+        
+        if hours.is_closed:
+            return {
+                'available': False,
+                'reason': 'Business is closed on this day'
+            }
+        
+        if time < hours.open_time or time > hours.close_time:
+            return {
+                'available': False,
+                'reason': f'Business is closed at {time.strftime("%H:%M")}'
+            }
+        
+        return {'available': True, 'reason': ''}
+    
     @classmethod
-    def _check_booking_conflicts(cls, business, service, date, time) -> Dict:
-        """Check for booking conflicts"""
+    def _lock_business_day(cls, business, date):
+        """
+        Take the booking lock row for a business and day
+        
+        The row is created on first use and then updated, which holds a row
+        lock on PostgreSQL and the database write lock on SQLite until the
+        surrounding transaction ends. Concurrent bookers for the same
+        business and day therefore run their conflict check one at a time,
+        while other businesses and days are not blocked. Must be called
+        inside ``transaction.atomic()``.
+        """
+        from .models import BookingSlotLock
+        
+        lock, _ = BookingSlotLock.objects.get_or_create(business=business, date=date)
+        BookingSlotLock.objects.filter(pk=lock.pk).update(version=F('version') + 1)
+    
+    @classmethod
+    def _lock_business_days(cls, business, dates):
+        """Take the booking lock rows for several days at once (see _lock_business_day)"""
+        from .models import BookingSlotLock
+        
+        BookingSlotLock.objects.bulk_create(
+            [BookingSlotLock(business=business, date=date) for date in sorted(set(dates))],
+            ignore_conflicts=True
+        )
+        BookingSlotLock.objects.filter(
+            business=business, date__in=set(dates)
+        ).update(version=F('version') + 1)
+    
+    @classmethod
+    def _check_booking_conflicts(cls, business, service, date, time, use_cache: bool = True) -> Dict:
+        """
+        Check for booking conflicts
+        
+        The cached path answers from the occupancy index. The uncached path
+        is the authoritative check and runs a single indexed query against
+        the stored appointment spans. Both report how many bookings already
+        run in parallel at the busiest point of the slot as ``occupied``.
+        """
         try:
-            from .models import Booking
+            if not use_cache:
+                from .models import Booking
+                
+                start, end = Booking.compute_span(date, time, service.duration)
+                return cls.check_span_conflicts(business, start, end)
             
-            # Check for existing bookings at the same time
-            conflicts = Booking.objects.filter(
-                business=business,
-                appointment_date=date,
-                appointment_time=time,
-                status__in=['pending', 'confirmed', 'in_progress']
-            )
+            intervals = cls._get_booked_intervals(business, date)
+            start = cls._to_minutes(time)
+            end = start + cls._duration_minutes(service.duration)
+            
+            return cls._find_conflict(intervals, start, end, business.booking_capacity)
             
-            if conflicts.exists():
+        except Exception as e:
+            logger.error(f"Conflict check failed: {str(e)}")
+            return {'has_conflict': True, 'reason': 'Unable to check conflicts', 'occupied': 0}
+    
+    @classmethod
+    def check_span_conflicts(cls, business, start, end) -> Dict:
+        """
+        Check a datetime span against stored bookings with a single query
+        
+        Single-capacity businesses only need an EXISTS query. With parallel
+        capacity the overlapping spans are fetched and swept for their peak.
+        """
+        overlapping = cls.overlapping_bookings(business, start, end)
+        
+        if business.booking_capacity <= 1:
+            if overlapping.exists():
                 return {
                     'has_conflict': True,
-                    'reason': 'Time slot is already booked'
+                    'reason': 'Time slot conflicts with another booking',
+                    'occupied': 1
                 }
-            
-            # Check for overlapping bookings based on service duration
-            service_duration = service.duration
-            start_time = datetime.combine(date, time)
-            end_time = start_time + service_duration
-            
-            overlapping_bookings = Booking.objects.filter(
-                business=business,
-                appointment_date=date,
-                status__in=['pending', 'confirmed', 'in_progress']
+            return {'has_conflict': False, 'reason': '', 'occupied': 0}
+        
+        def minutes(value):
+            return int((value - start).total_seconds() // 60)
+        
+        intervals = [
+            (minutes(booking_start), minutes(booking_end))
+            for booking_start, booking_end in overlapping.values_list(
+                'appointment_start', 'appointment_end'
+            )
+        ]
+        return cls._find_conflict(intervals, 0, minutes(end), business.booking_capacity)
+    
+    @classmethod
+    def refresh_appointment_spans(cls, bookings) -> int:
+        """Recompute stored appointment spans after bulk updates that bypass save()"""
+        from .models import Booking
+        
+        updated = []
+        for booking in bookings.select_related('service'):
+            booking.appointment_start, booking.appointment_end = Booking.compute_span(
+                booking.appointment_date, booking.appointment_time, booking.service.duration
+            )
+            updated.append(booking)
+        
+        Booking.objects.bulk_update(updated, ['appointment_start', 'appointment_end'], batch_size=500)
+        return len(updated)
+    
+    @classmethod
+    def overlapping_bookings(cls, business, start, end):
+        """
+        Active bookings of a business overlapping the span [start, end)
+        
+        Bookings starting at exactly ``start`` always count, matching the
+        cached conflict check for zero-length services.
+        """
+        from .models import Booking
+        
+        return Booking.objects.filter(
+            Q(appointment_start__lt=end, appointment_end__gt=start) | Q(appointment_start=start),
+            business=business,
+            status__in=cls.ACTIVE_STATUSES
+        )
+    
+    @classmethod
+    def _get_booked_intervals(cls, business, date) -> List[Tuple[int, int]]:
+        """
+        Get the day's active bookings as a sorted interval list
+        
+        Each interval is a (start, end) pair expressed in minutes from
+        midnight of the given date. Intervals come from the cached occupancy
+        index and fall back to a single query on a miss.
+        """
+        return cls._get_booked_intervals_range(business, date, date).get(date, [])
+    
+    @classmethod
+    def _get_booked_intervals_range(cls, business, date_from, date_to) -> Dict:
+        """Get sorted interval lists for every date in a window"""
+        dates = [
+            date_from + timedelta(days=offset)
+            for offset in range((date_to - date_from).days + 1)
+        ]
+        entries_by_date = OccupancyCacheManager.get_intervals_many(business.id, dates)
+        
+        missing = [date for date in dates if date not in entries_by_date]
+        if missing:
+            loaded = cls._load_occupancy(business, missing[0], missing[-1])
+            rebuilt = {date: loaded.get(date, []) for date in missing}
+            OccupancyCacheManager.set_intervals_many(business.id, rebuilt)
+            entries_by_date.update(rebuilt)
+        
+        return {
+            date: [(start, end) for start, end, _ in entries]
+            for date, entries in entries_by_date.items()
+            if entries
+        }
+    
+    @classmethod
+    def _load_occupancy(cls, business, date_from, date_to) -> Dict:
+        """
+        Load occupancy entries for a window from the database
+        
+        Bookings are fetched in a single query joined with their service
+        duration and returned as sorted [start, end, booking_id] lists keyed
+        by date.
+        """
+        from .models import Booking
+        
+        rows = Booking.objects.filter(
+            business=business,
+            appointment_date__range=[date_from, date_to],
+            status__in=cls.ACTIVE_STATUSES
+        ).order_by('appointment_date', 'appointment_time').values_list(
+            'id', 'appointment_date', 'appointment_time', 'service__duration'
+        )
+        
+        entries_by_date = {}
+        for booking_id, appointment_date, appointment_time, duration in rows:
+            entries_by_date.setdefault(appointment_date, []).append(
+                cls._booking_entry(booking_id, appointment_time, duration)
             )
+        
+        return entries_by_date
+    
+    @classmethod
+    def _booking_entry(cls, booking_id: int, appointment_time, duration) -> List[int]:
+        """Build the occupancy entry for a single booking"""
+        start = cls._to_minutes(appointment_time)
+        return [start, start + cls._duration_minutes(duration), booking_id]
+    
+    @classmethod
+    def _find_conflict(cls, intervals: List[Tuple[int, int]], start: int, end: int,
+                       capacity: int = 1) -> Dict:
+        """Check a candidate interval against an interval list for a given capacity"""
+        end = max(end, start + 1)
+        occupied = max(
+            (count for segment_start, segment_end, count in cls._occupancy_segments(intervals)
+             if segment_start < end and segment_end > start),
+            default=0
+        )
+        
+        if occupied < capacity:
+            return {'has_conflict': False, 'reason': '', 'occupied': occupied}
+        
+        if capacity > 1:
+            reason = 'Time slot is fully booked'
+        elif any(booking_start == start for booking_start, _ in intervals):
+            # A booking starting at the exact same time always conflicts
+            reason = 'Time slot is already booked'
+        else:
+            reason = 'Time slot conflicts with another booking'
+        
+        return {'has_conflict': True, 'reason': reason, 'occupied': occupied}
+    
+    @staticmethod
+    def _occupancy_segments(intervals: List[Tuple[int, int]]) -> List[Tuple[int, int, int]]:
+        """
+        Turn intervals into (start, end, count) segments of parallel bookings
+        
+        A counting sweep over start and end events. Zero-length bookings
+        occupy their start minute so they still block an exact start.
+        """
+        events = []
+        for booking_start, booking_end in intervals:
+            events.append((booking_start, 1))
+            events.append((max(booking_end, booking_start + 1), -1))
+        events.sort()
+        
+        segments = []
+        count = 0
+        for index, (minute, change) in enumerate(events):
+            count += change
+            if count and index + 1 < len(events) and events[index + 1][0] > minute:
+                segments.append((minute, events[index + 1][0], count))
+        return segments
+    
+    @classmethod
+    def _free_slot_starts(cls, intervals: List[Tuple[int, int]], open_minute: int,
+                          close_minute: int, duration: int, step: int = None,
+                          capacity: int = 1) -> List[int]:
+        """
+        Compute free slot start minutes in a single sweep over occupancy segments
+        
+        Candidate slots advance monotonically, so the segments overlapping a
+        candidate form a sliding window. A deque keeps that window's counts
+        in decreasing order, making its front the peak number of parallel
+        bookings; the slot is free while the peak stays below capacity.
+        """
+        step = step or cls.SLOT_INTERVAL_MINUTES
+        segments = cls._occupancy_segments(intervals)
+        window = deque()
+        index = 0
+        free = []
+        
+        slot_start = open_minute
+        while slot_start < close_minute:
+            slot_end = slot_start + max(duration, 1)
             
-            for booking in overlapping_bookings:
-                booking_start = datetime.combine(date, booking.appointment_time)
-                booking_end = booking_start + booking.service.duration
-                
-                # Check for overlap
-                if (start_time < booking_end and end_time > booking_start):
-                    return {
-                        'has_conflict': True,
-                        'reason': 'Time slot conflicts with another booking'
-                    }
+            while index < len(segments) and segments[index][0] < slot_end:
+                while window and window[-1][2] <= segments[index][2]:
+                    window.pop()
+                window.append(segments[index])
+                index += 1
             
-            return {'has_conflict': False, 'reason': ''}
+            while window and window[0][1] <= slot_start:
+                window.popleft()
             
-        except Exception as e:
-            logger.error(f"Conflict check failed: {str(e)}")
-            return {'has_conflict': True, 'reason': 'Unable to check conflicts'}
+            if not window or window[0][2] < capacity:
+                free.append(slot_start)
+            
+            slot_start += step
+        
+        return free
+    
+    @staticmethod
+    def _held_intervals(held_buckets: Dict) -> List[Tuple[int, int]]:
+        """Turn held buckets of a day into one interval per claimed seat"""
+        size = SlotHoldCacheManager.BUCKET_MINUTES
+        return [
+            (bucket * size, (bucket + 1) * size)
+            for bucket, tokens in held_buckets.items()
+            for _ in tokens
+        ]
     
     @classmethod
-    def _generate_time_slots(cls, business, service, date, business_hours) -> list:
+    def _slot_step(cls, business, service) -> int:
+        """Slot granularity in minutes, with the service overriding the business"""
+        return service.slot_interval or business.slot_interval or cls.SLOT_INTERVAL_MINUTES
+    
+    @staticmethod
+    def _parse_appointment(data: Dict) -> Tuple:
+        """Parse appointment date and time from request data (raises ValueError)"""
+        if isinstance(data['appointment_date'], str):
+            appointment_date = datetime.strptime(data['appointment_date'], '%Y-%m-%d').date()
+        else:
+            appointment_date = data['appointment_date']
+        
+        if isinstance(data['appointment_time'], str):
+            appointment_time = datetime.strptime(data['appointment_time'], '%H:%M').time()
+        else:
+            appointment_time = data['appointment_time']
+        
+        return appointment_date, appointment_time
+    
+    @classmethod
+    def _day_window(cls, business_hours) -> Tuple[int, int]:
+        """Opening and closing minute for a day, defaulting to 09:00-21:00"""
+        if business_hours:
+            return cls._to_minutes(business_hours.open_time), cls._to_minutes(business_hours.close_time)
+        return 9 * 60, 21 * 60
+    
+    @staticmethod
+    def _to_minutes(value) -> int:
+        """Convert a time object to minutes from midnight"""
+        return value.hour * 60 + value.minute
+    
+    @staticmethod
+    def _duration_minutes(duration) -> int:
+        """Convert a service duration to whole minutes"""
+        return int(duration.total_seconds() // 60) if duration else 0
+    
+    @classmethod
+    def _generate_time_slots(cls, business, service, date, business_hours,
+                             intervals: Optional[List[Tuple[int, int]]] = None,
+                             held_buckets: Optional[Dict] = None) -> list:
         """Generate available time slots for the day"""
         try:
-            from .models import Booking
+            open_minute, close_minute = cls._day_window(business_hours)
+            duration = cls._duration_minutes(service.duration)
             
-            # Default business hours
-            if business_hours:
-                start_time = business_hours.open_time
-                end_time = business_hours.close_time
-            else:
-                start_time = datetime.strptime('09:00', '%H:%M').time()
-                end_time = datetime.strptime('21:00', '%H:%M').time()
+            if intervals is None:
+                intervals = cls._get_booked_intervals(business, date)
             
-            # Generate 30-minute slots
-            slots = []
-            current_time = datetime.combine(date, start_time)
-            end_datetime = datetime.combine(date, end_time)
+            if held_buckets is None:
+                held_buckets = SlotHoldCacheManager.get_held_buckets(
+                    business.id,
+                    {date: SlotHoldCacheManager.buckets_for(open_minute, close_minute + duration)},
+                    seats=business.booking_capacity
+                ).get(date, {})
             
-            while current_time < end_datetime:
-                slot_time = current_time.time()
-                
-                # Check if slot is available
-                conflict_check = cls._check_booking_conflicts(
-                    business, service, date, slot_time
-                )
-                
-                if not conflict_check['has_conflict']:
-                    # Check if it's not in the past
-                    if datetime.combine(date, slot_time) > timezone.now():
-                        slots.append(slot_time.strftime('%H:%M'))
+            # Seats held by other customers count as bookings in the sweep
+            free_starts = cls._free_slot_starts(
+                intervals + cls._held_intervals(held_buckets),
+                open_minute, close_minute, duration,
+                step=cls._slot_step(business, service),
+                capacity=business.booking_capacity
+            )
+            
+            # Skip slots that are already in the past
+            now = timezone.now()
+            day_start = timezone.make_aware(datetime.combine(date, datetime.min.time()))
+            
+            slots = []
+            for minute in free_starts:
+                slot_datetime = day_start + timedelta(minutes=minute)
+                if slot_datetime <= now:
+                    continue
                 
-                current_time += timedelta(minutes=30)
+                slots.append(f"{minute // 60:02d}:{minute % 60:02d}")
             
             return slots
             
@@ -454,6 +1235,18 @@ class BookingManager:
             logger.error(f"Time slot generation failed: {str(e)}")
             return []
     
+    @classmethod
+    def _send_series_notifications(cls, series, bookings):
+        """Send one summary notification to customer and business for a series"""
+        try:
+            from utils.notification_manager import NotificationManager
+            
+            NotificationManager.send_series_confirmation(series, bookings)
+            NotificationManager.send_new_series_notification(series, bookings)
+            
+        except Exception as e:
+            logger.error(f"Failed to send booking series notifications: {str(e)}")
+    
     @classmethod
     def _send_booking_notifications(cls, booking):
         """Send booking notifications to customer and business"""
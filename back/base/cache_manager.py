@@ -1,19 +1,411 @@
 # cache_manager.py - Comprehensive caching and performance optimization
+import bisect
+import copy
+import inspect
 import json
 import hashlib
-from typing import Any, Dict, List, Optional, Union
+import math
+import random
+import secrets
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple, Union
 from datetime import datetime, timedelta
-from django.core.cache import cache
+from decimal import Decimal
+from enum import Enum
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
 from django.conf import settings
+from django.db import connection, transaction
 from django.db.models import QuerySet
 from django.utils import timezone
-from django.db.models.signals import post_save, post_delete
-from django.dispatch import receiver
 from functools import wraps
 import logging
+import pickle
+import struct
+import zlib
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
 
 logger = logging.getLogger(__name__)
 
+class LocalCache:
+    """
+    Bounded, thread-safe LRU cache living inside one worker process
+    
+    Entries expire after a short timeout and the least recently used entry
+    is evicted once ``max_entries`` is reached. Values are copied on the way
+    in and out, so callers can never mutate a shared cached object.
+    """
+    
+    def __init__(self, max_entries: int = 1000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """Return (hit, value) for a key"""
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return False, None
+            value, expires_at = item
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return False, None
+            self._entries.move_to_end(key)
+        return True, copy.deepcopy(value)
+    
+    def set(self, key: str, value: Any, timeout: float):
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + timeout)
+            self._entries.move_to_end(key)
+            evicted = []
+            while len(self._entries) > self.max_entries:
+                evicted.append(self._entries.popitem(last=False)[0])
+        for evicted_key in evicted:
+            CacheMetrics.record(evicted_key, 'evictions')
+    
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_MISSING = object()
+
+
+class CacheMetrics:
+    """
+    Hit, miss, write and latency counters per cache key prefix
+    
+    Counts are kept per worker process and added to shared counters in the
+    cache every FLUSH_INTERVAL seconds, so a snapshot taken in any worker
+    covers all of them. Latencies go into fixed millisecond buckets. Keys
+    whose prefix is not listed in CacheManager.PREFIXES are counted under
+    'other', which keeps the number of counters bounded.
+    """
+    
+    COUNTERS = ('hits', 'misses', 'local_hits', 'sets', 'deletes', 'evictions', 'errors')
+    OPERATIONS = ('get', 'set')
+    LATENCY_BUCKETS = (0.5, 1, 2, 5, 10, 25, 50, 100, 250)  # milliseconds
+    FLUSH_INTERVAL = 10  # seconds
+    KEY_PREFIX = 'metrics:cache'
+    
+    _lock = threading.Lock()
+    _pending = {}
+    _last_flush = time.monotonic()
+    
+    @classmethod
+    def prefix_of(cls, key: str) -> Optional[str]:
+        """Prefix a key is counted under, None for the metrics' own keys"""
+        prefix = key.split(':', 1)[0]
+        if prefix == 'metrics':
+            return None
+        return prefix if prefix in CacheManager.PREFIXES.values() else 'other'
+    
+    @classmethod
+    def bucket_labels(cls) -> List[str]:
+        return [f"{bound:g}" for bound in cls.LATENCY_BUCKETS] + ['inf']
+    
+    @classmethod
+    def fields(cls) -> List[str]:
+        fields = list(cls.COUNTERS)
+        for operation in cls.OPERATIONS:
+            fields.append(f"{operation}_us")
+            fields.extend(f"{operation}_le_{label}" for label in cls.bucket_labels())
+        return fields
+    
+    @classmethod
+    def record(cls, key: str, *counters: str, operation: str = None, elapsed: float = None):
+        """Count events for a key, and the latency of a get or set that took ``elapsed`` seconds"""
+        prefix = cls.prefix_of(key)
+        if prefix is None:
+            return
+        
+        with cls._lock:
+            counts = cls._pending.setdefault(prefix, {})
+            for counter in counters:
+                counts[counter] = counts.get(counter, 0) + 1
+            if operation is not None:
+                label = cls.bucket_labels()[bisect.bisect_left(cls.LATENCY_BUCKETS, elapsed * 1000)]
+                for field, amount in ((f"{operation}_le_{label}", 1), (f"{operation}_us", int(elapsed * 1e6))):
+                    counts[field] = counts.get(field, 0) + amount
+            due = time.monotonic() - cls._last_flush >= cls.FLUSH_INTERVAL
+        
+        if due:
+            cls.flush()
+    
+    @classmethod
+    def _key(cls, prefix: str, field: str) -> str:
+        return f"{cls.KEY_PREFIX}:{prefix}:{field}"
+    
+    @classmethod
+    def flush(cls):
+        """Add this worker's counts to the shared counters"""
+        with cls._lock:
+            pending, cls._pending = cls._pending, {}
+            cls._last_flush = time.monotonic()
+        
+        try:
+            for prefix, counts in pending.items():
+                for field, amount in counts.items():
+                    key = cls._key(prefix, field)
+                    try:
+                        cache.incr(key, amount)
+                    except ValueError:
+                        if not cache.add(key, amount, None):
+                            cache.incr(key, amount)
+        except Exception as e:
+            logger.error(f"Cache metrics flush error: {e}")
+    
+    @classmethod
+    def _prefixes(cls) -> List[str]:
+        return sorted(set(CacheManager.PREFIXES.values()) | {'other'})
+    
+    @classmethod
+    def snapshot(cls) -> Dict[str, Dict]:
+        """Totals per prefix across all workers, for prefixes that saw traffic"""
+        cls.flush()
+        keys = {
+            cls._key(prefix, field): (prefix, field)
+            for prefix in cls._prefixes()
+            for field in cls.fields()
+        }
+        try:
+            stored = cache.get_many(list(keys))
+        except Exception as e:
+            logger.error(f"Cache metrics read error: {e}")
+            return {}
+        
+        totals = {}
+        for key, amount in stored.items():
+            prefix, field = keys[key]
+            totals.setdefault(prefix, {})[field] = amount
+        return {prefix: cls._summarize(counts) for prefix, counts in sorted(totals.items())}
+    
+    @classmethod
+    def _summarize(cls, counts: Dict[str, int]) -> Dict:
+        summary = {counter: counts.get(counter, 0) for counter in cls.COUNTERS}
+        lookups = summary['hits'] + summary['misses']
+        summary['hit_rate'] = summary['hits'] / lookups if lookups else None
+        
+        for operation in cls.OPERATIONS:
+            buckets = {
+                label: counts.get(f"{operation}_le_{label}", 0) for label in cls.bucket_labels()
+            }
+            total = sum(buckets.values())
+            summary[f"{operation}_latency"] = {
+                'count': total,
+                'mean_ms': counts.get(f"{operation}_us", 0) / total / 1000 if total else None,
+                'p50_ms': cls._bucket_percentile(buckets, total, 50),
+                'p95_ms': cls._bucket_percentile(buckets, total, 95),
+                'p99_ms': cls._bucket_percentile(buckets, total, 99),
+                'buckets': buckets,
+            }
+        return summary
+    
+    @classmethod
+    def _bucket_percentile(cls, buckets: Dict[str, int], total: int, percentile: float) -> Optional[float]:
+        """Upper bound of the bucket holding a percentile (None past the last bound)"""
+        if not total:
+            return None
+        rank = math.ceil(percentile / 100 * total)
+        seen = 0
+        for bound, count in zip(cls.LATENCY_BUCKETS, buckets.values()):
+            seen += count
+            if seen >= rank:
+                return bound
+        return None
+    
+    @classmethod
+    def backend_stats(cls) -> Dict[str, int]:
+        """Server-wide counters of a Redis backend, including its evictions"""
+        from django.core.cache.backends.redis import RedisCache
+        
+        if not isinstance(caches['default'], RedisCache):
+            return {}
+        try:
+            info = caches['default']._cache.get_client().info('stats')
+        except Exception as e:
+            logger.error(f"Cache backend stats error: {e}")
+            return {}
+        return {
+            field: info.get(field, 0)
+            for field in ('keyspace_hits', 'keyspace_misses', 'evicted_keys', 'expired_keys')
+        }
+    
+    @classmethod
+    def reset(cls):
+        """Drop unflushed and shared counts"""
+        with cls._lock:
+            cls._pending = {}
+        try:
+            cache.delete_many([
+                cls._key(prefix, field) for prefix in cls._prefixes() for field in cls.fields()
+            ])
+        except Exception as e:
+            logger.error(f"Cache metrics reset error: {e}")
+
+
+class SoftEntry(NamedTuple):
+    """
+    Cached value with a soft expiry inside its hard cache timeout
+    
+    Past ``fresh_until`` the value is stale: still served, but due for a
+    rebuild. ``delta`` is how long the last rebuild took, used for
+    probabilistic early expiration.
+    """
+    value: Any
+    fresh_until: float
+    delta: float = 0.0
+    
+    def is_due(self, beta: float = 1.0) -> bool:
+        """
+        Whether this reader should rebuild the value now
+        
+        XFetch early expiration: each reader rolls -delta * beta * log(rand)
+        seconds of look-ahead, so rebuilds of slow values spread out before
+        the soft expiry instead of all landing on it. beta=0 disables it.
+        """
+        look_ahead = -self.delta * beta * math.log(1.0 - random.random())
+        return time.time() + look_ahead >= self.fresh_until
+
+
+class CacheCodec:
+    """
+    Serialization of structured cache values, compressed above a size threshold
+    
+    Encoded values are bytes starting with a header: MAGIC, the format
+    VERSION, and ids of the serializer and compressor used. Readers decode
+    every registered combination whatever they are configured to write, so
+    a new codec is rolled out by deploying the readers first and then
+    switching CACHE_CODEC or CACHE_COMPRESSION. Values without the header
+    (counters, flags, short strings and entries written before the codec)
+    are returned unchanged.
+    
+    msgpack is used when installed and selected; types it cannot represent
+    exactly, including tuples and dict subclasses, are embedded as pickles.
+    """
+    
+    MAGIC = b'\xffWC'
+    VERSION = 1
+    HEADER = struct.Struct('>3sBBB')  # magic, version, serializer id, compressor id
+    
+    SERIALIZERS = {'pickle': 0, 'msgpack': 1}
+    COMPRESSORS = {'none': 0, 'zlib': 1}
+    
+    CODEC = getattr(settings, 'CACHE_CODEC', 'pickle')
+    COMPRESSION = getattr(settings, 'CACHE_COMPRESSION', 'zlib')
+    COMPRESS_THRESHOLD = getattr(settings, 'CACHE_COMPRESS_THRESHOLD', 16 * 1024)  # bytes
+    # zlib level 1 compresses large chart HTML about three times faster than
+    # the default level 6 for roughly 15% more bytes; writes sit on the
+    # request path, so speed wins
+    COMPRESS_LEVEL = getattr(settings, 'CACHE_COMPRESS_LEVEL', 1)
+    
+    _PICKLE_EXT = 1  # msgpack extension type carrying a pickle
+    
+    @classmethod
+    def encode(cls, value: Any, codec: str = None, compression: str = None) -> Any:
+        """Encode a value for the shared cache"""
+        if value is None or isinstance(value, (bool, int, float)):
+            return value
+        if isinstance(value, (str, bytes)) and len(value) < cls.COMPRESS_THRESHOLD:
+            if not (isinstance(value, bytes) and value.startswith(cls.MAGIC)):
+                return value
+        
+        codec = codec or cls.CODEC
+        if codec == 'msgpack' and msgpack is None:
+            codec = 'pickle'
+        body = cls._dumps(codec, value)
+        
+        compression = compression or cls.COMPRESSION
+        if compression == 'none' or len(body) < cls.COMPRESS_THRESHOLD:
+            compression = 'none'
+        else:
+            body = zlib.compress(body, cls.COMPRESS_LEVEL)
+        
+        return cls.HEADER.pack(
+            cls.MAGIC, cls.VERSION, cls.SERIALIZERS[codec], cls.COMPRESSORS[compression]
+        ) + body
+    
+    @classmethod
+    def decode(cls, value: Any) -> Any:
+        """Decode a value read from the shared cache, _MISSING if it is unreadable"""
+        if not isinstance(value, bytes) or not value.startswith(cls.MAGIC):
+            return value
+        
+        _, version, serializer, compressor = cls.HEADER.unpack_from(value)
+        if version != cls.VERSION:
+            # Written by a newer release; treat as a miss until it is rewritten
+            logger.warning(f"Cache value with unknown codec version {version}")
+            return _MISSING
+        
+        body = value[cls.HEADER.size:]
+        try:
+            if compressor == cls.COMPRESSORS['zlib']:
+                body = zlib.decompress(body)
+            elif compressor != cls.COMPRESSORS['none']:
+                logger.warning(f"Cache value with unknown compressor {compressor}")
+                return _MISSING
+            
+            if serializer == cls.SERIALIZERS['pickle']:
+                return pickle.loads(body)
+            if serializer == cls.SERIALIZERS['msgpack'] and msgpack is not None:
+                return msgpack.unpackb(body, ext_hook=cls._msgpack_ext_hook, raw=False, strict_map_key=False)
+        except Exception as e:
+            logger.error(f"Cache value decode error: {e}")
+            return _MISSING
+        
+        logger.warning(f"Cache value with unavailable serializer {serializer}")
+        return _MISSING
+    
+    @classmethod
+    def _dumps(cls, codec: str, value: Any) -> bytes:
+        if codec == 'msgpack':
+            return msgpack.packb(
+                value, default=cls._msgpack_default, use_bin_type=True, strict_types=True
+            )
+        return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    
+    @classmethod
+    def _msgpack_default(cls, value: Any):
+        return msgpack.ExtType(cls._PICKLE_EXT, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    
+    @classmethod
+    def _msgpack_ext_hook(cls, code: int, data: bytes) -> Any:
+        if code == cls._PICKLE_EXT:
+            return pickle.loads(data)
+        return msgpack.ExtType(code, data)
+
+
+_refresh_pool = None
+_refresh_pool_lock = threading.Lock()
+
+
+def _get_refresh_pool() -> ThreadPoolExecutor:
+    """Thread pool running background rebuilds of stale values"""
+    global _refresh_pool
+    with _refresh_pool_lock:
+        if _refresh_pool is None:
+            _refresh_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='cache-refresh')
+        return _refresh_pool
+
+
 class CacheManager:
     """Advanced cache management with intelligent invalidation"""
     
@@ -34,18 +426,145 @@ class CacheManager:
         'customer': 'customer',
         'analytics': 'analytics',
         'subscription': 'subscription',
-        'notification': 'notification'
+        'notification': 'notification',
+        'occupancy': 'occupancy',
+        'slot_hold': 'slot_hold',
+        'schedule': 'schedule',
+        'idempotency': 'idempotency',
+        'permission': 'permission',
+        'subscription_limits': 'subscription_limits',
+        'rate_limit': 'rate_limit',
+        'security': 'security',
+        'otp': 'otp',
+        'namespace': 'namespace',
+        'func': 'func'
+    }
+    
+    # In-process tier in front of the shared cache for hot, small values.
+    # Copies (and namespace versions) are served for at most LOCAL_TIMEOUT
+    # seconds, which bounds how long another worker's change can go unseen.
+    LOCAL_TIMEOUT = getattr(settings, 'CACHE_LOCAL_TIMEOUT', 5)
+    local = LocalCache(getattr(settings, 'CACHE_LOCAL_MAX_ENTRIES', 1000))
+    
+    # Single-flight rebuilds in get_or_set
+    REFRESH_LOCK_TIMEOUT = 60  # seconds a rebuild may hold its lock
+    REFRESH_WAIT = 2.0  # seconds a reader with nothing to serve waits for a rebuild
+    
+    # Prefixes whose identifier is a business or user id. Their keys embed
+    # that namespace's version, so one increment retires all of them and the
+    # retired keys simply age out by TTL.
+    NAMESPACED_PREFIXES = {
+        'business': 'business',
+        'analytics': 'business',
+        'user': 'user',
+        'permission': 'user',
+        'subscription': 'user',
+        'notification': 'user',
     }
     
     @classmethod
     def generate_key(cls, prefix: str, identifier: Union[str, int], 
-                    suffix: str = None) -> str:
-        """Generate standardized cache key"""
+                    suffix: str = None, business_id: int = None) -> str:
+        """
+        Generate standardized cache key
+        
+        Keys under NAMESPACED_PREFIXES, and keys given a ``business_id``,
+        carry the current namespace version after the identifier.
+        """
         key_parts = [prefix, str(identifier)]
+        if business_id is not None:
+            key_parts.append(f"v{cls.namespace_version('business', business_id)}")
+        elif prefix in cls.NAMESPACED_PREFIXES:
+            key_parts.append(f"v{cls.namespace_version(cls.NAMESPACED_PREFIXES[prefix], identifier)}")
         if suffix:
             key_parts.append(suffix)
         return ':'.join(key_parts)
     
+    @classmethod
+    def _namespace_key(cls, namespace: str, identifier: Union[str, int]) -> str:
+        return f"namespace:{namespace}:{identifier}"
+    
+    @classmethod
+    def version(cls, key: str) -> int:
+        """
+        Get a version counter, creating it if missing
+        
+        Counters are seeded from the clock, so one lost to eviction or a
+        cache restart restarts above every version keys were written under
+        before instead of reusing them.
+        """
+        version = cls.get(key)
+        if version is None:
+            cache.add(key, int(time.time() * 1000), None)
+            version = cache.get(key, 0)
+        return version
+    
+    @classmethod
+    def bump_version(cls, key: str):
+        """Increment a version counter, seeding it from the clock if missing"""
+        cache.add(key, int(time.time() * 1000), None)
+        cache.incr(key)
+    
+    @classmethod
+    def namespace_version(cls, namespace: str, identifier: Union[str, int]) -> int:
+        """Get the current version of a business or user namespace"""
+        key = cls._namespace_key(namespace, identifier)
+        try:
+            version = cls.get_local(key)
+            if version is None:
+                version = cls.version(key)
+            return version
+        except Exception as e:
+            logger.error(f"Namespace version error for {namespace} {identifier}: {e}")
+            return 0
+    
+    @classmethod
+    def bump_namespace(cls, namespace: str, identifier: Union[str, int]):
+        """Retire every key in a business or user namespace with one increment"""
+        key = cls._namespace_key(namespace, identifier)
+        try:
+            cls.bump_version(key)
+        except Exception as e:
+            logger.error(f"Namespace invalidation error for {namespace} {identifier}: {e}")
+        finally:
+            cls.local.delete(key)
+    
+    @classmethod
+    def local_tier_enabled(cls) -> bool:
+        """
+        Whether get_local uses the in-process tier
+        
+        Defaults to on for shared backends such as Redis. A locmem backend
+        already lives in the process, so a second copy would only add
+        staleness. CACHE_LOCAL_TIER overrides the choice.
+        """
+        enabled = getattr(settings, 'CACHE_LOCAL_TIER', None)
+        if enabled is None:
+            enabled = not isinstance(caches['default'], (LocMemCache, DummyCache))
+        return enabled
+    
+    @classmethod
+    def get_local(cls, key: str, default: Any = None, timeout: float = None) -> Any:
+        """
+        Get a hot value through the in-process tier
+        
+        Hits are served without a network round trip; misses read the shared
+        cache and keep a copy for ``timeout`` (LOCAL_TIMEOUT) seconds.
+        """
+        if not cls.local_tier_enabled():
+            return cls.get(key, default)
+        
+        hit, value = cls.local.get(key)
+        if hit:
+            CacheMetrics.record(key, 'hits', 'local_hits')
+            return value
+        
+        value = cls.get(key, _MISSING)
+        if value is _MISSING:
+            return default
+        cls.local.set(key, value, timeout or cls.LOCAL_TIMEOUT)
+        return value
+    
     @classmethod
     def generate_query_key(cls, prefix: str, query_params: Dict) -> str:
         """Generate cache key for database queries"""
@@ -59,83 +578,214 @@ class CacheManager:
         return f"{prefix}:query:{params_hash}"
     
     @classmethod
-    def set(cls, key: str, value: Any, timeout: str = 'medium') -> bool:
-        """Set cache value with timeout"""
-        timeout_seconds = cls.CACHE_TIMEOUTS.get(timeout, cls.CACHE_TIMEOUTS['medium'])
+    def _timeout_seconds(cls, timeout: Union[str, int, float]) -> float:
+        """Resolve a named timeout, passing numbers of seconds through"""
+        if isinstance(timeout, (int, float)):
+            return timeout
+        return cls.CACHE_TIMEOUTS.get(timeout, cls.CACHE_TIMEOUTS['medium'])
+    
+    @classmethod
+    def set(cls, key: str, value: Any, timeout: str = 'medium',
+            soft_timeout: Union[str, int, float] = None, delta: float = 0.0) -> bool:
+        """
+        Set cache value with timeout
+        
+        With ``soft_timeout`` the value is stored as a SoftEntry that turns
+        stale after that long but stays servable until the hard timeout.
+        """
+        timeout_seconds = cls._timeout_seconds(timeout)
+        if soft_timeout is not None:
+            value = SoftEntry(value, time.time() + cls._timeout_seconds(soft_timeout), delta)
+        cls.local.delete(key)
+        started = time.perf_counter()
         try:
-            return cache.set(key, value, timeout_seconds)
+            result = cache.set(key, CacheCodec.encode(value), timeout_seconds)
         except Exception as e:
+            CacheMetrics.record(key, 'errors')
             logger.error(f"Cache set error for key {key}: {e}")
             return False
+        CacheMetrics.record(key, 'sets', operation='set', elapsed=time.perf_counter() - started)
+        return result
+    
+    @classmethod
+    def get(cls, key: str, default: Any = None, beta: float = None) -> Any:
+        """
+        Get cache value
+        
+        Soft entries are unwrapped. Given ``beta``, a soft entry that is due
+        for a rebuild (stale, or picked for early expiration) is reported as
+        a miss so the caller recomputes it.
+        """
+        value = cls._get_raw(key)
+        if value is _MISSING:
+            return default
+        
+        if isinstance(value, SoftEntry):
+            if beta is not None and value.is_due(beta):
+                return default
+            return value.value
+        return value
+    
+    @classmethod
+    def get_many(cls, keys: List[str]) -> Dict[str, Any]:
+        """Get several cache values in one round trip"""
+        started = time.perf_counter()
+        try:
+            values = cache.get_many(keys)
+        except Exception as e:
+            for key in keys:
+                CacheMetrics.record(key, 'errors')
+            logger.error(f"Cache get_many error for {len(keys)} keys: {e}")
+            return {}
+        
+        # The round trip is timed once, under the prefix of the first key
+        elapsed = time.perf_counter() - started
+        for index, key in enumerate(keys):
+            CacheMetrics.record(
+                key, 'hits' if key in values else 'misses',
+                operation='get' if index == 0 else None, elapsed=elapsed
+            )
+        decoded = {}
+        for key, value in values.items():
+            value = CacheCodec.decode(value)
+            if value is not _MISSING:
+                decoded[key] = value.value if isinstance(value, SoftEntry) else value
+        return decoded
+    
+    @classmethod
+    def get_or_set(cls, key: str, compute, timeout: Union[str, int, float, Callable] = 'medium',
+                   soft_timeout: Union[str, int, float] = None, beta: float = 1.0,
+                   background: bool = True) -> Any:
+        """
+        Get a value, rebuilding it at most once at a time across workers
+        
+        A missing value is computed by the one reader that takes the
+        rebuild lock; the others wait up to REFRESH_WAIT for it. With
+        ``soft_timeout`` a stale value keeps being served while a single
+        reader rebuilds it, in a background thread unless ``background`` is
+        off, and ``beta`` spreads rebuilds ahead of the soft expiry.
+        ``timeout`` may be a callable that picks the timeout from the value.
+        """
+        entry = cls._get_raw(key)
+        if entry is not _MISSING:
+            if not isinstance(entry, SoftEntry):
+                return entry
+            if not entry.is_due(beta):
+                return entry.value
+        
+        lock_key = f"{key}:refresh"
+        if cls._acquire_refresh(lock_key):
+            if entry is not _MISSING and background:
+                _get_refresh_pool().submit(
+                    cls._refresh, key, compute, timeout, soft_timeout, lock_key
+                )
+                return entry.value
+            try:
+                return cls._recompute(key, compute, timeout, soft_timeout)
+            finally:
+                cache.delete(lock_key)
+        
+        if entry is not _MISSING:
+            # Another worker is rebuilding; keep serving the stale value
+            return entry.value
+        
+        deadline = time.monotonic() + cls.REFRESH_WAIT
+        while time.monotonic() < deadline:
+            time.sleep(0.05)
+            entry = cls._get_raw(key)
+            if entry is not _MISSING:
+                return entry.value if isinstance(entry, SoftEntry) else entry
+        
+        # The rebuild is taking too long to wait for
+        return compute()
     
     @classmethod
-    def get(cls, key: str, default: Any = None) -> Any:
-        """Get cache value"""
+    def _get_raw(cls, key: str) -> Any:
+        started = time.perf_counter()
         try:
-            return cache.get(key, default)
+            value = cache.get(key, _MISSING)
         except Exception as e:
+            CacheMetrics.record(key, 'errors')
             logger.error(f"Cache get error for key {key}: {e}")
-            return default
+            return _MISSING
+        CacheMetrics.record(
+            key, 'misses' if value is _MISSING else 'hits',
+            operation='get', elapsed=time.perf_counter() - started
+        )
+        return CacheCodec.decode(value)
     
     @classmethod
-    def delete(cls, key: str) -> bool:
-        """Delete cache key"""
+    def _acquire_refresh(cls, lock_key: str) -> bool:
         try:
-            return cache.delete(key)
+            return cache.add(lock_key, True, cls.REFRESH_LOCK_TIMEOUT)
         except Exception as e:
-            logger.error(f"Cache delete error for key {key}: {e}")
+            logger.error(f"Cache lock error for key {lock_key}: {e}")
+            return True
+    
+    @classmethod
+    def _recompute(cls, key: str, compute, timeout, soft_timeout) -> Any:
+        started = time.monotonic()
+        value = compute()
+        if callable(timeout):
+            timeout = timeout(value)
+        cls.set(key, value, timeout, soft_timeout=soft_timeout, delta=time.monotonic() - started)
+        return value
+    
+    @classmethod
+    def _refresh(cls, key: str, compute, timeout, soft_timeout, lock_key: str):
+        """Rebuild a stale value from the background pool"""
+        try:
+            cls._recompute(key, compute, timeout, soft_timeout)
+        except Exception as e:
+            logger.error(f"Background cache refresh error for key {key}: {e}")
+        finally:
+            cache.delete(lock_key)
+            connection.close()
+    
+    @classmethod
+    def set_many(cls, data: Dict[str, Any], timeout: str = 'medium') -> bool:
+        """Set several cache values in one round trip"""
+        timeout_seconds = cls._timeout_seconds(timeout)
+        for key in data:
+            cls.local.delete(key)
+        started = time.perf_counter()
+        try:
+            failed = cache.set_many(
+                {key: CacheCodec.encode(value) for key, value in data.items()}, timeout_seconds
+            )
+        except Exception as e:
+            for key in data:
+                CacheMetrics.record(key, 'errors')
+            logger.error(f"Cache set_many error for {len(data)} keys: {e}")
             return False
+        
+        elapsed = time.perf_counter() - started
+        for index, key in enumerate(data):
+            CacheMetrics.record(key, 'sets', operation='set' if index == 0 else None, elapsed=elapsed)
+        return not failed
     
     @classmethod
-    def delete_pattern(cls, pattern: str) -> int:
-        """Delete all keys matching pattern"""
+    def delete(cls, key: str) -> bool:
+        """Delete cache key"""
+        cls.local.delete(key)
         try:
-            if hasattr(cache, 'delete_pattern'):
-                return cache.delete_pattern(pattern)
-            else:
-                # Fallback for cache backends that don't support pattern deletion
-                # This is less efficient but ensures compatibility
-                keys_to_delete = []
-                if hasattr(cache, '_cache'):  # Django's locmem cache
-                    for key in cache._cache.keys():
-                        if pattern.replace('*', '') in key:
-                            keys_to_delete.append(key)
-                
-                deleted_count = 0
-                for key in keys_to_delete:
-                    if cls.delete(key):
-                        deleted_count += 1
-                
-                return deleted_count
+            result = cache.delete(key)
         except Exception as e:
-            logger.error(f"Cache delete pattern error for pattern {pattern}: {e}")
-            return 0
+            CacheMetrics.record(key, 'errors')
+            logger.error(f"Cache delete error for key {key}: {e}")
+            return False
+        CacheMetrics.record(key, 'deletes')
+        return result
     
     @classmethod
     def invalidate_business_cache(cls, business_id: int):
         """Invalidate all cache entries for a business"""
-        patterns = [
-            f"{cls.PREFIXES['business']}:{business_id}:*",
-            f"{cls.PREFIXES['service']}:*:business:{business_id}",
-            f"{cls.PREFIXES['booking']}:*:business:{business_id}",
-            f"{cls.PREFIXES['customer']}:*:business:{business_id}",
-            f"{cls.PREFIXES['analytics']}:{business_id}:*"
-        ]
-        
-        for pattern in patterns:
-            cls.delete_pattern(pattern)
+        cls.bump_namespace('business', business_id)
     
     @classmethod
     def invalidate_user_cache(cls, user_id: int):
         """Invalidate all cache entries for a user"""
-        patterns = [
-            f"{cls.PREFIXES['user']}:{user_id}:*",
-            f"{cls.PREFIXES['subscription']}:{user_id}:*",
-            f"{cls.PREFIXES['notification']}:{user_id}:*"
-        ]
-        
-        for pattern in patterns:
-            cls.delete_pattern(pattern)
+        cls.bump_namespace('user', user_id)
 
 
 class QueryCacheManager:
@@ -164,7 +814,7 @@ class QueryCacheManager:
                              params: Dict, timeout: str = 'long') -> Dict:
         """Cache analytics query results"""
         cache_key = CacheManager.generate_query_key(
-            f"{CacheManager.PREFIXES['analytics']}:{business_id}",
+            CacheManager.generate_key(CacheManager.PREFIXES['analytics'], business_id),
             params
         )
         
@@ -181,32 +831,132 @@ class QueryCacheManager:
             return {}
 
 
-def cache_result(timeout: str = 'medium', key_generator=None):
-    """Decorator for caching function results"""
+class _CachedNone:
+    """Stored in place of a None result, so it can be told apart from a miss"""
+
+
+_CACHED_NONE = _CachedNone()
+
+
+def _canonical(value: Any) -> Any:
+    """
+    JSON-ready stand-in for a function argument, stable across processes
+    
+    Model instances become their label, primary key and updated_at (when
+    the model has one), so saving an instance moves it to a new key. Classes
+    become their dotted path. Values whose repr is only a memory address
+    raise TypeError.
+    """
+    from django.db.models import Model
+    
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, Model):
+        updated_at = getattr(value, 'updated_at', None)
+        return ['model', value._meta.label_lower, value.pk, updated_at.isoformat() if updated_at else None]
+    if isinstance(value, QuerySet):
+        return ['queryset', value.model._meta.label_lower, str(value.query)]
+    if isinstance(value, type):
+        return ['type', f"{value.__module__}.{value.__qualname__}"]
+    if isinstance(value, Enum):
+        return ['enum', type(value).__qualname__, _canonical(value.value)]
+    if isinstance(value, dict):
+        return ['dict', sorted(([_canonical(k), _canonical(v)] for k, v in value.items()), key=repr)]
+    if isinstance(value, (list, tuple)):
+        return [type(value).__name__, [_canonical(item) for item in value]]
+    if isinstance(value, (set, frozenset)):
+        return ['set', sorted((_canonical(item) for item in value), key=repr)]
+    if isinstance(value, bytes):
+        return ['bytes', value.hex()]
+    if hasattr(value, 'isoformat'):
+        return [type(value).__name__, value.isoformat()]
+    if isinstance(value, (Decimal, uuid.UUID, timedelta)):
+        return [type(value).__name__, str(value)]
+    
+    representation = repr(value)
+    if ' at 0x' in representation:
+        raise TypeError(f"No stable cache key for {type(value).__qualname__} arguments")
+    return [type(value).__qualname__, representation]
+
+
+def cache_result(timeout: Union[str, int, float, Callable] = 'medium', key_generator=None,
+                 soft_timeout: Union[str, int, float] = None, beta: float = 1.0,
+                 cache_none: bool = True, none_timeout: Union[str, int, float] = 'short'):
+    """
+    Decorator for caching function results
+    
+    Keys hash the call's bound arguments in canonical form, so positional
+    and keyword calls share an entry and model instances are keyed by
+    primary key and version. Calls with arguments that have no stable form
+    are not cached. ``timeout`` may be a callable that picks the timeout
+    from the result. None results are cached for ``none_timeout`` unless
+    ``cache_none`` is off.
+    
+    Results are rebuilt single-flight through CacheManager.get_or_set;
+    ``soft_timeout`` and ``beta`` enable stale-while-revalidate. Coroutine
+    functions get an async wrapper that rebuilds inline on a miss.
+    """
+    def resolve_timeout(value):
+        if isinstance(value, _CachedNone):
+            return none_timeout if cache_none else 0
+        return timeout(value) if callable(timeout) else timeout
+    
+    def unwrap(value):
+        return None if isinstance(value, _CachedNone) else value
+    
     def decorator(func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            # Generate cache key
+        signature = inspect.signature(func)
+        func_name = f"{func.__module__}.{func.__qualname__}"
+        
+        def make_key(*args, **kwargs) -> Optional[str]:
             if key_generator:
-                cache_key = key_generator(*args, **kwargs)
-            else:
-                # Default key generation
-                func_name = f"{func.__module__}.{func.__name__}"
-                args_str = str(args) + str(sorted(kwargs.items()))
-                args_hash = hashlib.md5(args_str.encode()).hexdigest()
-                cache_key = f"func:{func_name}:{args_hash}"
-            
-            # Check cache
-            cached_result = CacheManager.get(cache_key)
-            if cached_result is not None:
-                return cached_result
-            
-            # Execute function and cache result
-            result = func(*args, **kwargs)
-            CacheManager.set(cache_key, result, timeout)
-            
-            return result
+                return key_generator(*args, **kwargs)
+            try:
+                bound = signature.bind(*args, **kwargs)
+                bound.apply_defaults()
+                arguments = json.dumps(_canonical(dict(bound.arguments)), separators=(',', ':'))
+            except TypeError as e:
+                logger.warning(f"Not caching {func_name}: {e}")
+                return None
+            return f"func:{func_name}:{hashlib.md5(arguments.encode()).hexdigest()}"
         
+        if iscoroutinefunction(func):
+            @wraps(func)
+            async def wrapper(*args, **kwargs):
+                cache_key = await sync_to_async(make_key)(*args, **kwargs)
+                if cache_key is None:
+                    return await func(*args, **kwargs)
+                
+                cached = await sync_to_async(CacheManager.get)(
+                    cache_key, _MISSING, beta if soft_timeout is not None else None
+                )
+                if cached is _MISSING:
+                    started = time.monotonic()
+                    result = await func(*args, **kwargs)
+                    cached = _CACHED_NONE if result is None else result
+                    await sync_to_async(CacheManager.set)(
+                        cache_key, cached, resolve_timeout(cached),
+                        soft_timeout=soft_timeout, delta=time.monotonic() - started
+                    )
+                return unwrap(cached)
+        else:
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                cache_key = make_key(*args, **kwargs)
+                if cache_key is None:
+                    return func(*args, **kwargs)
+                
+                def compute():
+                    result = func(*args, **kwargs)
+                    return _CACHED_NONE if result is None else result
+                
+                return unwrap(CacheManager.get_or_set(
+                    cache_key, compute, resolve_timeout,
+                    soft_timeout=soft_timeout, beta=beta
+                ))
+        
+        wrapper.cache_key = make_key
+        wrapper.invalidate = lambda *args, **kwargs: CacheManager.delete(make_key(*args, **kwargs))
         return wrapper
     return decorator
 
@@ -246,7 +996,7 @@ class SubscriptionCacheManager:
         """Get cached subscription tier limits"""
         cache_key = f"subscription_limits:{tier}"
         
-        cached_limits = CacheManager.get(cache_key)
+        cached_limits = CacheManager.get_local(cache_key, timeout=CacheManager.CACHE_TIMEOUTS['short'])
         if cached_limits is not None:
             return cached_limits
         
@@ -305,45 +1055,437 @@ class AnalyticsCacheManager:
     @classmethod
     def invalidate_business_analytics(cls, business_id: int):
         """Invalidate all analytics cache for a business"""
-        pattern = f"{CacheManager.PREFIXES['analytics']}:{business_id}:*"
-        CacheManager.delete_pattern(pattern)
+        CacheManager.bump_namespace('business', business_id)
+
+
+class OccupancyCacheManager:
+    """
+    Specialized cache manager for per-business daily occupancy indexes
+    
+    Each entry holds a sorted list of [start, end, booking_id] intervals in
+    minutes from midnight for the active bookings of one business and date.
+    Entries are patched in place when bookings change and rebuilt lazily by
+    BookingManager on a miss. A per-business generation counter embedded in
+    the keys drops every day at once when service durations change.
+    """
+    
+    LOCK_TIMEOUT = 5  # seconds
+    
+    @classmethod
+    def _generation_key(cls, business_id: int) -> str:
+        return CacheManager.generate_key(
+            CacheManager.PREFIXES['occupancy'], business_id, 'generation'
+        )
+    
+    @classmethod
+    def _day_key(cls, business_id: int, date, generation: int) -> str:
+        return CacheManager.generate_key(
+            CacheManager.PREFIXES['occupancy'],
+            business_id,
+            f"{generation}:{date.isoformat()}"
+        )
+    
+    @classmethod
+    def get_intervals(cls, business_id: int, date) -> Optional[List]:
+        """Get cached occupancy entries for a single day"""
+        return cls.get_intervals_many(business_id, [date]).get(date)
+    
+    @classmethod
+    def get_intervals_many(cls, business_id: int, dates: List) -> Dict:
+        """Get cached occupancy entries for several days (hits only)"""
+        generation = CacheManager.version(cls._generation_key(business_id))
+        keys = {cls._day_key(business_id, date, generation): date for date in dates}
+        cached = CacheManager.get_many(list(keys))
+        return {keys[key]: entries for key, entries in cached.items()}
+    
+    @classmethod
+    def set_intervals_many(cls, business_id: int, entries_by_date: Dict) -> bool:
+        """Cache occupancy entries for several days"""
+        generation = CacheManager.version(cls._generation_key(business_id))
+        data = {
+            cls._day_key(business_id, date, generation): entries
+            for date, entries in entries_by_date.items()
+        }
+        return CacheManager.set_many(data, 'long')
+    
+    @classmethod
+    def apply_booking_change(cls, business_id: int, date, booking_id: int,
+                             entry: Optional[List] = None):
+        """
+        Patch a cached day in place for a single booking
+        
+        The booking's previous interval is removed and ``entry`` is inserted
+        if given. Days that are not cached are left alone and will be rebuilt
+        on the next lookup. If another worker is patching the same day the
+        business generation is bumped instead, so a concurrent write lands on
+        a retired key and a lost update can never hide a booking.
+        """
+        generation = CacheManager.version(cls._generation_key(business_id))
+        key = cls._day_key(business_id, date, generation)
+        lock_key = f"{key}:lock"
+        
+        try:
+            if not cache.add(lock_key, True, cls.LOCK_TIMEOUT):
+                cls.invalidate_business(business_id)
+                return
+            
+            try:
+                entries = CacheManager.get(key)
+                if entries is None:
+                    return
+                
+                entries = [item for item in entries if item[2] != booking_id]
+                if entry is not None:
+                    bisect.insort(entries, list(entry))
+                
+                CacheManager.set(key, entries, 'long')
+            finally:
+                cache.delete(lock_key)
+                
+        except Exception as e:
+            logger.error(f"Occupancy update error for business {business_id}: {e}")
+            CacheManager.delete(key)
+    
+    @classmethod
+    def invalidate_business(cls, business_id: int):
+        """Drop every cached occupancy day for a business"""
+        try:
+            CacheManager.bump_version(cls._generation_key(business_id))
+        except Exception as e:
+            logger.error(f"Occupancy invalidation error for business {business_id}: {e}")
+
+
+class ScheduleCacheManager:
+    """
+    Specialized cache manager for compiled business schedules
+    
+    Schedules are stored under a per-business version stamp. Readers get the
+    version together with the cached value and write rebuilt schedules back
+    under that same version, so a rebuild that races with an hours change
+    lands on a retired key instead of serving stale hours.
+    """
+    
+    FORMAT_VERSION = 1
+    
+    @classmethod
+    def _version_key(cls, business_id: int) -> str:
+        return CacheManager.generate_key(CacheManager.PREFIXES['schedule'], business_id, 'version')
+    
+    @classmethod
+    def _schedule_key(cls, business_id: int, version: int) -> str:
+        return CacheManager.generate_key(
+            CacheManager.PREFIXES['schedule'], business_id, f"v{cls.FORMAT_VERSION}:{version}"
+        )
+    
+    @classmethod
+    def get_schedule(cls, business_id: int) -> Tuple[int, Any]:
+        """Get the current version stamp and cached schedule (None on a miss)"""
+        version = CacheManager.version(cls._version_key(business_id))
+        return version, CacheManager.get(cls._schedule_key(business_id, version))
+    
+    @classmethod
+    def set_schedule(cls, business_id: int, version: int, schedule: Any) -> bool:
+        """Cache a compiled schedule under the version it was built for"""
+        return CacheManager.set(cls._schedule_key(business_id, version), schedule, 'very_long')
+    
+    @classmethod
+    def invalidate_business(cls, business_id: int):
+        """Retire the cached schedule of a business"""
+        try:
+            CacheManager.bump_version(cls._version_key(business_id))
+        except Exception as e:
+            logger.error(f"Schedule invalidation error for business {business_id}: {e}")
+
+
+class SlotHoldCacheManager:
+    """
+    Specialized cache manager for temporary slot holds
+    
+    A hold claims a seat in every fixed-size minute bucket its interval
+    touches with an atomic set-if-absent, so no more customers than there are
+    free seats can hold overlapping time. Bucket keys and the token record
+    expire on their own after HOLD_TIMEOUT.
+    """
+    
+    BUCKET_MINUTES = 15
+    HOLD_TIMEOUT = 300  # seconds
+    
+    @classmethod
+    def buckets_for(cls, start: int, end: int) -> range:
+        """Buckets touched by the interval [start, end) in minutes"""
+        first = start // cls.BUCKET_MINUTES
+        last = max(first + 1, -(-end // cls.BUCKET_MINUTES))
+        return range(first, last)
+    
+    @classmethod
+    def _bucket_key(cls, business_id: int, date, bucket: int, seat: int = 0) -> str:
+        return CacheManager.generate_key(
+            CacheManager.PREFIXES['slot_hold'], business_id, f"{date.isoformat()}:{bucket}:{seat}"
+        )
+    
+    @classmethod
+    def _token_key(cls, token: str) -> str:
+        return CacheManager.generate_key(CacheManager.PREFIXES['slot_hold'], 'token', token)
+    
+    @classmethod
+    def acquire(cls, business_id: int, service_id: int, date, start: int, end: int,
+                seats: int = 1, timeout: int = None) -> Optional[str]:
+        """
+        Hold [start, end) on a date, returning a token or None if any part is held
+        
+        ``seats`` is the number of parallel seats still free for the interval;
+        each bucket needs one of them to be unclaimed.
+        """
+        timeout = timeout or cls.HOLD_TIMEOUT
+        token = secrets.token_urlsafe(16)
+        acquired = []
+        
+        try:
+            for bucket in cls.buckets_for(start, end):
+                for seat in range(seats):
+                    key = cls._bucket_key(business_id, date, bucket, seat)
+                    if cache.add(key, token, timeout):
+                        acquired.append(key)
+                        break
+                else:
+                    cache.delete_many(acquired)
+                    return None
+            
+            cache.set(cls._token_key(token), {
+                'business_id': business_id,
+                'service_id': service_id,
+                'date': date.isoformat(),
+                'start': start,
+                'end': end,
+                'keys': acquired,
+            }, timeout)
+            return token
+            
+        except Exception as e:
+            logger.error(f"Slot hold error for business {business_id}: {e}")
+            cache.delete_many(acquired)
+            return None
+    
+    @classmethod
+    def get_hold(cls, token: str) -> Optional[Dict]:
+        """Get the record of an active hold"""
+        return CacheManager.get(cls._token_key(token))
+    
+    @classmethod
+    def get_held_buckets(cls, business_id: int, buckets_by_date: Dict, seats: int = 1) -> Dict:
+        """
+        Get held buckets for several days in one round trip
+        
+        Returns a mapping of date to {bucket: [token, ...]} for held buckets
+        only, with one token per claimed seat.
+        """
+        keys = {}
+        for date, buckets in buckets_by_date.items():
+            for bucket in buckets:
+                for seat in range(seats):
+                    keys[cls._bucket_key(business_id, date, bucket, seat)] = (date, bucket)
+        
+        held = {}
+        for key, token in CacheManager.get_many(list(keys)).items():
+            date, bucket = keys[key]
+            held.setdefault(date, {}).setdefault(bucket, []).append(token)
+        return held
+    
+    @classmethod
+    def release(cls, token: str) -> bool:
+        """Release a hold, leaving buckets already re-held by others untouched"""
+        hold = cls.get_hold(token)
+        if not hold:
+            return False
+        
+        try:
+            current = cache.get_many(hold['keys'])
+            cache.delete_many([key for key, value in current.items() if value == token])
+            cache.delete(cls._token_key(token))
+            return True
+        except Exception as e:
+            logger.error(f"Slot hold release error: {e}")
+            return False
 
 
-# Signal handlers for automatic cache invalidation
-@receiver(post_save)
-def invalidate_cache_on_save(sender, instance, **kwargs):
-    """Automatically invalidate relevant cache on model save"""
-    model_name = sender.__name__.lower()
+class BookingLookupCacheManager:
+    """
+    Read-through cache for public booking lookups
     
-    # Business-related models
-    if hasattr(instance, 'business_id'):
-        CacheManager.invalidate_business_cache(instance.business_id)
-    elif hasattr(instance, 'business') and hasattr(instance.business, 'id'):
-        CacheManager.invalidate_business_cache(instance.business.id)
+    Each entry holds the serialized booking, its ETag and the versions of
+    the service, business and customer it was built from. Saving the booking
+    deletes its entry. Saving one of the related objects bumps that object's
+    version, so entries built from it are rebuilt on their next read without
+    searching for their keys.
+    """
     
-    # User-related models
-    if hasattr(instance, 'user_id'):
-        CacheManager.invalidate_user_cache(instance.user_id)
-    elif hasattr(instance, 'user') and hasattr(instance.user, 'id'):
-        CacheManager.invalidate_user_cache(instance.user.id)
+    @classmethod
+    def _entry_key(cls, booking_id: str) -> str:
+        return CacheManager.generate_key(CacheManager.PREFIXES['booking'], 'lookup', booking_id)
     
-    # Model-specific invalidation
-    if model_name == 'booking':
-        # Invalidate analytics cache when bookings change
-        if hasattr(instance, 'business') and hasattr(instance.business, 'id'):
-            AnalyticsCacheManager.invalidate_business_analytics(instance.business.id)
+    @classmethod
+    def _version_key(cls, kind: str, object_id: int) -> str:
+        return CacheManager.generate_key(
+            CacheManager.PREFIXES['booking'], f"lookup_version:{kind}", str(object_id)
+        )
     
-    elif model_name == 'subscription':
-        # Invalidate subscription cache
-        if hasattr(instance, 'user_id'):
-            SubscriptionCacheManager.invalidate_user_subscription(instance.user_id)
+    @classmethod
+    def get(cls, booking_id: str) -> Optional[Dict]:
+        """Get a cached lookup if none of its dependencies changed since it was built"""
+        entry = CacheManager.get(cls._entry_key(booking_id))
+        if not entry:
+            return None
+        
+        expected = {
+            cls._version_key(kind, object_id): version
+            for kind, object_id, version in entry['dependencies']
+        }
+        current = CacheManager.get_many(list(expected))
+        if any(current.get(key, 0) != version for key, version in expected.items()):
+            return None
+        return entry
+    
+    @classmethod
+    def set(cls, booking_id: str, data: Dict, dependencies: Dict[str, int]) -> Dict:
+        """Cache a serialized booking together with the versions it depends on"""
+        version_keys = {kind: cls._version_key(kind, object_id) for kind, object_id in dependencies.items()}
+        versions = CacheManager.get_many(list(version_keys.values()))
+        
+        entry = {
+            'data': data,
+            'etag': hashlib.md5(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest(),
+            'dependencies': [
+                (kind, object_id, versions.get(version_keys[kind], 0))
+                for kind, object_id in dependencies.items()
+            ],
+        }
+        CacheManager.set(cls._entry_key(booking_id), entry, 'long')
+        return entry
+    
+    @classmethod
+    def invalidate_bookings(cls, booking_ids: List[str]):
+        """Drop the cached lookups of specific bookings"""
+        try:
+            cache.delete_many([cls._entry_key(str(booking_id)) for booking_id in booking_ids])
+        except Exception as e:
+            logger.error(f"Booking lookup invalidation error: {e}")
+    
+    @classmethod
+    def bump_version(cls, kind: str, object_id: int):
+        """Retire every cached lookup built from a service, business or customer"""
+        key = cls._version_key(kind, object_id)
+        try:
+            cache.add(key, 0, None)
+            cache.incr(key)
+        except Exception as e:
+            logger.error(f"Booking lookup version error for {kind} {object_id}: {e}")
+
+
+class IdempotencyCacheManager:
+    """
+    Specialized cache manager for idempotency keys on public endpoints
+    
+    The first response for a key is stored and replayed for retries within
+    RESPONSE_TIMEOUT. A short lock keeps a retry that arrives while the first
+    request is still running from executing it a second time.
+    """
+    
+    RESPONSE_TIMEOUT = 86400  # seconds
+    LOCK_TIMEOUT = 60  # seconds
+    
+    @classmethod
+    def _key(cls, scope: str, idempotency_key: str, suffix: str = None) -> str:
+        # Hash the client value so any header content yields a safe cache key
+        digest = hashlib.sha256(idempotency_key.encode()).hexdigest()
+        return CacheManager.generate_key(
+            CacheManager.PREFIXES['idempotency'], f"{scope}:{digest}", suffix
+        )
+    
+    @classmethod
+    def get_response(cls, scope: str, idempotency_key: str) -> Optional[Dict]:
+        """Get the stored response for a key"""
+        return CacheManager.get(cls._key(scope, idempotency_key))
+    
+    @classmethod
+    def acquire(cls, scope: str, idempotency_key: str) -> bool:
+        """Mark a key as in flight, returning False if another request holds it"""
+        try:
+            return cache.add(cls._key(scope, idempotency_key, 'lock'), 1, cls.LOCK_TIMEOUT)
+        except Exception as e:
+            logger.error(f"Idempotency lock error for {scope}: {e}")
+            return True
+    
+    @classmethod
+    def store_response(cls, scope: str, idempotency_key: str, fingerprint: str,
+                       status_code: int, data: Any):
+        """Store the first response for a key"""
+        try:
+            cache.set(cls._key(scope, idempotency_key), {
+                'fingerprint': fingerprint,
+                'status': status_code,
+                'data': data,
+            }, cls.RESPONSE_TIMEOUT)
+        except Exception as e:
+            logger.error(f"Idempotency store error for {scope}: {e}")
+    
+    @classmethod
+    def release(cls, scope: str, idempotency_key: str):
+        """Clear the in-flight marker of a key"""
+        CacheManager.delete(cls._key(scope, idempotency_key, 'lock'))
 
 
-@receiver(post_delete)
-def invalidate_cache_on_delete(sender, instance, **kwargs):
-    """Automatically invalidate relevant cache on model delete"""
-    # Use same logic as save signal
-    invalidate_cache_on_save(sender, instance, **kwargs)
+class DeferredInvalidation:
+    """
+    Collect namespace invalidations for the running transaction
+    
+    Model signal handlers add the business and user namespaces a change
+    touches. Inside a transaction the namespaces are gathered in a set and
+    bumped once by a single on_commit callback, so a request that saves 50
+    bookings of one business bumps that business once, and a rolled back
+    transaction bumps nothing. Outside a transaction the bump is immediate.
+    """
+    
+    _local = threading.local()
+    
+    @classmethod
+    def business(cls, business_id: Optional[int]):
+        cls.add('business', business_id)
+    
+    @classmethod
+    def user(cls, user_id: Optional[int]):
+        cls.add('user', user_id)
+    
+    @classmethod
+    def add(cls, namespace: str, identifier: Optional[int]):
+        """Schedule a namespace bump for when the current transaction commits"""
+        if identifier is None:
+            return
+        
+        connection = transaction.get_connection()
+        if not connection.in_atomic_block:
+            CacheManager.bump_namespace(namespace, identifier)
+            return
+        
+        batch = getattr(cls._local, 'batch', None)
+        registered = batch is not None and any(
+            func == batch.flush for _, func, _ in connection.run_on_commit
+        )
+        if not registered:
+            # The previous batch was flushed or discarded by a rollback
+            batch = cls._local.batch = cls()
+            transaction.on_commit(batch.flush)
+        batch.pending.add((namespace, identifier))
+    
+    def __init__(self):
+        self.pending = set()
+    
+    def flush(self):
+        """Bump every collected namespace once"""
+        if getattr(self._local, 'batch', None) is self:
+            self._local.batch = None
+        for namespace, identifier in sorted(self.pending):
+            CacheManager.bump_namespace(namespace, identifier)
+        self.pending.clear()
 
 
 class DatabaseOptimizer:
@@ -378,8 +1520,8 @@ class DatabaseOptimizer:
     @staticmethod
     def optimize_analytics_queries(business_id: int, period: str = 'month'):
         """Optimize analytics queries with caching"""
-        from .models import Booking, Service, Customer
-        from django.db.models import Count, Sum, Avg
+        from .models import Booking, Service
+        from django.db.models import Count, Sum, Avg, Min, Q
         
         # Define date range
         now = timezone.now()
@@ -395,50 +1537,50 @@ class DatabaseOptimizer:
             start_date = now - timedelta(days=30)
         
         # Cache key for analytics
-        cache_key = f"analytics:{business_id}:{period}:{start_date.date()}"
-        
-        # Check cache first
-        cached_data = CacheManager.get(cache_key)
-        if cached_data:
-            return cached_data
-        
-        # Execute optimized queries
-        base_bookings = Booking.objects.filter(
-            business_id=business_id,
-            created_at__gte=start_date
+        cache_key = CacheManager.generate_key(
+            CacheManager.PREFIXES['analytics'], business_id, f"{period}:{start_date.date()}"
         )
         
-        analytics_data = {
-            'period_bookings': base_bookings.count(),
-            'period_revenue': base_bookings.aggregate(
-                total=Sum('total_price')
-            )['total'] or 0,
-            'confirmed_bookings': base_bookings.filter(status='confirmed').count(),
-            'completed_bookings': base_bookings.filter(status='completed').count(),
-            'cancelled_bookings': base_bookings.filter(status='cancelled').count(),
-            'pending_bookings': base_bookings.filter(status='pending').count(),
-            'average_booking_value': base_bookings.aggregate(
-                avg=Avg('total_price')
-            )['avg'] or 0,
-            'top_services': list(
-                Service.objects.filter(business_id=business_id)
-                .annotate(
-                    booking_count=Count('bookings', filter=Q(bookings__created_at__gte=start_date)),
-                    revenue=Sum('bookings__total_price', filter=Q(bookings__created_at__gte=start_date))
-                )
-                .order_by('-booking_count')[:5]
-                .values('name', 'booking_count', 'revenue')
-            ),
-            'customer_insights': {
-                'new_customers': Customer.objects.filter(
-                    business_id=business_id,
-                    created_at__gte=start_date
-                ).count(),
-                'repeat_customers': base_bookings.values('customer').distinct().count()
+        def compute():
+            # Execute optimized queries
+            base_bookings = Booking.objects.filter(
+                business_id=business_id,
+                created_at__gte=start_date
+            )
+            
+            analytics_data = {
+                'period_bookings': base_bookings.count(),
+                'period_revenue': base_bookings.aggregate(
+                    total=Sum('total_price')
+                )['total'] or 0,
+                'confirmed_bookings': base_bookings.filter(status='confirmed').count(),
+                'completed_bookings': base_bookings.filter(status='completed').count(),
+                'cancelled_bookings': base_bookings.filter(status='cancelled').count(),
+                'pending_bookings': base_bookings.filter(status='pending').count(),
+                'average_booking_value': base_bookings.aggregate(
+                    avg=Avg('total_price')
+                )['avg'] or 0,
+                'top_services': list(
+                    Service.objects.filter(business_id=business_id)
+                    .annotate(
+                        booking_count=Count('booking', filter=Q(booking__created_at__gte=start_date)),
+                        revenue=Sum('booking__total_price', filter=Q(booking__created_at__gte=start_date))
+                    )
+                    .order_by('-booking_count')[:5]
+                    .values('name', 'booking_count', 'revenue')
+                ),
+                'customer_insights': {
+                    # Customers whose first booking with the business falls in the period
+                    'new_customers': Booking.objects.filter(business_id=business_id).values(
+                        'customer'
+                    ).annotate(first_booking=Min('created_at')).filter(
+                        first_booking__gte=start_date
+                    ).count(),
+                    'repeat_customers': base_bookings.values('customer').distinct().count()
+                }
             }
-        }
-        
-        # Cache the results
-        CacheManager.set(cache_key, analytics_data, 'long')
+            
+            return analytics_data
         
-        return analytics_data
\ No newline at end of file
+        # One worker rebuilds stale analytics while the rest serve the old copy
+        return CacheManager.get_or_set(cache_key, compute, 'long', soft_timeout='medium')
\ No newline at end of file
@@ -6,15 +6,42 @@ from typing import Dict, List
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
 from django.contrib.auth import get_user_model
-from django.core.cache import cache
 from asgiref.sync import sync_to_async
 from .models import Booking, Service, Customer, Notification
 from accounts.subscription_manager import SubscriptionManager
 from .security import RateLimiter, AuditLogger
+from .cache_manager import CacheManager, cache_result
 
 User = get_user_model()
 logger = logging.getLogger(__name__)
 
+
+@cache_result(
+    timeout='short',
+    key_generator=lambda business_id: CacheManager.generate_key(
+        CacheManager.PREFIXES['business'], business_id, 'recent_bookings'
+    )
+)
+async def recent_bookings(business_id) -> List[Dict]:
+    """Latest bookings of a business, cached until one of its bookings changes"""
+    return await database_sync_to_async(_load_recent_bookings)(business_id)
+
+
+def _load_recent_bookings(business_id) -> List[Dict]:
+    bookings = Booking.objects.filter(
+        business_id=business_id
+    ).select_related('service', 'customer').order_by('-created_at')[:10]
+    
+    return [{
+        'id': booking.id,
+        'customer_name': booking.customer.name if booking.customer else booking.customer_name,
+        'service_name': booking.service.name,
+        'appointment_date': booking.appointment_date.isoformat(),
+        'appointment_time': booking.appointment_time.strftime('%H:%M'),
+        'status': booking.status,
+        'total_price': float(booking.total_price) if booking.total_price else None
+    } for booking in bookings]
+
 class BookingConsumer(AsyncWebsocketConsumer):
     """WebSocket consumer for real-time booking updates"""
     
@@ -205,23 +232,10 @@ class BookingConsumer(AsyncWebsocketConsumer):
         except Exception as e:
             logger.error(f"Error sending initial data: {e}")
     
-    @database_sync_to_async
-    def get_recent_bookings(self) -> List[Dict]:
+    async def get_recent_bookings(self) -> List[Dict]:
         """Get recent bookings for the business"""
         try:
-            bookings = Booking.objects.filter(
-                business=self.user.business_profile
-            ).select_related('service', 'customer').order_by('-created_at')[:10]
-            
-            return [{
-                'id': booking.id,
-                'customer_name': booking.customer.name if booking.customer else booking.customer_name,
-                'service_name': booking.service.name,
-                'appointment_date': booking.appointment_date.isoformat(),
-                'appointment_time': booking.appointment_time.strftime('%H:%M'),
-                'status': booking.status,
-                'total_price': float(booking.total_price) if booking.total_price else None
-            } for booking in bookings]
+            return await recent_bookings(self.business_id)
         except Exception as e:
             logger.error(f"Error getting recent bookings: {e}")
             return []
@@ -312,8 +326,8 @@ class BookingConsumer(AsyncWebsocketConsumer):
             notification_types = data.get('types', [])
             
             # Store subscription preferences in cache
-            cache_key = f"notification_subscription_{self.user.id}"
-            await sync_to_async(cache.set)(cache_key, notification_types, 86400)  # 24 hours
+            cache_key = f"{CacheManager.PREFIXES['notification']}:subscription:{self.user.id}"
+            await sync_to_async(CacheManager.set)(cache_key, notification_types, 86400)  # 24 hours
             
             await self.send(text_data=json.dumps({
                 'type': 'subscription_updated',
@@ -0,0 +1,287 @@
+# daily_stats_manager.py - Incrementally maintained per-day booking rollups
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import Count, Max, Min, Sum
+from django.db.models.functions import ExtractHour
+from django.utils import timezone
+from typing import Dict, Iterable, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class DailyStatsManager:
+    """
+    Maintain and read BusinessDailyStats rollups
+
+    Every booking contributes one to its status count and its appointment
+    hour, and its price to the revenue while completed, on the row of its
+    business and appointment date. Signals move that contribution between
+    rows once a booking change commits, and count a customer as new on the
+    day their first booking with the business was made. Bulk writes bypass
+    the signals and rebuild the days they touched instead. The
+    reconcile_daily_stats command rebuilds recent days, or the full history
+    with --backfill, to repair any drift.
+    """
+
+    HOURS = 24
+    RECONCILE_DAYS_BACK = 7
+    RECONCILE_DAYS_AHEAD = 30
+
+    @classmethod
+    def contribution(cls, snapshot: Tuple) -> Optional[Tuple]:
+        """
+        Normalize a (business_id, date, time, status, total_price) snapshot
+
+        Returns (business_id, date, hour, status, revenue), or None when the
+        status is not tracked.
+        """
+        from .models import Booking, BusinessDailyStats
+
+        business_id, appointment_date, appointment_time, status, total_price = snapshot
+        if status not in BusinessDailyStats.STATUS_FIELDS:
+            return None
+
+        appointment_date = Booking._meta.get_field('appointment_date').to_python(appointment_date)
+        appointment_time = Booking._meta.get_field('appointment_time').to_python(appointment_time)
+        revenue = Decimal(str(total_price or 0)) if status == 'completed' else Decimal(0)
+        return business_id, appointment_date, appointment_time.hour, status, revenue
+
+    @classmethod
+    def apply_booking_change(cls, previous: Optional[Tuple], current: Optional[Tuple],
+                             booking_id: int = None, customer_id: int = None):
+        """
+        Move a booking's contribution from its previous to its current row
+
+        ``previous`` and ``current`` are booking snapshots, None for a
+        created or deleted booking. With ``booking_id`` and ``customer_id``
+        the booking was just created, and counts a new customer when it is
+        the customer's first with the business.
+        """
+        from .models import Booking
+
+        deltas = defaultdict(lambda: {'fields': defaultdict(int), 'hours': defaultdict(int), 'revenue': Decimal(0)})
+        try:
+            for snapshot, sign in ((previous, -1), (current, 1)):
+                contribution = cls.contribution(snapshot) if snapshot else None
+                if contribution is None:
+                    continue
+                business_id, appointment_date, hour, status, revenue = contribution
+                delta = deltas[(business_id, appointment_date)]
+                delta['fields'][cls._status_field(status)] += sign
+                delta['hours'][hour] += sign
+                delta['revenue'] += sign * revenue
+
+            if booking_id and current:
+                business_id = current[0]
+                earlier = Booking.objects.filter(
+                    business_id=business_id, customer_id=customer_id, id__lt=booking_id
+                ).exists()
+                if not earlier:
+                    deltas[(business_id, timezone.localdate())]['fields']['new_customers'] += 1
+
+            for (business_id, day), delta in deltas.items():
+                cls._apply_delta(business_id, day, delta)
+        except Exception as e:
+            logger.error(f"Daily stats update failed for booking {booking_id}: {str(e)}")
+
+    @classmethod
+    def _apply_delta(cls, business_id: int, day: date, delta: Dict):
+        from .models import BusinessDailyStats
+
+        fields = {field: change for field, change in delta['fields'].items() if change}
+        hours = {hour: change for hour, change in delta['hours'].items() if change}
+        if not fields and not hours and not delta['revenue']:
+            return
+
+        with transaction.atomic():
+            stats, _ = BusinessDailyStats.objects.select_for_update().get_or_create(
+                business_id=business_id, date=day
+            )
+            for field, change in fields.items():
+                setattr(stats, field, max(0, getattr(stats, field) + change))
+            hourly = stats.hourly_bookings or [0] * cls.HOURS
+            for hour, change in hours.items():
+                hourly[hour] = max(0, hourly[hour] + change)
+            stats.hourly_bookings = hourly
+            stats.revenue += delta['revenue']
+            stats.save()
+
+    @classmethod
+    def rebuild_on_commit(cls, business_id: int, dates: Iterable[date]):
+        """Rebuild the days touched by a bulk write once it commits"""
+        dates = {*dates, timezone.localdate()}  # new customers are counted on the day of booking
+
+        def rebuild():
+            try:
+                cls.rebuild(business_id, min(dates), max(dates))
+            except Exception as e:
+                logger.error(f"Daily stats rebuild failed for business {business_id}: {str(e)}")
+
+        transaction.on_commit(rebuild)
+
+    @classmethod
+    def compute(cls, business_id: int, date_from: date, date_to: date) -> Dict[date, Dict]:
+        """Rollup values of the days in a range with any bookings, from the bookings themselves"""
+        from .models import Booking
+
+        days = defaultdict(cls._empty_values)
+        bookings = Booking.objects.filter(business_id=business_id)
+
+        grouped = bookings.filter(
+            appointment_date__range=[date_from, date_to]
+        ).values(
+            'appointment_date', 'status', hour=ExtractHour('appointment_time')
+        ).annotate(count=Count('id'), revenue=Sum('total_price')).order_by()
+
+        for row in grouped:
+            field = cls._status_field(row['status'])
+            if field is None:
+                continue
+            values = days[row['appointment_date']]
+            values[field] += row['count']
+            values['hourly_bookings'][row['hour']] += row['count']
+            if row['status'] == 'completed':
+                values['revenue'] += row['revenue'] or 0
+
+        first_bookings = bookings.values('customer').annotate(
+            first_booking=Min('created_at')
+        ).filter(first_booking__date__range=[date_from, date_to]).values_list('first_booking', flat=True)
+
+        for first_booking in first_bookings:
+            days[timezone.localdate(first_booking)]['new_customers'] += 1
+
+        return dict(days)
+
+    @classmethod
+    def rebuild(cls, business_id: int, date_from: date, date_to: date) -> int:
+        """Replace the rollup rows of a date range with recomputed ones, returning how many were wrong"""
+        from .models import BusinessDailyStats
+
+        computed = cls.compute(business_id, date_from, date_to)
+        fields = [*BusinessDailyStats.STATUS_FIELDS.values(), 'revenue', 'new_customers', 'hourly_bookings']
+
+        with transaction.atomic():
+            existing = {
+                stats.date: stats for stats in BusinessDailyStats.objects.select_for_update().filter(
+                    business_id=business_id, date__range=[date_from, date_to]
+                )
+            }
+
+            created, updated = [], []
+            for day, values in computed.items():
+                stats = existing.pop(day, None)
+                if stats is None:
+                    created.append(BusinessDailyStats(business_id=business_id, date=day, **values))
+                elif any(getattr(stats, field) != values[field] for field in fields):
+                    for field in fields:
+                        setattr(stats, field, values[field])
+                    stats.updated_at = timezone.now()
+                    updated.append(stats)
+
+            # Rows left over belong to days that no longer have bookings
+            stale = [stats for stats in existing.values() if not cls._is_empty(stats)]
+
+            BusinessDailyStats.objects.bulk_create(created)
+            BusinessDailyStats.objects.bulk_update(updated, [*fields, 'updated_at'])
+            BusinessDailyStats.objects.filter(id__in=[stats.id for stats in existing.values()]).delete()
+
+        return len(created) + len(updated) + len(stale)
+
+    @classmethod
+    def history_range(cls, business_id: int) -> Optional[Tuple[date, date]]:
+        """First and last day a business's bookings can contribute to, None without bookings"""
+        from .models import Booking
+
+        bounds = Booking.objects.filter(business_id=business_id).aggregate(
+            first_date=Min('appointment_date'), last_date=Max('appointment_date'),
+            first_created=Min('created_at')
+        )
+        if bounds['first_date'] is None:
+            return None
+        today = timezone.localdate()
+        return (
+            min(bounds['first_date'], timezone.localdate(bounds['first_created']), today),
+            max(bounds['last_date'], today)
+        )
+
+    @classmethod
+    def reconcile(cls, business_ids: Iterable[int] = None, backfill: bool = False,
+                  days_back: int = None, days_ahead: int = None) -> Dict:
+        """
+        Rebuild the rollups of businesses and report how many rows had drifted
+
+        Recent days are rebuilt by default; ``backfill`` rebuilds each
+        business's whole booking history.
+        """
+        from accounts.models import BusinessProfile
+
+        days_back = cls.RECONCILE_DAYS_BACK if days_back is None else days_back
+        days_ahead = cls.RECONCILE_DAYS_AHEAD if days_ahead is None else days_ahead
+        today = timezone.localdate()
+
+        businesses = BusinessProfile.objects.order_by('id')
+        if business_ids:
+            businesses = businesses.filter(id__in=business_ids)
+
+        report = {'businesses': 0, 'corrected': 0, 'failed': 0}
+        for business_id in businesses.values_list('id', flat=True):
+            try:
+                if backfill:
+                    window = cls.history_range(business_id)
+                    if window is None:
+                        continue
+                else:
+                    window = (today - timedelta(days=days_back), today + timedelta(days=days_ahead))
+                report['corrected'] += cls.rebuild(business_id, *window)
+                report['businesses'] += 1
+            except Exception as e:
+                logger.error(f"Daily stats reconcile failed for business {business_id}: {str(e)}")
+                report['failed'] += 1
+        return report
+
+    @classmethod
+    def summary(cls, business_id: int, date_from: date, date_to: date) -> Dict:
+        """Totals of a business's rollup rows over a date range, with the rows themselves"""
+        from .models import BusinessDailyStats
+
+        rows = list(BusinessDailyStats.objects.filter(
+            business_id=business_id, date__range=[date_from, date_to]
+        ).order_by('date'))
+
+        status_counts = {
+            status: sum(getattr(stats, field) for stats in rows)
+            for status, field in BusinessDailyStats.STATUS_FIELDS.items()
+        }
+        hourly = [0] * cls.HOURS
+        for stats in rows:
+            for hour, count in enumerate(stats.hourly_bookings or []):
+                hourly[hour] += count
+
+        return {
+            'days': rows,
+            'status_counts': status_counts,
+            'total_bookings': sum(status_counts.values()),
+            'revenue': sum((stats.revenue for stats in rows), Decimal(0)),
+            'new_customers': sum(stats.new_customers for stats in rows),
+            'hourly_bookings': hourly,
+        }
+
+    @classmethod
+    def _status_field(cls, status: str) -> Optional[str]:
+        from .models import BusinessDailyStats
+        return BusinessDailyStats.STATUS_FIELDS.get(status)
+
+    @classmethod
+    def _empty_values(cls) -> Dict:
+        from .models import BusinessDailyStats
+
+        values = {field: 0 for field in BusinessDailyStats.STATUS_FIELDS.values()}
+        values.update({'revenue': Decimal(0), 'new_customers': 0, 'hourly_bookings': [0] * cls.HOURS})
+        return values
+
+    @staticmethod
+    def _is_empty(stats) -> bool:
+        return not (stats.total_bookings or stats.new_customers or stats.revenue)
@@ -0,0 +1,151 @@
+# dashboard_manager.py - Business dashboard statistics and their cached snapshot
+from django.db.models import Avg, Count, Min, Q, Sum
+from django.utils import timezone
+from datetime import timedelta
+from typing import Dict
+import logging
+
+from .cache_manager import CacheManager
+
+logger = logging.getLogger(__name__)
+
+
+class DashboardManager:
+    """
+    Build and cache the business dashboard
+
+    The serialized dashboard is cached per business and day under the
+    business namespace, so any booking, service or review change of the
+    business retires it. warm_caches builds snapshots ahead of the morning
+    rush; a request that misses rebuilds it single-flight.
+    """
+
+    CACHE_TIMEOUT = 'long'
+    SOFT_TIMEOUT = 'medium'
+    LIST_SIZE = 5  # entries in the top services and activity lists
+    STATUSES = ('pending', 'confirmed', 'completed', 'cancelled')
+
+    @classmethod
+    def cache_key(cls, business_id: int, today=None) -> str:
+        today = today or timezone.now().date()
+        return CacheManager.generate_key(
+            CacheManager.PREFIXES['business'], business_id, f"dashboard:{today.isoformat()}"
+        )
+
+    @classmethod
+    def get_dashboard(cls, business_profile, background: bool = True) -> Dict:
+        """Get the serialized dashboard of a business, building it on a miss"""
+        return CacheManager.get_or_set(
+            cls.cache_key(business_profile.id),
+            lambda: cls.build_dashboard(business_profile),
+            cls.CACHE_TIMEOUT,
+            soft_timeout=cls.SOFT_TIMEOUT,
+            background=background
+        )
+
+    @classmethod
+    def build_dashboard(cls, business_profile) -> Dict:
+        """
+        Compute the serialized dashboard for the current month
+
+        Counts and revenue come from one conditional aggregate over the
+        business's bookings, customer retention from one aggregate over its
+        customers and the rating from one over its reviews; the rest are the
+        short lists.
+        """
+        from .models import Booking, Review
+        from .serializers import BusinessDashboardSerializer
+
+        # Date filters
+        today = timezone.now().date()
+        this_month_start = today.replace(day=1)
+        last_month_start = (this_month_start - timedelta(days=1)).replace(day=1)
+        this_period = Q(appointment_date__gte=this_month_start)
+        last_period = Q(appointment_date__gte=last_month_start, appointment_date__lt=this_month_start)
+        completed = Q(status='completed')
+
+        # Booking and revenue statistics
+        bookings = Booking.objects.filter(business=business_profile)
+        stats = bookings.aggregate(
+            total_bookings=Count('id'),
+            period_bookings=Count('id', filter=this_period),
+            last_period_bookings=Count('id', filter=last_period),
+            total_revenue=Sum('total_price', filter=completed),
+            period_revenue=Sum('total_price', filter=completed & this_period),
+            last_period_revenue=Sum('total_price', filter=completed & last_period),
+            **{
+                f"{booking_status}_bookings": Count('id', filter=Q(status=booking_status))
+                for booking_status in cls.STATUSES
+            }
+        )
+        period_revenue = stats['period_revenue'] or 0
+        last_period_revenue = stats['last_period_revenue'] or 0
+
+        # Customer statistics
+        customers = bookings.values('customer').annotate(
+            visits=Count('id'), first_booking=Min('created_at')
+        ).aggregate(
+            total=Count('customer'),
+            returning=Count('customer', filter=Q(visits__gt=1)),
+            new=Count('customer', filter=Q(first_booking__date__gte=this_month_start))
+        )
+
+        # Review statistics
+        reviews = Review.objects.filter(booking__business=business_profile)
+        review_stats = reviews.aggregate(average=Avg('rating'), total=Count('id'))
+        average_rating = review_stats['average'] or 0
+
+        top_services = bookings.filter(this_period).values('service__name').annotate(
+            bookings=Count('id'), revenue=Sum('total_price')
+        ).order_by('-bookings')[:cls.LIST_SIZE]
+
+        dashboard_data = {
+            'total_bookings': stats['total_bookings'],
+            'period_bookings': stats['period_bookings'],
+            'total_revenue': stats['total_revenue'] or 0,
+            'period_revenue': period_revenue,
+            'pending_bookings': stats['pending_bookings'],
+            'confirmed_bookings': stats['confirmed_bookings'],
+            'completed_bookings': stats['completed_bookings'],
+            'cancelled_bookings': stats['cancelled_bookings'],
+            'total_customers': customers['total'],
+            'new_customers_this_period': customers['new'],
+            'customer_retention_rate': cls._percentage(customers['returning'], customers['total']),
+            'average_rating': round(float(average_rating), 2) if average_rating else 0,
+            'total_reviews': review_stats['total'],
+            'booking_growth_rate': cls._growth(stats['period_bookings'], stats['last_period_bookings']),
+            'revenue_growth_rate': cls._growth(period_revenue, last_period_revenue),
+            'top_services': [
+                {'name': row['service__name'], 'bookings': row['bookings'], 'revenue': float(row['revenue'] or 0)}
+                for row in top_services
+            ],
+            # Upcoming bookings (next 7 days)
+            'upcoming_bookings': bookings.filter(
+                appointment_date__gte=today,
+                appointment_date__lte=today + timedelta(days=7),
+                status__in=['pending', 'confirmed']
+            ).select_related('business__user', 'customer', 'service').order_by(
+                'appointment_date', 'appointment_time'
+            )[:cls.LIST_SIZE],
+            'recent_bookings': bookings.select_related(
+                'business__user', 'customer', 'service'
+            ).order_by('-created_at')[:cls.LIST_SIZE],
+            'recent_reviews': reviews.select_related(
+                'booking__business__user', 'booking__customer', 'booking__service'
+            ).order_by('-created_at')[:cls.LIST_SIZE],
+            'period_start': this_month_start,
+            'period_end': today,
+        }
+
+        return dict(BusinessDashboardSerializer(dashboard_data).data)
+
+    @staticmethod
+    def _percentage(part, whole) -> float:
+        return round(part / whole * 100, 2) if whole else 0.0
+
+    @staticmethod
+    def _growth(current, previous) -> float:
+        """Change against the previous period in percent"""
+        if not previous:
+            return 0.0
+        return round(float(current - previous) / float(previous) * 100, 2)
@@ -0,0 +1,283 @@
+# import_manager.py - Bulk booking import for businesses migrating from other systems
+from django.db import transaction
+from decimal import Decimal, InvalidOperation
+from typing import Dict, Iterable, Iterator, List
+import bisect
+import csv
+import json
+import logging
+
+from .booking_manager import BookingManager
+from .cache_manager import CacheManager, OccupancyCacheManager
+from .daily_stats_manager import DailyStatsManager
+
+logger = logging.getLogger(__name__)
+
+
+class BookingImportManager:
+    """
+    Streaming importer for existing appointments
+
+    Rows are read lazily and processed in chunks. Each chunk resolves its
+    customers with one lookup, checks conflicts against an in-memory interval
+    index and writes its bookings with a single bulk insert. QR codes are not
+    generated during import; the booking QR endpoint creates them on demand.
+    """
+
+    CHUNK_SIZE = 500
+    FORMATS = ['csv', 'jsonl', 'json']
+    REQUIRED_FIELDS = ['customer_name', 'customer_phone', 'appointment_date', 'appointment_time']
+    DEFAULT_STATUS = 'confirmed'
+
+    @classmethod
+    def read_rows(cls, stream, file_format: str = 'csv') -> Iterator[Dict]:
+        """
+        Iterate over booking rows from a text stream
+
+        CSV and JSON Lines are streamed row by row. Plain JSON must be an
+        array and is loaded as a whole.
+        """
+        if file_format == 'csv':
+            yield from csv.DictReader(stream)
+        elif file_format == 'jsonl':
+            for line in stream:
+                if line.strip():
+                    yield json.loads(line)
+        elif file_format == 'json':
+            yield from json.load(stream)
+        else:
+            raise ValueError(f'Unsupported import format: {file_format}')
+
+    @classmethod
+    def import_bookings(cls, business, rows: Iterable[Dict], chunk_size: int = None,
+                        dry_run: bool = False) -> Dict:
+        """
+        Import bookings for a business
+
+        Args:
+            business: BusinessProfile receiving the bookings
+            rows: Iterable of row dictionaries
+            chunk_size: Rows written per transaction
+            dry_run: Validate every row without writing anything
+
+        Returns:
+            Dictionary with counts and a per-row error report
+        """
+        from .models import Service
+
+        chunk_size = chunk_size or cls.CHUNK_SIZE
+        services = list(Service.objects.filter(business=business, is_active=True))
+        services_by_key = {str(service.id): service for service in services}
+        services_by_key.update({service.name.strip().lower(): service for service in services})
+
+        report = {'success': True, 'total_rows': 0, 'imported': 0, 'failed': 0, 'errors': []}
+        occupancy = {}
+        chunk = []
+
+        try:
+            for row_number, row in enumerate(rows, start=1):
+                report['total_rows'] += 1
+                parsed = cls._parse_row(row, services_by_key)
+                if 'error' in parsed:
+                    cls._add_error(report, row_number, parsed)
+                    continue
+
+                chunk.append((row_number, parsed))
+                if len(chunk) >= chunk_size:
+                    cls._import_chunk(business, chunk, occupancy, report, dry_run)
+                    chunk = []
+                    if not dry_run:
+                        # Written rows are in the database now; reload under the next lock
+                        occupancy.clear()
+
+            if chunk:
+                cls._import_chunk(business, chunk, occupancy, report, dry_run)
+
+        except (ValueError, csv.Error) as e:
+            logger.error(f"Booking import aborted for business {business.id}: {str(e)}")
+            report.update({
+                'success': False,
+                'error': f'Could not read import file: {str(e)}',
+                'error_code': 'INVALID_FILE'
+            })
+
+        finally:
+            if report['imported'] and not dry_run:
+                OccupancyCacheManager.invalidate_business(business.id)
+                CacheManager.invalidate_business_cache(business.id)
+
+        return report
+
+    @classmethod
+    def _parse_row(cls, row: Dict, services_by_key: Dict) -> Dict:
+        """Validate and normalize a single row"""
+        from .models import Booking
+
+        if not isinstance(row, dict):
+            return {'error': 'Row must be an object', 'error_code': 'INVALID_ROW'}
+
+        row = {key.strip(): str(value).strip() if value is not None else ''
+               for key, value in row.items() if key}
+
+        for field in cls.REQUIRED_FIELDS:
+            if not row.get(field):
+                return {'error': f'Missing required field: {field}', 'error_code': 'MISSING_FIELD'}
+
+        service = services_by_key.get(row.get('service_id', '')) or \
+            services_by_key.get(row.get('service_name', '').lower())
+        if not service:
+            return {'error': 'Service not found', 'error_code': 'SERVICE_NOT_FOUND'}
+
+        phone = row['customer_phone']
+        if not phone.startswith('+966') or len(phone) != 13 or not phone[4:].isdigit():
+            return {
+                'error': 'Invalid phone number format. Use +966xxxxxxxxx',
+                'error_code': 'INVALID_PHONE'
+            }
+
+        try:
+            appointment_date, appointment_time = BookingManager._parse_appointment(row)
+        except ValueError:
+            return {
+                'error': 'Invalid date or time format. Use YYYY-MM-DD and HH:MM',
+                'error_code': 'INVALID_DATETIME'
+            }
+
+        status = row.get('status') or cls.DEFAULT_STATUS
+        if status not in dict(Booking.STATUS_CHOICES):
+            return {'error': f'Invalid status: {status}', 'error_code': 'INVALID_STATUS'}
+
+        try:
+            total_price = Decimal(row['total_price']) if row.get('total_price') else service.price
+        except InvalidOperation:
+            return {'error': 'Invalid total price', 'error_code': 'INVALID_PRICE'}
+
+        return {
+            'service': service,
+            'customer_name': row['customer_name'],
+            'customer_phone': phone,
+            'customer_email': row.get('customer_email', ''),
+            'appointment_date': appointment_date,
+            'appointment_time': appointment_time,
+            'status': status,
+            'total_price': total_price,
+            'notes': row.get('notes', ''),
+        }
+
+    @classmethod
+    def _import_chunk(cls, business, chunk: List, occupancy: Dict, report: Dict, dry_run: bool):
+        """Check conflicts for a chunk and write its bookings in one transaction"""
+        from .models import Booking
+
+        dates = {parsed['appointment_date'] for _, parsed in chunk}
+
+        with transaction.atomic():
+            if not dry_run:
+                BookingManager._lock_business_days(business, dates)
+            cls._load_occupancy(business, dates, occupancy)
+
+            accepted = []
+            for row_number, parsed in chunk:
+                intervals = occupancy.setdefault(parsed['appointment_date'], [])
+                start = BookingManager._to_minutes(parsed['appointment_time'])
+                end = start + BookingManager._duration_minutes(parsed['service'].duration)
+
+                if parsed['status'] in BookingManager.ACTIVE_STATUSES:
+                    conflict = BookingManager._find_conflict(
+                        intervals, start, end, business.booking_capacity
+                    )
+                    if conflict['has_conflict']:
+                        cls._add_error(report, row_number, {
+                            'error': conflict['reason'], 'error_code': 'TIME_CONFLICT'
+                        })
+                        continue
+                    bisect.insort(intervals, (start, end))
+
+                accepted.append(parsed)
+
+            if not accepted:
+                return
+
+            if dry_run:
+                report['imported'] += len(accepted)
+                return
+
+            customers = cls._resolve_customers(accepted)
+            bookings = []
+            for parsed in accepted:
+                appointment_start, appointment_end = Booking.compute_span(
+                    parsed['appointment_date'], parsed['appointment_time'],
+                    parsed['service'].duration
+                )
+                bookings.append(Booking(
+                    business=business,
+                    service=parsed['service'],
+                    customer=customers[(parsed['customer_phone'], parsed['customer_name'])],
+                    appointment_date=parsed['appointment_date'],
+                    appointment_time=parsed['appointment_time'],
+                    appointment_start=appointment_start,
+                    appointment_end=appointment_end,
+                    status=parsed['status'],
+                    total_price=parsed['total_price'],
+                    notes=parsed['notes'],
+                    booking_method='phone',
+                ))
+
+            Booking.objects.bulk_create(bookings, batch_size=cls.CHUNK_SIZE)
+            DailyStatsManager.rebuild_on_commit(business.id, {booking.appointment_date for booking in bookings})
+            report['imported'] += len(bookings)
+
+    @classmethod
+    def _load_occupancy(cls, business, dates, occupancy: Dict):
+        """Load existing bookings for dates not yet in the in-memory index"""
+        missing = sorted(date for date in dates if date not in occupancy)
+        if not missing:
+            return
+
+        loaded = BookingManager._load_occupancy(business, missing[0], missing[-1])
+        for date in missing:
+            occupancy[date] = [(start, end) for start, end, _ in loaded.get(date, [])]
+
+    @classmethod
+    def _resolve_customers(cls, accepted: List[Dict]) -> Dict:
+        """
+        Fetch or create the customers of a chunk with one insert
+
+        Customers created concurrently by bookings or other imports are
+        skipped by the insert and picked up by the second lookup.
+        """
+        from .models import Customer
+
+        wanted = {}
+        for parsed in accepted:
+            key = (parsed['customer_phone'], parsed['customer_name'])
+            wanted.setdefault(key, parsed['customer_email'])
+
+        def lookup():
+            return {
+                (customer.phone_number, customer.name): customer
+                for customer in Customer.objects.filter(
+                    phone_number__in={phone for phone, _ in wanted}
+                )
+            }
+
+        customers = lookup()
+        new_customers = [
+            Customer(phone_number=phone, name=name, email=email)
+            for (phone, name), email in wanted.items()
+            if (phone, name) not in customers
+        ]
+        if new_customers:
+            Customer.objects.bulk_create(new_customers, ignore_conflicts=True)
+            customers = lookup()
+
+        return customers
+
+    @classmethod
+    def _add_error(cls, report: Dict, row_number: int, error: Dict):
+        report['failed'] += 1
+        report['errors'].append({
+            'row': row_number,
+            'error': error['error'],
+            'error_code': error['error_code']
+        })
@@ -0,0 +1,366 @@
+# load_test_manager.py - Concurrent load test of the public booking path
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from datetime import time, timedelta
+from unittest.mock import patch
+from django.db import connection
+from django.db.models import Q
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+from typing import Dict, List
+import os
+import random
+import secrets
+import tempfile
+import threading
+import time as clock
+import uuid
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class LoadTestManager:
+    """
+    Simulate a booking rush against the public API in-process
+
+    Every simulated customer behaves like the public booking page: it loads
+    the free slots, races other customers for one of the earliest slots,
+    retries once on a conflict and sometimes cancels again. Customers are
+    served by a pool of threads, each with its own database connection and
+    test client, so requests really contend for the same rows and locks.
+
+    Runs use a throwaway business whose customers share PHONE_PREFIX and
+    CUSTOMER_NAME; the fixture is removed afterwards together with every
+    booking, notification and queued outbox message it produced. The
+    load_test_booking command runs inside isolated_database(), so no
+    request ever touches the configured database or cache, and booking
+    notifications are never queued during a run.
+    """
+
+    CUSTOMERS = 200
+    CONCURRENCY = 50
+    HOT_SLOTS = 3  # customers race for the earliest few free slots
+    CANCEL_RATE = 0.2
+    BOOKING_ATTEMPTS = 2
+    PHONE_PREFIX = '+96600'  # no Saudi number starts with 0 after the country code
+    CUSTOMER_NAME = 'Load Customer'
+
+    @classmethod
+    def create_fixture(cls, days_ahead: int = 7, capacity: int = 1,
+                       duration: int = 30, open_time: time = time(9, 0),
+                       close_time: time = time(21, 0)) -> Dict:
+        """Create a business open for one day, with a single service"""
+        from django.contrib.auth import get_user_model
+        from accounts.models import BusinessProfile
+        from .models import Service, BusinessHours
+
+        token = secrets.token_hex(4)
+        date = timezone.now().date() + timedelta(days=days_ahead)
+
+        user = get_user_model().objects.create_user(
+            email=f'loadtest-{token}@example.com',
+            password=secrets.token_urlsafe(16),
+            business_name=f'Load Test {token}',
+            phone_number=f'{cls.PHONE_PREFIX}{int(token, 16) % 10 ** 7:07d}',
+            is_verified=True
+        )
+        business = BusinessProfile.objects.create(
+            user=user,
+            service_type='barber',
+            address='Load test',
+            booking_capacity=capacity
+        )
+        service = Service.objects.create(
+            business=business,
+            name='Load Test Service',
+            price=50,
+            duration=timedelta(minutes=duration)
+        )
+        BusinessHours.objects.create(
+            business=business,
+            day=date.strftime('%A').lower(),
+            open_time=open_time,
+            close_time=close_time
+        )
+
+        return {'business': business, 'service': service, 'date': date}
+
+    @classmethod
+    def remove_fixture(cls, business, customers: int = None) -> int:
+        """
+        Delete a fixture business with everything its run produced
+
+        Customers are the ones who booked with the business plus those with
+        the phone numbers a run of ``customers`` generated; customers who
+        also booked elsewhere are kept.
+        """
+        from .models import Booking, Customer, Notification, OutboxMessage
+
+        bookings = Booking.objects.filter(business=business)
+        booking_ids = [str(booking_id) for booking_id in bookings.values_list('booking_id', flat=True)]
+
+        # Customers who lost every race have no booking to find them by
+        customer_filter = Q(id__in=bookings.values('customer_id'))
+        if customers:
+            customer_filter |= Q(
+                phone_number__in=[cls._phone(index) for index in range(customers)],
+                name__startswith=cls.CUSTOMER_NAME
+            )
+        customer_ids = list(
+            Customer.objects.filter(customer_filter).exclude(
+                id__in=Booking.objects.exclude(business=business).values('customer_id')
+            ).values_list('id', flat=True)
+        )
+
+        notifications = Notification.objects.filter(Q(user=business.user) | Q(customer_id__in=customer_ids))
+        outbox_filter = Q(notification__in=notifications)
+        for booking_id in booking_ids:
+            outbox_filter |= Q(dedup_key__endswith=f':{booking_id}')
+        OutboxMessage.objects.filter(outbox_filter).delete()
+
+        bookings.delete()
+        Customer.objects.filter(id__in=customer_ids).delete()
+        business.user.delete()
+        return len(booking_ids)
+
+    @classmethod
+    @contextmanager
+    def isolated_database(cls):
+        """
+        Run the block against a freshly migrated database and a private cache
+
+        The configured database and cache stay untouched; the throwaway
+        database is destroyed on exit. SQLite gets a temporary file, as the
+        worker threads cannot share an in-memory database.
+        """
+        test_settings = connection.settings_dict.setdefault('TEST', {})
+        configured_name = test_settings.get('NAME')
+        # Never the configured test database name, which a test run may be using
+        test_settings['NAME'] = (
+            os.path.join(tempfile.gettempdir(), f'loadtest-{secrets.token_hex(4)}.sqlite3')
+            if connection.vendor == 'sqlite'
+            else f"loadtest_{connection.settings_dict['NAME']}"
+        )
+
+        configured_database = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            with override_settings(CACHES={'default': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                'LOCATION': 'load-test',
+            }}):
+                yield
+        finally:
+            connection.creation.destroy_test_db(configured_database, verbosity=0)
+            test_settings['NAME'] = configured_name
+
+    @classmethod
+    def run(cls, business, service, date, customers: int = None, concurrency: int = None,
+            hot_slots: int = None, cancel_rate: float = None, seed: int = None) -> Dict:
+        """
+        Drive concurrent customers through slots, booking and cancellation
+
+        Returns latency percentiles, queries per request and status counts
+        for every endpoint, overall throughput, and the number of bookings
+        that exceed the business capacity once the run has finished.
+        """
+        customers = customers or cls.CUSTOMERS
+        concurrency = min(concurrency or cls.CONCURRENCY, customers)
+        plan = {
+            'business_id': business.id,
+            'service_id': service.id,
+            'date': date.strftime('%Y-%m-%d'),
+            'hot_slots': hot_slots or cls.HOT_SLOTS,
+            'cancel_rate': cls.CANCEL_RATE if cancel_rate is None else cancel_rate,
+            'host': cls._allowed_host(),
+        }
+
+        pending = list(range(customers))
+        pending_lock = threading.Lock()
+        barrier = threading.Barrier(concurrency)
+        samples = []
+
+        def worker(worker_index):
+            rng = random.Random(None if seed is None else seed + worker_index)
+            worker_samples = []
+            try:
+                barrier.wait()
+                while True:
+                    with pending_lock:
+                        if not pending:
+                            break
+                        customer_index = pending.pop()
+                    worker_samples.extend(cls._simulate_customer(customer_index, plan, rng))
+            except Exception as e:
+                logger.error(f"Load test worker {worker_index} failed: {str(e)}")
+            finally:
+                connection.close()
+                samples.extend(worker_samples)
+
+        from .booking_manager import BookingManager
+
+        threads = [threading.Thread(target=worker, args=(index,)) for index in range(concurrency)]
+        # Simulated customers must never be sent WhatsApp messages
+        with patch.object(BookingManager, '_send_booking_notifications'):
+            started = clock.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = clock.perf_counter() - started
+
+        return cls._build_report(samples, elapsed, business, date, customers, concurrency)
+
+    @classmethod
+    def _simulate_customer(cls, index: int, plan: Dict, rng: random.Random) -> List[Dict]:
+        """Run one customer's visit and return a sample for every request"""
+        # Distinct addresses keep the per-IP throttles out of the measurement
+        client = Client(
+            HTTP_HOST=plan['host'],
+            REMOTE_ADDR=f'10.{index // 65536 % 256}.{index // 256 % 256}.{index % 256}'
+        )
+        phone = cls._phone(index)
+        samples = []
+
+        slots_path = f"/api/base/public/business/{plan['business_id']}/service/{plan['service_id']}/slots/"
+        booking_id = None
+
+        for _ in range(cls.BOOKING_ATTEMPTS):
+            response, sample = cls._request(client, 'slots', 'get', slots_path, {'date': plan['date']})
+            samples.append(sample)
+            slots = response.json().get('available_slots', []) if response.status_code == 200 else []
+            if not slots:
+                break
+
+            response, sample = cls._request(client, 'book', 'post', '/api/base/public/booking/', {
+                'business_id': plan['business_id'],
+                'service_id': plan['service_id'],
+                'customer_name': f'{cls.CUSTOMER_NAME} {index}',
+                'customer_phone': phone,
+                'appointment_date': plan['date'],
+                'appointment_time': rng.choice(slots[:plan['hot_slots']]),
+            })
+            samples.append(sample)
+            if response.status_code == 201:
+                booking_id = response.json()['booking_id']
+                break
+            if response.status_code != 409:
+                break
+
+        if booking_id and rng.random() < plan['cancel_rate']:
+            _, sample = cls._request(client, 'cancel', 'post', '/api/base/public/booking/cancel/', {
+                'booking_id': booking_id,
+                'phone_number': phone,
+                'reason': 'Load test'
+            })
+            samples.append(sample)
+
+        return samples
+
+    @classmethod
+    def _phone(cls, index: int) -> str:
+        return f'{cls.PHONE_PREFIX}{index + 1:07d}'
+
+    @staticmethod
+    def _allowed_host() -> str:
+        """Pick a host name the project accepts, outside the test runner too"""
+        from django.conf import settings
+
+        for host in settings.ALLOWED_HOSTS:
+            if host and '*' not in host and not host.startswith('.'):
+                return host
+        return 'localhost'
+
+    @staticmethod
+    def _request(client: Client, endpoint: str, method: str, path: str, data: Dict):
+        """Send one request and measure its latency and query count"""
+        headers = {}
+        if method == 'post':
+            headers['HTTP_IDEMPOTENCY_KEY'] = str(uuid.uuid4())
+
+        with CaptureQueriesContext(connection) as queries:
+            started = clock.perf_counter()
+            response = getattr(client, method)(path, data, **headers)
+            latency = clock.perf_counter() - started
+
+        return response, {
+            'endpoint': endpoint,
+            'status': response.status_code,
+            'latency': latency,
+            'queries': len(queries),
+        }
+
+    @staticmethod
+    def _percentile(sorted_values: List[float], percentile: float) -> float:
+        """Nearest-rank percentile of an already sorted list"""
+        if not sorted_values:
+            return 0.0
+        rank = max(int(round(percentile / 100 * len(sorted_values))) - 1, 0)
+        return sorted_values[min(rank, len(sorted_values) - 1)]
+
+    @classmethod
+    def count_double_bookings(cls, business, date) -> int:
+        """
+        Count active bookings that should have been rejected
+
+        Bookings are replayed in creation order against the business
+        capacity; every booking that would not have fit is a double booking.
+        """
+        from .booking_manager import BookingManager
+        from .models import Booking
+
+        bookings = Booking.objects.filter(
+            business=business,
+            appointment_date=date,
+            status__in=BookingManager.ACTIVE_STATUSES
+        ).select_related('service').order_by('created_at', 'id')
+
+        accepted = []
+        double_bookings = 0
+        for booking in bookings:
+            start = BookingManager._to_minutes(booking.appointment_time)
+            end = start + BookingManager._duration_minutes(booking.service.duration)
+            if BookingManager._find_conflict(accepted, start, end, business.booking_capacity)['has_conflict']:
+                double_bookings += 1
+            else:
+                accepted.append((start, end))
+        return double_bookings
+
+    @classmethod
+    def _build_report(cls, samples: List[Dict], elapsed: float, business, date,
+                      customers: int, concurrency: int) -> Dict:
+        """Aggregate request samples into per-endpoint statistics"""
+        by_endpoint = defaultdict(list)
+        for sample in samples:
+            by_endpoint[sample['endpoint']].append(sample)
+
+        endpoints = {}
+        for endpoint, endpoint_samples in by_endpoint.items():
+            latencies = sorted(sample['latency'] * 1000 for sample in endpoint_samples)
+            endpoints[endpoint] = {
+                'requests': len(endpoint_samples),
+                'p50_ms': cls._percentile(latencies, 50),
+                'p95_ms': cls._percentile(latencies, 95),
+                'p99_ms': cls._percentile(latencies, 99),
+                'queries_per_request': sum(sample['queries'] for sample in endpoint_samples) / len(endpoint_samples),
+                'statuses': dict(Counter(sample['status'] for sample in endpoint_samples)),
+            }
+
+        book_statuses = endpoints.get('book', {}).get('statuses', {})
+        cancel_statuses = endpoints.get('cancel', {}).get('statuses', {})
+
+        return {
+            'customers': customers,
+            'concurrency': concurrency,
+            'requests': len(samples),
+            'duration': elapsed,
+            'throughput': len(samples) / elapsed if elapsed else 0.0,
+            'endpoints': endpoints,
+            'booked': book_statuses.get(201, 0),
+            'conflicts': book_statuses.get(409, 0),
+            'cancelled': cancel_statuses.get(200, 0),
+            'server_errors': sum(1 for sample in samples if sample['status'] >= 500),
+            'double_bookings': cls.count_double_bookings(business, date),
+        }
@@ -0,0 +1,61 @@
+from django.core.management.base import BaseCommand
+from base.cache_manager import CacheMetrics
+import json
+
+
+class Command(BaseCommand):
+    help = 'Show cache hit rates, writes, evictions and latencies per key prefix'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--json',
+            action='store_true',
+            help='Print the full statistics, including latency buckets, as JSON'
+        )
+
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Reset the counters after printing them'
+        )
+
+    def handle(self, *args, **options):
+        stats = CacheMetrics.snapshot()
+        backend = CacheMetrics.backend_stats()
+
+        if options['json']:
+            self.stdout.write(json.dumps({'prefixes': stats, 'backend': backend}, indent=2))
+        elif not stats:
+            self.stdout.write('No cache traffic recorded')
+        else:
+            self.stdout.write(
+                f"{'prefix':<20} {'hits':>8} {'misses':>8} {'hit rate':>8} {'local':>8} "
+                f"{'sets':>8} {'deletes':>8} {'evicted':>8} {'errors':>6}  get p50/p95/p99 ms"
+            )
+            for prefix, counts in stats.items():
+                hit_rate = '-' if counts['hit_rate'] is None else f"{counts['hit_rate']:.1%}"
+                latency = counts['get_latency']
+                percentiles = '/'.join(
+                    self._format_percentile(latency, name) for name in ('p50_ms', 'p95_ms', 'p99_ms')
+                )
+                self.stdout.write(
+                    f"{prefix:<20} {counts['hits']:>8} {counts['misses']:>8} {hit_rate:>8} "
+                    f"{counts['local_hits']:>8} {counts['sets']:>8} {counts['deletes']:>8} "
+                    f"{counts['evictions']:>8} {counts['errors']:>6}  {percentiles}"
+                )
+
+            if backend:
+                self.stdout.write(
+                    'Backend: ' + ', '.join(f'{name} {value}' for name, value in backend.items())
+                )
+
+        if options['reset']:
+            CacheMetrics.reset()
+            self.stdout.write(self.style.SUCCESS('Cache statistics reset'))
+
+    def _format_percentile(self, latency, name):
+        if not latency['count']:
+            return '-'
+        if latency[name] is None:
+            return f'>{CacheMetrics.LATENCY_BUCKETS[-1]:g}'
+        return f'{latency[name]:g}'
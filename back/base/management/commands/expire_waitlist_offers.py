@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+from base.waitlist_manager import WaitlistManager
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Pass waitlist offers that expired unclaimed on to the next matching waiter'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep checking for expired offers instead of exiting'
+        )
+
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=30.0,
+            help='Seconds to wait between checks in loop mode'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            report = WaitlistManager.reoffer_expired()
+
+            if report['expired']:
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f"Re-offered {report['reoffered']} of {report['expired']} expired waitlist offers"
+                    )
+                )
+            elif not options['loop']:
+                self.stdout.write('No expired offers')
+
+            if not options['loop']:
+                return
+
+            time.sleep(options['interval'])
@@ -0,0 +1,81 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from base.import_manager import BookingImportManager
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Import existing bookings for a business from a CSV, JSON Lines or JSON file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('business_id', type=int, help='Business profile receiving the bookings')
+        parser.add_argument('path', type=str, help='Path to the import file')
+
+        parser.add_argument(
+            '--format',
+            type=str,
+            choices=BookingImportManager.FORMATS,
+            help='File format (defaults to the file extension)'
+        )
+
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=BookingImportManager.CHUNK_SIZE,
+            help='Rows written per transaction'
+        )
+
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Validate rows and report errors without importing'
+        )
+
+    def handle(self, *args, **options):
+        from accounts.models import BusinessProfile
+
+        try:
+            business = BusinessProfile.objects.get(id=options['business_id'])
+        except BusinessProfile.DoesNotExist:
+            raise CommandError(f"Business {options['business_id']} not found")
+
+        file_format = options['format'] or os.path.splitext(options['path'])[1].lstrip('.').lower()
+        if file_format not in BookingImportManager.FORMATS:
+            raise CommandError(f'Unsupported import format: {file_format}')
+
+        if options['dry_run']:
+            self.stdout.write(
+                self.style.WARNING('DRY RUN MODE - No bookings will be imported')
+            )
+
+        start_time = timezone.now()
+
+        try:
+            with open(options['path'], encoding='utf-8-sig', newline='') as stream:
+                report = BookingImportManager.import_bookings(
+                    business,
+                    BookingImportManager.read_rows(stream, file_format),
+                    chunk_size=options['chunk_size'],
+                    dry_run=options['dry_run']
+                )
+        except OSError as e:
+            raise CommandError(f'Could not open import file: {str(e)}')
+
+        for error in report['errors']:
+            self.stdout.write(f"Row {error['row']}: {error['error']} ({error['error_code']})")
+
+        if not report['success']:
+            logger.error(f"Booking import failed: {report['error']}")
+            raise CommandError(report['error'])
+
+        duration = (timezone.now() - start_time).total_seconds()
+        verb = 'Validated' if options['dry_run'] else 'Imported'
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{verb} {report['imported']} of {report['total_rows']} bookings "
+                f"({report['failed']} failed) in {duration:.2f} seconds"
+            )
+        )
@@ -0,0 +1,117 @@
+from django.core.management.base import BaseCommand, CommandError
+from base.load_test_manager import LoadTestManager
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Load test the public slots, booking and cancellation endpoints with concurrent customers'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--customers',
+            type=int,
+            default=LoadTestManager.CUSTOMERS,
+            help='Simulated customers trying to book'
+        )
+
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=LoadTestManager.CONCURRENCY,
+            help='Customers served in parallel'
+        )
+
+        parser.add_argument(
+            '--hot-slots',
+            type=int,
+            default=LoadTestManager.HOT_SLOTS,
+            help='Earliest free slots customers race for'
+        )
+
+        parser.add_argument(
+            '--cancel-rate',
+            type=float,
+            default=LoadTestManager.CANCEL_RATE,
+            help='Share of successful customers who cancel again'
+        )
+
+        parser.add_argument(
+            '--capacity',
+            type=int,
+            default=1,
+            help='Parallel bookings the test business accepts per slot'
+        )
+
+        parser.add_argument(
+            '--duration',
+            type=int,
+            default=30,
+            help='Service duration in minutes'
+        )
+
+        parser.add_argument('--seed', type=int, help='Random seed for repeatable runs')
+
+        parser.add_argument(
+            '--json',
+            action='store_true',
+            help='Print the full report as JSON'
+        )
+
+    def handle(self, *args, **options):
+        if options['customers'] < 1 or options['concurrency'] < 1:
+            raise CommandError('--customers and --concurrency must be positive')
+
+        # The run gets a throwaway database and cache, destroyed afterwards
+        with LoadTestManager.isolated_database():
+            fixture = LoadTestManager.create_fixture(
+                capacity=options['capacity'], duration=options['duration']
+            )
+            self.stdout.write(
+                f"Running {options['customers']} customers with concurrency "
+                f"{options['concurrency']} against an isolated test database..."
+            )
+
+            report = LoadTestManager.run(
+                fixture['business'],
+                fixture['service'],
+                fixture['date'],
+                customers=options['customers'],
+                concurrency=options['concurrency'],
+                hot_slots=options['hot_slots'],
+                cancel_rate=options['cancel_rate'],
+                seed=options['seed']
+            )
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2, default=str))
+            return
+
+        for endpoint, stats in report['endpoints'].items():
+            statuses = ', '.join(f'{code}: {count}' for code, count in sorted(stats['statuses'].items()))
+            self.stdout.write(
+                f"{endpoint:<8} {stats['requests']:>6} requests  "
+                f"p50 {stats['p50_ms']:.1f}ms  p95 {stats['p95_ms']:.1f}ms  p99 {stats['p99_ms']:.1f}ms  "
+                f"{stats['queries_per_request']:.1f} queries/request  ({statuses})"
+            )
+
+        self.stdout.write(
+            f"{report['requests']} requests in {report['duration']:.2f} seconds "
+            f"({report['throughput']:.1f} requests/second); "
+            f"{report['booked']} booked, {report['conflicts']} conflicts, {report['cancelled']} cancelled"
+        )
+
+        if report['double_bookings'] or report['server_errors']:
+            logger.error(
+                f"Load test found {report['double_bookings']} double bookings "
+                f"and {report['server_errors']} server errors"
+            )
+            self.stdout.write(
+                self.style.ERROR(
+                    f"{report['double_bookings']} double bookings, {report['server_errors']} server errors"
+                )
+            )
+        else:
+            self.stdout.write(self.style.SUCCESS('No double bookings and no server errors'))
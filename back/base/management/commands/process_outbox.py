@@ -0,0 +1,71 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from base.outbox_manager import OutboxManager
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Send queued outbox messages (WhatsApp notifications) with retries'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=OutboxManager.BATCH_SIZE,
+            help='Messages claimed per batch'
+        )
+
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=OutboxManager.WORKERS,
+            help='Messages sent concurrently'
+        )
+
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep polling for new messages instead of exiting when drained'
+        )
+
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=2.0,
+            help='Seconds to wait between polls in loop mode'
+        )
+
+        parser.add_argument(
+            '--purge-days',
+            type=int,
+            help='Delete messages sent more than this many days ago'
+        )
+
+    def handle(self, *args, **options):
+        if options['purge_days']:
+            deleted = OutboxManager.purge_sent(options['purge_days'])
+            self.stdout.write(f'Purged {deleted} sent messages')
+
+        while True:
+            start_time = timezone.now()
+            report = OutboxManager.drain(options['batch_size'], options['workers'])
+
+            if report['claimed']:
+                duration = (timezone.now() - start_time).total_seconds()
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f"Sent {report['sent']} of {report['claimed']} messages "
+                        f"({report['retried']} retrying, {report['failed']} failed) "
+                        f"in {duration:.2f} seconds"
+                    )
+                )
+            elif not options['loop']:
+                self.stdout.write('No messages due')
+
+            if not options['loop']:
+                return
+
+            time.sleep(options['interval'])
@@ -0,0 +1,61 @@
+from django.core.management.base import BaseCommand, CommandError
+from base.daily_stats_manager import DailyStatsManager
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Rebuild business daily stats rollups from bookings, correcting drifted rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--backfill',
+            action='store_true',
+            help='Rebuild the whole booking history instead of recent days'
+        )
+
+        parser.add_argument(
+            '--business',
+            type=int,
+            action='append',
+            dest='business_ids',
+            help='Only rebuild this business (can be repeated)'
+        )
+
+        parser.add_argument(
+            '--days-back',
+            type=int,
+            default=DailyStatsManager.RECONCILE_DAYS_BACK,
+            help='Past days rebuilt when not backfilling'
+        )
+
+        parser.add_argument(
+            '--days-ahead',
+            type=int,
+            default=DailyStatsManager.RECONCILE_DAYS_AHEAD,
+            help='Future days rebuilt when not backfilling'
+        )
+
+    def handle(self, *args, **options):
+        if options['days_back'] < 0 or options['days_ahead'] < 0:
+            raise CommandError('--days-back and --days-ahead cannot be negative')
+
+        started = time.monotonic()
+        report = DailyStatsManager.reconcile(
+            business_ids=options['business_ids'],
+            backfill=options['backfill'],
+            days_back=options['days_back'],
+            days_ahead=options['days_ahead']
+        )
+
+        message = (
+            f"Rebuilt daily stats of {report['businesses']} businesses, "
+            f"corrected {report['corrected']} rows ({report['failed']} failed) "
+            f"in {time.monotonic() - started:.2f} seconds"
+        )
+        if report['failed'] or report['corrected']:
+            self.stdout.write(self.style.WARNING(message))
+        else:
+            self.stdout.write(self.style.SUCCESS(message))
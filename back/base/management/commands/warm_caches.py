@@ -0,0 +1,80 @@
+from django.core.management.base import BaseCommand, CommandError
+from base.warmup_manager import WarmupManager
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Precompute dashboards, analytics and availability caches for active businesses'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=WarmupManager.BATCH_SIZE,
+            help='Businesses warmed per batch'
+        )
+
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=WarmupManager.WORKERS,
+            help='Businesses warmed concurrently'
+        )
+
+        parser.add_argument(
+            '--time-budget',
+            type=float,
+            default=WarmupManager.TIME_BUDGET,
+            help='Seconds after which no new batch is started'
+        )
+
+        parser.add_argument(
+            '--business',
+            type=int,
+            action='append',
+            dest='business_ids',
+            help='Only warm this business (can be repeated)'
+        )
+
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep warming on an interval instead of exiting after one run'
+        )
+
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=900,
+            help='Seconds to wait between runs in loop mode'
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1 or options['workers'] < 1:
+            raise CommandError('--batch-size and --workers must be positive')
+
+        while True:
+            report = WarmupManager.run(
+                batch_size=options['batch_size'],
+                workers=options['workers'],
+                time_budget=options['time_budget'],
+                business_ids=options['business_ids']
+            )
+
+            message = (
+                f"Warmed {report['warmed']} of {report['businesses']} businesses "
+                f"({report['failed']} with failures, {report['skipped']} skipped) "
+                f"in {report['duration']:.2f} seconds"
+            )
+            if report['failed'] or report['skipped']:
+                self.stdout.write(self.style.WARNING(message))
+            else:
+                self.stdout.write(self.style.SUCCESS(message))
+
+            if not options['loop']:
+                return
+
+            time.sleep(options['interval'])
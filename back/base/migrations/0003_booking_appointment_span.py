@@ -0,0 +1,52 @@
+# Generated by Django 5.1.5 on 2026-10-16 23:15
+
+from datetime import datetime
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def backfill_appointment_span(apps, schema_editor):
+    """Populate stored start/end datetimes for existing bookings"""
+    Booking = apps.get_model('base', 'Booking')
+    tz = timezone.get_default_timezone()
+    batch = []
+
+    for booking in Booking.objects.select_related('service').iterator(chunk_size=1000):
+        booking.appointment_start = timezone.make_aware(
+            datetime.combine(booking.appointment_date, booking.appointment_time), tz
+        )
+        booking.appointment_end = booking.appointment_start + booking.service.duration
+        batch.append(booking)
+        if len(batch) >= 1000:
+            Booking.objects.bulk_update(batch, ['appointment_start', 'appointment_end'])
+            batch = []
+
+    if batch:
+        Booking.objects.bulk_update(batch, ['appointment_start', 'appointment_end'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_alter_user_email_alter_user_first_name_and_more'),
+        ('base', '0002_booking_slot_lock'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='booking',
+            name='appointment_end',
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='booking',
+            name='appointment_start',
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_appointment_span, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(condition=models.Q(('status__in', ['pending', 'confirmed', 'in_progress'])), fields=['business', 'appointment_start', 'appointment_end'], name='booking_active_span_idx'),
+        ),
+    ]
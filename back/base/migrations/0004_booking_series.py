@@ -0,0 +1,37 @@
+# Generated by Django 5.1.5 on 2026-10-16 23:19
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_alter_user_email_alter_user_first_name_and_more'),
+        ('base', '0003_booking_appointment_span'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookingSeries',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('series_id', models.UUIDField(default=uuid.uuid4, unique=True)),
+                ('frequency', models.CharField(choices=[('daily', 'Daily'), ('weekly', 'Weekly'), ('biweekly', 'Every Two Weeks')], default='weekly', max_length=20)),
+                ('start_date', models.DateField()),
+                ('appointment_time', models.TimeField()),
+                ('occurrences', models.PositiveIntegerField()),
+                ('notes', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('business', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='booking_series', to='accounts.businessprofile')),
+                ('customer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='base.customer')),
+                ('service', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='base.service')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='booking',
+            name='series',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='bookings', to='base.bookingseries'),
+        ),
+    ]
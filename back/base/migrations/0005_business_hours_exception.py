@@ -0,0 +1,31 @@
+# Generated by Django 5.1.5 on 2026-10-16 23:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_alter_user_email_alter_user_first_name_and_more'),
+        ('base', '0004_booking_series'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BusinessHoursException',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField()),
+                ('open_time', models.TimeField(blank=True, null=True)),
+                ('close_time', models.TimeField(blank=True, null=True)),
+                ('is_closed', models.BooleanField(default=False)),
+                ('reason', models.CharField(blank=True, max_length=255)),
+                ('business', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='hours_exceptions', to='accounts.businessprofile')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['business', 'end_date'], name='base_busine_busines_b7e61f_idx')],
+            },
+        ),
+    ]
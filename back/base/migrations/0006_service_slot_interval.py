@@ -0,0 +1,19 @@
+# Generated by Django 5.1.5 on 2026-10-16 23:26
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0005_business_hours_exception'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='service',
+            name='slot_interval',
+            field=models.PositiveSmallIntegerField(blank=True, help_text='Slot granularity in minutes (defaults to the business setting)', null=True, validators=[django.core.validators.MinValueValidator(5), django.core.validators.MaxValueValidator(240)]),
+        ),
+    ]
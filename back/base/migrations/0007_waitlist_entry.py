@@ -0,0 +1,43 @@
+# Generated by Django 5.1.5 on 2026-10-16 23:30
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0007_business_capacity'),
+        ('base', '0006_service_slot_interval'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='notification',
+            name='notification_type',
+            field=models.CharField(choices=[('booking_confirmation', 'Booking Confirmation'), ('booking_reminder', 'Booking Reminder'), ('booking_cancellation', 'Booking Cancellation'), ('payment_success', 'Payment Success'), ('subscription_expiry', 'Subscription Expiry'), ('waitlist_offer', 'Waitlist Offer')], max_length=30),
+        ),
+        migrations.CreateModel(
+            name='WaitlistEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('waitlist_id', models.UUIDField(default=uuid.uuid4, unique=True)),
+                ('date', models.DateField()),
+                ('window_start', models.TimeField(help_text='Earliest acceptable start time')),
+                ('window_end', models.TimeField(help_text='Latest acceptable start time')),
+                ('status', models.CharField(choices=[('waiting', 'Waiting'), ('booked', 'Booked'), ('cancelled', 'Cancelled')], default='waiting', max_length=20)),
+                ('hold_token', models.CharField(blank=True, db_index=True, max_length=64)),
+                ('offered_time', models.TimeField(blank=True, null=True)),
+                ('offer_expires_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('booking', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='base.booking')),
+                ('business', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='waitlist_entries', to='accounts.businessprofile')),
+                ('customer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='base.customer')),
+                ('service', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='base.service')),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('status', 'waiting')), fields=['business', 'service', 'date', 'window_start'], name='waitlist_waiting_idx')],
+            },
+        ),
+    ]
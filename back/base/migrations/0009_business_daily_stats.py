@@ -0,0 +1,36 @@
+# Generated by Django 5.1.5 on 2026-10-17 00:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0007_business_capacity'),
+        ('base', '0008_outbox_message'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BusinessDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('pending_bookings', models.PositiveIntegerField(default=0)),
+                ('confirmed_bookings', models.PositiveIntegerField(default=0)),
+                ('in_progress_bookings', models.PositiveIntegerField(default=0)),
+                ('completed_bookings', models.PositiveIntegerField(default=0)),
+                ('cancelled_bookings', models.PositiveIntegerField(default=0)),
+                ('no_show_bookings', models.PositiveIntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, help_text='Revenue of completed bookings', max_digits=12)),
+                ('new_customers', models.PositiveIntegerField(default=0, help_text='Customers whose first booking was made this day')),
+                ('hourly_bookings', models.JSONField(default=list, help_text='Bookings per appointment hour, 24 entries')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('business', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='accounts.businessprofile')),
+            ],
+            options={
+                'unique_together': {('business', 'date')},
+            },
+        ),
+    ]
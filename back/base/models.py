@@ -1,6 +1,9 @@
 # base/models.py
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.utils import timezone
+from django.core.validators import MaxValueValidator, MinValueValidator
+from datetime import datetime, timedelta
 import uuid
 
 User = get_user_model()
@@ -13,6 +16,10 @@ class Service(models.Model):
     description_ar = models.TextField(blank=True, help_text="Arabic description")
     price = models.DecimalField(max_digits=8, decimal_places=2)
     duration = models.DurationField(help_text="Service duration")
+    slot_interval = models.PositiveSmallIntegerField(
+        null=True, blank=True, validators=[MinValueValidator(5), MaxValueValidator(240)],
+        help_text="Slot granularity in minutes (defaults to the business setting)"
+    )
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     
@@ -22,6 +29,13 @@ class Service(models.Model):
             models.Index(fields=['price']),
             models.Index(fields=['created_at']),
         ]
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Remember the loaded duration so booking end times can follow changes"""
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_duration = dict(zip(field_names, values)).get('duration')
+        return instance
 
 class Customer(models.Model):
     """Customer model for walk-in bookings without signup"""
@@ -33,6 +47,32 @@ class Customer(models.Model):
     class Meta:
         unique_together = ['phone_number', 'name']
 
+class BookingSeries(models.Model):
+    """Recurrence rule for standing appointments"""
+    FREQUENCY_CHOICES = [
+        ('daily', 'Daily'),
+        ('weekly', 'Weekly'),
+        ('biweekly', 'Every Two Weeks'),
+    ]
+    
+    FREQUENCY_DAYS = {'daily': 1, 'weekly': 7, 'biweekly': 14}
+    
+    series_id = models.UUIDField(default=uuid.uuid4, unique=True)
+    business = models.ForeignKey('accounts.BusinessProfile', on_delete=models.CASCADE, related_name='booking_series')
+    service = models.ForeignKey(Service, on_delete=models.CASCADE)
+    customer = models.ForeignKey(Customer, on_delete=models.CASCADE)
+    frequency = models.CharField(max_length=20, choices=FREQUENCY_CHOICES, default='weekly')
+    start_date = models.DateField()
+    appointment_time = models.TimeField()
+    occurrences = models.PositiveIntegerField()
+    notes = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    def occurrence_dates(self):
+        """Expand the rule into appointment dates"""
+        step = timedelta(days=self.FREQUENCY_DAYS[self.frequency])
+        return [self.start_date + step * index for index in range(self.occurrences)]
+
 class Booking(models.Model):
     STATUS_CHOICES = [
         ('pending', 'Pending'),
@@ -63,6 +103,7 @@ class Booking(models.Model):
     business = models.ForeignKey('accounts.BusinessProfile', on_delete=models.CASCADE)
     service = models.ForeignKey(Service, on_delete=models.CASCADE)
     customer = models.ForeignKey(Customer, on_delete=models.CASCADE)
+    series = models.ForeignKey(BookingSeries, on_delete=models.SET_NULL, null=True, blank=True, related_name='bookings')
     appointment_date = models.DateField()
     appointment_time = models.TimeField()
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
@@ -71,9 +112,14 @@ class Booking(models.Model):
     notes = models.TextField(blank=True)
     reminder_sent = models.BooleanField(default=False)
     qr_code = models.ImageField(upload_to='booking_qr/', blank=True)
+    # Denormalized appointment span, kept in sync on save for overlap queries
+    appointment_start = models.DateTimeField(null=True, editable=False)
+    appointment_end = models.DateTimeField(null=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    SPAN_FIELDS = {'appointment_date', 'appointment_time', 'service', 'service_id'}
+    
     class Meta:
         indexes = [
             models.Index(fields=['business', 'appointment_date']),
@@ -81,6 +127,85 @@ class Booking(models.Model):
             models.Index(fields=['customer', 'created_at']),
             models.Index(fields=['appointment_date', 'appointment_time']),
             models.Index(fields=['booking_id']),
+            models.Index(
+                fields=['business', 'appointment_start', 'appointment_end'],
+                name='booking_active_span_idx',
+                condition=models.Q(status__in=['pending', 'confirmed', 'in_progress'])
+            ),
+        ]
+    
+    @staticmethod
+    def compute_span(appointment_date, appointment_time, duration):
+        """Return the aware (start, end) datetimes of an appointment"""
+        start = timezone.make_aware(
+            datetime.combine(appointment_date, appointment_time),
+            timezone.get_default_timezone()
+        )
+        return start, start + duration
+    
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or self.SPAN_FIELDS & set(update_fields):
+            self.appointment_start, self.appointment_end = self.compute_span(
+                self._meta.get_field('appointment_date').to_python(self.appointment_date),
+                self._meta.get_field('appointment_time').to_python(self.appointment_time),
+                self.service.duration
+            )
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'appointment_start', 'appointment_end'}
+        super().save(*args, **kwargs)
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Remember the loaded slot so changes can be patched into cached indexes"""
+        instance = super().from_db(db, field_names, values)
+        loaded = dict(zip(field_names, values))
+        instance._loaded_slot = (loaded.get('business_id'), loaded.get('appointment_date'))
+        instance._loaded_status = loaded.get('status')
+        instance._loaded_rollup = tuple(
+            loaded.get(field) for field in
+            ('business_id', 'appointment_date', 'appointment_time', 'status', 'total_price')
+        )
+        return instance
+
+class BookingSlotLock(models.Model):
+    """Lock row serializing booking creation per business and day"""
+    business = models.ForeignKey('accounts.BusinessProfile', on_delete=models.CASCADE, related_name='slot_locks')
+    date = models.DateField()
+    version = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        unique_together = ['business', 'date']
+
+class WaitlistEntry(models.Model):
+    """Customer waiting for a slot to free up within a time window on a date"""
+    STATUS_CHOICES = [
+        ('waiting', 'Waiting'),
+        ('booked', 'Booked'),
+        ('cancelled', 'Cancelled'),
+    ]
+    
+    waitlist_id = models.UUIDField(default=uuid.uuid4, unique=True)
+    business = models.ForeignKey('accounts.BusinessProfile', on_delete=models.CASCADE, related_name='waitlist_entries')
+    service = models.ForeignKey(Service, on_delete=models.CASCADE)
+    customer = models.ForeignKey(Customer, on_delete=models.CASCADE)
+    date = models.DateField()
+    window_start = models.TimeField(help_text="Earliest acceptable start time")
+    window_end = models.TimeField(help_text="Latest acceptable start time")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='waiting')
+    hold_token = models.CharField(max_length=64, blank=True, db_index=True)
+    offered_time = models.TimeField(null=True, blank=True)
+    offer_expires_at = models.DateTimeField(null=True, blank=True)
+    booking = models.ForeignKey(Booking, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['business', 'service', 'date', 'window_start'],
+                name='waitlist_waiting_idx',
+                condition=models.Q(status='waiting')
+            ),
         ]
 
 class Review(models.Model):
@@ -109,6 +234,21 @@ class BusinessHours(models.Model):
     class Meta:
         unique_together = ['business', 'day']
 
+class BusinessHoursException(models.Model):
+    """Dated override of the weekly hours, e.g. Eid closures or Ramadan hours"""
+    business = models.ForeignKey('accounts.BusinessProfile', on_delete=models.CASCADE, related_name='hours_exceptions')
+    start_date = models.DateField()
+    end_date = models.DateField()
+    open_time = models.TimeField(null=True, blank=True)
+    close_time = models.TimeField(null=True, blank=True)
+    is_closed = models.BooleanField(default=False)
+    reason = models.CharField(max_length=255, blank=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['business', 'end_date']),
+        ]
+
 class Notification(models.Model):
     TYPE_CHOICES = [
         ('booking_confirmation', 'Booking Confirmation'),
@@ -116,6 +256,7 @@ class Notification(models.Model):
         ('booking_cancellation', 'Booking Cancellation'),
         ('payment_success', 'Payment Success'),
         ('subscription_expiry', 'Subscription Expiry'),
+        ('waitlist_offer', 'Waitlist Offer'),
     ]
     
     user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True)
@@ -125,4 +266,52 @@ class Notification(models.Model):
     message = models.TextField()
     is_read = models.BooleanField(default=False)
     sent_via_whatsapp = models.BooleanField(default=False)
-    created_at = models.DateTimeField(auto_now_add=True)
\ No newline at end of file
+    created_at = models.DateTimeField(auto_now_add=True)
+
+class OutboxMessage(models.Model):
+    """Outgoing message written in the same transaction as the change it reports"""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('processing', 'Processing'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+    
+    dedup_key = models.CharField(max_length=255, unique=True)
+    payload = models.JSONField()
+    notification = models.ForeignKey(Notification, on_delete=models.SET_NULL, null=True, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    available_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'available_at']),
+        ]
+
+class BusinessDailyStats(models.Model):
+    """Per-day booking rollup of a business, kept current by booking signals"""
+    STATUS_FIELDS = {status: f'{status}_bookings' for status, _ in Booking.STATUS_CHOICES}
+    
+    business = models.ForeignKey('accounts.BusinessProfile', on_delete=models.CASCADE, related_name='daily_stats')
+    date = models.DateField()
+    pending_bookings = models.PositiveIntegerField(default=0)
+    confirmed_bookings = models.PositiveIntegerField(default=0)
+    in_progress_bookings = models.PositiveIntegerField(default=0)
+    completed_bookings = models.PositiveIntegerField(default=0)
+    cancelled_bookings = models.PositiveIntegerField(default=0)
+    no_show_bookings = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0, help_text="Revenue of completed bookings")
+    new_customers = models.PositiveIntegerField(default=0, help_text="Customers whose first booking was made this day")
+    hourly_bookings = models.JSONField(default=list, help_text="Bookings per appointment hour, 24 entries")
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        unique_together = ['business', 'date']
+    
+    @property
+    def total_bookings(self) -> int:
+        return sum(getattr(self, field) for field in self.STATUS_FIELDS.values())
@@ -0,0 +1,168 @@
+# outbox_manager.py - Transactional outbox for outgoing WhatsApp messages
+from concurrent.futures import ThreadPoolExecutor
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from datetime import timedelta
+from typing import Dict, List
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class OutboxManager:
+    """
+    Transactional outbox for WhatsApp messages
+
+    Messages raised while a booking is written are stored as outbox rows in
+    the same transaction instead of calling the WhatsApp API under booking
+    locks. The process_outbox worker claims due rows, sends them from a
+    thread pool and records the outcome. Transport failures, network errors
+    and API error responses, are retried with exponential backoff; any other
+    failure, such as an unknown message type, can never succeed and fails
+    the message at once. Rows are unique per dedup key, so queueing a
+    message twice is a no-op and a claimed row is never sent by two workers.
+    """
+
+    BATCH_SIZE = 50
+    WORKERS = 4
+    MAX_ATTEMPTS = 5
+    RETRY_DELAY = 30  # seconds, doubled after every failed attempt
+    LEASE_TIMEOUT = 120  # seconds before an unfinished claim becomes due again
+    RETRYABLE_ERRORS = ('NETWORK_ERROR', 'WHATSAPP_API_ERROR')
+
+    @classmethod
+    def enqueue(cls, dedup_key: str, payload: Dict, notification_id: int = None) -> bool:
+        """Store a message for delivery after commit, ignoring duplicates"""
+        from .models import OutboxMessage
+
+        try:
+            OutboxMessage.objects.bulk_create([
+                OutboxMessage(dedup_key=dedup_key, payload=payload, notification_id=notification_id)
+            ], ignore_conflicts=True)
+            return True
+        except Exception as e:
+            logger.error(f"Outbox enqueue failed for {dedup_key}: {str(e)}")
+            return False
+
+    @classmethod
+    def claim_batch(cls, batch_size: int = None) -> List:
+        """
+        Claim due messages for this worker
+
+        Rows are locked with SKIP LOCKED where the database supports it and
+        leased by moving available_at forward, so concurrent workers skip
+        each other's rows and a crashed worker's rows become due again.
+        """
+        from .models import OutboxMessage
+
+        now = timezone.now()
+        with transaction.atomic():
+            messages = list(
+                OutboxMessage.objects.select_for_update(skip_locked=True).filter(
+                    status__in=['pending', 'processing'],
+                    available_at__lte=now
+                ).order_by('available_at')[:batch_size or cls.BATCH_SIZE]
+            )
+            if messages:
+                OutboxMessage.objects.filter(id__in=[message.id for message in messages]).update(
+                    status='processing',
+                    attempts=F('attempts') + 1,
+                    available_at=now + timedelta(seconds=cls.LEASE_TIMEOUT)
+                )
+
+        for message in messages:
+            message.attempts += 1
+        return messages
+
+    @classmethod
+    def process_batch(cls, batch_size: int = None, workers: int = None) -> Dict:
+        """Claim one batch, send it concurrently and record every outcome"""
+        report = {'claimed': 0, 'sent': 0, 'retried': 0, 'failed': 0}
+
+        messages = cls.claim_batch(batch_size)
+        if not messages:
+            return report
+
+        # Only the API calls run in worker threads; results are written here
+        with ThreadPoolExecutor(max_workers=workers or cls.WORKERS) as pool:
+            results = list(pool.map(cls._send, [message.payload for message in messages]))
+
+        report['claimed'] = len(messages)
+        sent = [message for message, result in zip(messages, results) if result.get('success')]
+        cls._mark_sent(sent)
+        report['sent'] = len(sent)
+
+        for message, result in zip(messages, results):
+            if not result.get('success'):
+                report[cls._mark_failed(message, result)] += 1
+
+        return report
+
+    @classmethod
+    def drain(cls, batch_size: int = None, workers: int = None) -> Dict:
+        """Process batches until no message is due"""
+        totals = {'claimed': 0, 'sent': 0, 'retried': 0, 'failed': 0}
+        while True:
+            report = cls.process_batch(batch_size, workers)
+            if not report['claimed']:
+                return totals
+            for key, value in report.items():
+                totals[key] += value
+
+    @classmethod
+    def purge_sent(cls, days: int) -> int:
+        """Delete messages sent more than the given number of days ago"""
+        from .models import OutboxMessage
+
+        deleted, _ = OutboxMessage.objects.filter(
+            status='sent', sent_at__lt=timezone.now() - timedelta(days=days)
+        ).delete()
+        return deleted
+
+    @staticmethod
+    def _send(payload: Dict) -> Dict:
+        """Send one message through the WhatsApp API"""
+        from utils.whatsapp import send_whatsapp_message
+
+        try:
+            return send_whatsapp_message(
+                payload['phone_number'], payload['message_type'], **payload.get('kwargs', {})
+            )
+        except Exception as e:
+            return {'success': False, 'message': str(e)}
+
+    @classmethod
+    def _mark_sent(cls, messages: List):
+        """Record delivered messages and flag their notification records"""
+        from .models import OutboxMessage, Notification
+
+        if not messages:
+            return
+
+        OutboxMessage.objects.filter(id__in=[message.id for message in messages]).update(
+            status='sent', sent_at=timezone.now(), last_error=''
+        )
+        notification_ids = [message.notification_id for message in messages if message.notification_id]
+        if notification_ids:
+            Notification.objects.filter(id__in=notification_ids).update(sent_via_whatsapp=True)
+
+    @classmethod
+    def _mark_failed(cls, message, result: Dict) -> str:
+        """Schedule a retry of a transport failure with backoff, or give up"""
+        from .models import OutboxMessage
+
+        error = result.get('message', '')
+        retryable = result.get('error_code') in cls.RETRYABLE_ERRORS
+        if not retryable or message.attempts >= cls.MAX_ATTEMPTS:
+            logger.error(f"Outbox message {message.dedup_key} failed after {message.attempts} attempts: {error}")
+            OutboxMessage.objects.filter(id=message.id).update(status='failed', last_error=error)
+            return 'failed'
+
+        delay = cls.RETRY_DELAY * 2 ** (message.attempts - 1)
+        OutboxMessage.objects.filter(id=message.id).update(
+            status='pending',
+            last_error=error,
+            available_at=timezone.now() + timedelta(seconds=delay)
+        )
+        return 'retried'
@@ -0,0 +1,71 @@
+# schedule.py - Compiled per-business opening hours
+from collections import namedtuple
+from datetime import timedelta
+from typing import Dict, Optional
+from django.utils import timezone
+
+from .cache_manager import ScheduleCacheManager
+
+DayHours = namedtuple('DayHours', ['open_time', 'close_time', 'is_closed'])
+
+
+class BusinessSchedule:
+    """
+    Weekly hours plus dated exceptions for one business
+
+    The schedule is compiled from ``BusinessHours`` and upcoming
+    ``BusinessHoursException`` rows, with exceptions expanded into a per-date
+    map, so every open-hours lookup is a dictionary access. Compiled
+    schedules are cached and retired whenever hours or exceptions change.
+    """
+
+    MAX_EXCEPTION_DAYS = 366
+
+    def __init__(self, days: Dict, exceptions: Dict):
+        self.days = days
+        self.exceptions = exceptions
+
+    @classmethod
+    def for_business(cls, business_id: int) -> 'BusinessSchedule':
+        """Get the compiled schedule of a business, building it on a cache miss"""
+        version, data = ScheduleCacheManager.get_schedule(business_id)
+        if data is None:
+            data = cls.compile(business_id)
+            ScheduleCacheManager.set_schedule(business_id, version, data)
+        return cls(*data)
+
+    @classmethod
+    def compile(cls, business_id: int):
+        """Build the (days, exceptions) maps from the database"""
+        from .models import BusinessHours, BusinessHoursException
+
+        days = {
+            hours.day: DayHours(hours.open_time, hours.close_time, hours.is_closed)
+            for hours in BusinessHours.objects.filter(business_id=business_id)
+        }
+
+        today = timezone.now().date()
+        exceptions = {}
+        for exception in BusinessHoursException.objects.filter(
+            business_id=business_id, end_date__gte=today
+        ).order_by('start_date', 'id'):
+            if exception.is_closed:
+                hours = DayHours(None, None, True)
+            elif exception.open_time and exception.close_time:
+                hours = DayHours(exception.open_time, exception.close_time, False)
+            else:
+                continue
+
+            start = max(exception.start_date, today)
+            span = min((exception.end_date - start).days, cls.MAX_EXCEPTION_DAYS)
+            for offset in range(span + 1):
+                exceptions[start + timedelta(days=offset)] = hours
+
+        return days, exceptions
+
+    def hours_for(self, date) -> Optional[DayHours]:
+        """Hours in effect on a date, or None when the business uses default hours"""
+        hours = self.exceptions.get(date)
+        if hours is not None:
+            return hours
+        return self.days.get(date.strftime('%A').lower())
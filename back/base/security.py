@@ -1,11 +1,12 @@
 # security.py - Comprehensive security measures for Wagtee platform
 import re
 import hashlib
+import json
 import secrets
 import time
+from functools import wraps
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
-from django.core.cache import cache
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
@@ -13,6 +14,7 @@ from django.utils import timezone
 from django.db import models
 from rest_framework import status
 from rest_framework.response import Response
+from .cache_manager import CacheManager
 import logging
 
 User = get_user_model()
@@ -174,15 +176,15 @@ class RateLimiter:
         
         # Check if blocked
         block_key = f"{key}:blocked"
-        if cache.get(block_key):
+        if CacheManager.get(block_key):
             return True, config['block_duration']
         
         # Get current count
-        current_count = cache.get(key, 0)
+        current_count = CacheManager.get(key, 0)
         
         if current_count >= config['requests']:
             # Block the identifier
-            cache.set(block_key, True, config['block_duration'])
+            CacheManager.set(block_key, True, config['block_duration'])
             logger.warning(f"Rate limit exceeded for {action} by {identifier}")
             return True, config['block_duration']
         
@@ -197,8 +199,8 @@ class RateLimiter:
         config = cls.RATE_LIMITS[action]
         key = cls.get_rate_limit_key(action, identifier)
         
-        current_count = cache.get(key, 0)
-        cache.set(key, current_count + 1, config['window'])
+        current_count = CacheManager.get(key, 0)
+        CacheManager.set(key, current_count + 1, config['window'])
 
 
 class SecurityMiddleware:
@@ -261,13 +263,13 @@ class AuditLogger:
         logger.info(f"SECURITY_EVENT: {log_data}")
         
         # Store in cache for recent events (optional)
-        cache_key = f"security_events:{ip_address}"
-        events = cache.get(cache_key, [])
+        cache_key = f"{CacheManager.PREFIXES['security']}:events:{ip_address}"
+        events = CacheManager.get(cache_key, [])
         events.append(log_data)
         
         # Keep only last 50 events per IP
         events = events[-50:]
-        cache.set(cache_key, events, 86400)  # 24 hours
+        CacheManager.set(cache_key, events, 86400)  # 24 hours
 
 
 class SubscriptionSecurity:
@@ -448,4 +450,68 @@ def require_subscription(features: List[str] = None):
             return view_func(self, request, *args, **kwargs)
         
         return wrapper
-    return decorator
\ No newline at end of file
+    return decorator
+
+
+# Decorator for idempotent public endpoints
+def idempotent(scope: str):
+    """
+    Decorator replaying the stored response for a repeated Idempotency-Key
+    
+    Requests without the header run normally. Server errors are not stored
+    so that a retry can run the request again.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(*args, **kwargs):
+            from .cache_manager import IdempotencyCacheManager
+            
+            request = next(arg for arg in args if hasattr(arg, 'META'))
+            idempotency_key = request.headers.get('Idempotency-Key')
+            if not idempotency_key:
+                return view_func(*args, **kwargs)
+            
+            if len(idempotency_key) > 255:
+                return Response({
+                    'success': False,
+                    'error': 'Idempotency key must be at most 255 characters',
+                    'error_code': 'INVALID_IDEMPOTENCY_KEY'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            
+            fingerprint = hashlib.sha256(
+                json.dumps(request.data, sort_keys=True, default=str).encode()
+            ).hexdigest()
+            
+            stored = IdempotencyCacheManager.get_response(scope, idempotency_key)
+            if stored:
+                if stored['fingerprint'] != fingerprint:
+                    return Response({
+                        'success': False,
+                        'error': 'Idempotency key was already used with a different request',
+                        'error_code': 'IDEMPOTENCY_KEY_REUSED'
+                    }, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+                
+                return Response(
+                    stored['data'], status=stored['status'],
+                    headers={'Idempotent-Replayed': 'true'}
+                )
+            
+            if not IdempotencyCacheManager.acquire(scope, idempotency_key):
+                return Response({
+                    'success': False,
+                    'error': 'A request with this idempotency key is still in progress',
+                    'error_code': 'REQUEST_IN_PROGRESS'
+                }, status=status.HTTP_409_CONFLICT)
+            
+            try:
+                response = view_func(*args, **kwargs)
+                if response.status_code < 500:
+                    IdempotencyCacheManager.store_response(
+                        scope, idempotency_key, fingerprint, response.status_code, response.data
+                    )
+                return response
+            finally:
+                IdempotencyCacheManager.release(scope, idempotency_key)
+        
+        return wrapper
+    return decorator
@@ -3,7 +3,10 @@ from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from django.db.models import Count, Sum, Avg, Q
 from datetime import timedelta
-from .models import Service, Customer, Booking, Review, BusinessHours, Notification
+from .models import (
+    Service, Customer, Booking, Review, BusinessHours, BusinessHoursException, Notification,
+    WaitlistEntry
+)
 from accounts.models import BusinessProfile
 
 User = get_user_model()
@@ -98,7 +101,7 @@ class ServiceSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'business', 'name', 'name_ar', 'description', 'description_ar',
             'price', 'price_formatted', 'duration', 'duration_formatted',
-            'is_active', 'created_at'
+            'slot_interval', 'is_active', 'created_at'
         ]
         read_only_fields = ['id', 'created_at', 'business']
     
@@ -137,7 +140,7 @@ class ServiceCreateUpdateSerializer(serializers.ModelSerializer):
         model = Service
         fields = [
             'name', 'name_ar', 'description', 'description_ar', 'price',
-            'duration', 'duration_hours', 'duration_minutes', 'is_active'
+            'duration', 'duration_hours', 'duration_minutes', 'slot_interval', 'is_active'
         ]
     
     def validate_price(self, value):
@@ -395,9 +398,11 @@ class BookingCreateSerializer(serializers.ModelSerializer):
             
             # Check business hours
             if service and service.business:
-                business_hours = service.business.hours.filter(
-                    day=appointment_date.strftime('%A').lower()
-                ).first()
+                from .schedule import BusinessSchedule
+
+                business_hours = BusinessSchedule.for_business(service.business_id).hours_for(
+                    appointment_date
+                )
                 
                 if business_hours and not business_hours.is_closed:
                     if not (business_hours.open_time <= appointment_time <= business_hours.close_time):
@@ -409,7 +414,17 @@ class BookingCreateSerializer(serializers.ModelSerializer):
                     raise serializers.ValidationError({
                         "appointment_date": "Business is closed on this day"
                     })
-        
+
+                # Check for overlapping bookings
+                from .booking_manager import BookingManager
+
+                start, end = Booking.compute_span(appointment_date, appointment_time, service.duration)
+                conflict = BookingManager.check_span_conflicts(service.business, start, end)
+                if conflict['has_conflict']:
+                    raise serializers.ValidationError({
+                        "appointment_time": conflict['reason']
+                    })
+
         return attrs
     
     def create(self, validated_data):
@@ -609,6 +624,44 @@ class BusinessHoursSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
+class BusinessHoursExceptionSerializer(serializers.ModelSerializer):
+    """Dated hours exception serializer (holidays, Ramadan hours)"""
+    
+    class Meta:
+        model = BusinessHoursException
+        fields = [
+            'id', 'business', 'start_date', 'end_date',
+            'open_time', 'close_time', 'is_closed', 'reason'
+        ]
+        read_only_fields = ['id', 'business']
+    
+    def validate(self, attrs):
+        """Validate exception date range and hours"""
+        start_date = attrs.get('start_date', getattr(self.instance, 'start_date', None))
+        end_date = attrs.get('end_date', getattr(self.instance, 'end_date', None))
+        
+        if start_date and end_date and start_date > end_date:
+            raise serializers.ValidationError(
+                "Start date must be on or before end date"
+            )
+        
+        if not attrs.get('is_closed', getattr(self.instance, 'is_closed', False)):
+            open_time = attrs.get('open_time', getattr(self.instance, 'open_time', None))
+            close_time = attrs.get('close_time', getattr(self.instance, 'close_time', None))
+            
+            if not open_time or not close_time:
+                raise serializers.ValidationError(
+                    "Open time and close time are required when not closed"
+                )
+            
+            if open_time >= close_time:
+                raise serializers.ValidationError(
+                    "Opening time must be before closing time"
+                )
+        
+        return attrs
+
+
 class NotificationSerializer(serializers.ModelSerializer):
     """Notification serializer with type display"""
     notification_type_display = serializers.CharField(source='get_notification_type_display', read_only=True)
@@ -709,4 +762,20 @@ class BusinessAnalyticsSerializer(serializers.Serializer):
     # Visualizations (HTML strings for charts)
     revenue_chart = serializers.CharField(required=False)
     booking_heatmap = serializers.CharField(required=False)
-    customer_segment_chart = serializers.CharField(required=False)
\ No newline at end of file
+    customer_segment_chart = serializers.CharField(required=False)
+
+
+class WaitlistEntrySerializer(serializers.ModelSerializer):
+    """Waitlist entry serializer for business owners"""
+    customer_name = serializers.CharField(source='customer.name', read_only=True)
+    customer_phone = serializers.CharField(source='customer.phone_number', read_only=True)
+    service_name = serializers.CharField(source='service.name', read_only=True)
+    
+    class Meta:
+        model = WaitlistEntry
+        fields = [
+            'id', 'waitlist_id', 'service', 'service_name', 'customer_name', 'customer_phone',
+            'date', 'window_start', 'window_end', 'status', 'offered_time',
+            'offer_expires_at', 'booking', 'created_at'
+        ]
+        read_only_fields = fields
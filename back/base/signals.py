@@ -0,0 +1,237 @@
+# signals.py - Model signal handlers keeping cached booking data in sync
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from accounts.models import BusinessProfile, Subscription, User
+from .models import (
+    Booking, BookingSeries, Customer, Review, Service, BusinessHours, BusinessHoursException
+)
+from .booking_manager import BookingManager
+from .cache_manager import (
+    BookingLookupCacheManager, DeferredInvalidation, OccupancyCacheManager, ScheduleCacheManager
+)
+from .daily_stats_manager import DailyStatsManager
+from .waitlist_manager import WaitlistManager
+
+
+def _normalized_slot(booking):
+    """Return the (business_id, appointment_date, appointment_time) of a booking"""
+    date_field = Booking._meta.get_field('appointment_date')
+    time_field = Booking._meta.get_field('appointment_time')
+    return (
+        booking.business_id,
+        date_field.to_python(booking.appointment_date),
+        time_field.to_python(booking.appointment_time),
+    )
+
+
+@receiver(post_save, sender=Booking)
+def update_occupancy_on_booking_save(sender, instance, created, **kwargs):
+    """Patch the cached occupancy index when a booking is created or changed"""
+    business_id, date, appointment_time = _normalized_slot(instance)
+    previous = None if created else getattr(instance, '_loaded_slot', None)
+    instance._loaded_slot = (business_id, date)
+    
+    if not created and (previous is None or None in previous):
+        # Unknown previous slot: rebuild the business index lazily
+        transaction.on_commit(lambda: OccupancyCacheManager.invalidate_business(business_id))
+        return
+    
+    entry = None
+    if instance.status in BookingManager.ACTIVE_STATUSES:
+        entry = BookingManager._booking_entry(
+            instance.id, appointment_time, instance.service.duration
+        )
+    
+    def apply():
+        if previous and previous != (business_id, date):
+            OccupancyCacheManager.apply_booking_change(previous[0], previous[1], instance.id)
+        OccupancyCacheManager.apply_booking_change(business_id, date, instance.id, entry)
+    
+    transaction.on_commit(apply)
+
+
+@receiver(post_delete, sender=Booking)
+def update_occupancy_on_booking_delete(sender, instance, **kwargs):
+    """Remove a deleted booking from the cached occupancy index"""
+    business_id, date, _ = _normalized_slot(instance)
+    booking_id = instance.id
+    transaction.on_commit(
+        lambda: OccupancyCacheManager.apply_booking_change(business_id, date, booking_id)
+    )
+
+
+@receiver(post_save, sender=Booking)
+def offer_cancelled_slot_to_waitlist(sender, instance, created, **kwargs):
+    """Offer a slot freed by a cancellation to the waitlist once the index is patched"""
+    previous = None if created else getattr(instance, '_loaded_status', None)
+    instance._loaded_status = instance.status
+    
+    if previous in BookingManager.ACTIVE_STATUSES and instance.status == 'cancelled':
+        transaction.on_commit(lambda: WaitlistManager.offer_freed_slot(instance))
+
+
+def _rollup_snapshot(booking):
+    """Return the fields a booking contributes to its daily stats row"""
+    return (
+        booking.business_id, booking.appointment_date, booking.appointment_time,
+        booking.status, booking.total_price
+    )
+
+
+@receiver(post_save, sender=Booking)
+def update_daily_stats_on_booking_save(sender, instance, created, **kwargs):
+    """Move the booking's contribution between daily stats rows once the change commits"""
+    previous = None if created else getattr(instance, '_loaded_rollup', None)
+    current = _rollup_snapshot(instance)
+    instance._loaded_rollup = current
+    
+    if not created and (previous is None or None in previous):
+        # Unknown previous state: recompute the booking's day from scratch
+        business_id, date, _ = _normalized_slot(instance)
+        DailyStatsManager.rebuild_on_commit(business_id, [date])
+        return
+    
+    if previous == current:
+        return
+    
+    booking_id, customer_id = (instance.id, instance.customer_id) if created else (None, None)
+    transaction.on_commit(
+        lambda: DailyStatsManager.apply_booking_change(previous, current, booking_id, customer_id)
+    )
+
+
+@receiver(post_delete, sender=Booking)
+def update_daily_stats_on_booking_delete(sender, instance, **kwargs):
+    """Take a deleted booking out of its daily stats row"""
+    previous = getattr(instance, '_loaded_rollup', None)
+    if previous is None or None in previous:
+        previous = _rollup_snapshot(instance)
+    transaction.on_commit(lambda: DailyStatsManager.apply_booking_change(previous, None))
+
+
+@receiver(post_save, sender=Service)
+def invalidate_occupancy_on_service_save(sender, instance, created, **kwargs):
+    """Service durations shape every interval, so drop the business index"""
+    if not created:
+        business_id = instance.business_id
+        transaction.on_commit(lambda: OccupancyCacheManager.invalidate_business(business_id))
+
+
+@receiver(post_save, sender=Service)
+def update_booking_spans_on_duration_change(sender, instance, created, **kwargs):
+    """Keep stored booking end times in step with the service duration"""
+    previous = getattr(instance, '_loaded_duration', None)
+    instance._loaded_duration = instance.duration
+    
+    if created or previous == instance.duration:
+        return
+    
+    Booking.objects.filter(service=instance).update(
+        appointment_end=F('appointment_start') + instance.duration
+    )
+
+
+@receiver(post_save, sender=BusinessHours)
+@receiver(post_delete, sender=BusinessHours)
+@receiver(post_save, sender=BusinessHoursException)
+@receiver(post_delete, sender=BusinessHoursException)
+def invalidate_schedule_on_hours_change(sender, instance, **kwargs):
+    """Retire the compiled schedule when weekly hours or exceptions change"""
+    business_id = instance.business_id
+    transaction.on_commit(lambda: ScheduleCacheManager.invalidate_business(business_id))
+
+
+@receiver(post_save, sender=Booking)
+@receiver(post_delete, sender=Booking)
+def invalidate_booking_lookup(sender, instance, **kwargs):
+    """Drop the cached public lookup of a changed or deleted booking"""
+    booking_id = instance.booking_id
+    transaction.on_commit(lambda: BookingLookupCacheManager.invalidate_bookings([booking_id]))
+
+
+@receiver(post_save, sender=Service)
+@receiver(post_delete, sender=Service)
+def retire_booking_lookups_on_service_change(sender, instance, **kwargs):
+    """Service names appear in booking lookups"""
+    service_id = instance.id
+    transaction.on_commit(lambda: BookingLookupCacheManager.bump_version('service', service_id))
+
+
+@receiver(post_save, sender=Customer)
+def retire_booking_lookups_on_customer_change(sender, instance, created, **kwargs):
+    """Customer names and phone numbers appear in booking lookups"""
+    if not created:
+        customer_id = instance.id
+        transaction.on_commit(lambda: BookingLookupCacheManager.bump_version('customer', customer_id))
+
+
+@receiver(post_save, sender=BusinessProfile)
+def retire_booking_lookups_on_business_change(sender, instance, created, **kwargs):
+    """Business addresses appear in booking lookups"""
+    if not created:
+        business_id = instance.id
+        transaction.on_commit(lambda: BookingLookupCacheManager.bump_version('business', business_id))
+
+
+@receiver(post_save, sender=User)
+def retire_booking_lookups_on_owner_change(sender, instance, created, update_fields=None, **kwargs):
+    """Business names and phone numbers come from the owner's account"""
+    if created or instance.role != 'business_owner':
+        return
+    if update_fields is not None and not {'business_name', 'phone_number'} & set(update_fields):
+        return
+    
+    business_id = BusinessProfile.objects.filter(user=instance).values_list('id', flat=True).first()
+    if business_id:
+        transaction.on_commit(lambda: BookingLookupCacheManager.bump_version('business', business_id))
+
+
+@receiver(post_save, sender=Booking)
+@receiver(post_delete, sender=Booking)
+@receiver(post_save, sender=BookingSeries)
+@receiver(post_delete, sender=BookingSeries)
+@receiver(post_save, sender=Service)
+@receiver(post_delete, sender=Service)
+@receiver(post_save, sender=BusinessHours)
+@receiver(post_delete, sender=BusinessHours)
+@receiver(post_save, sender=BusinessHoursException)
+@receiver(post_delete, sender=BusinessHoursException)
+def invalidate_business_namespace(sender, instance, **kwargs):
+    """Retire cached business data once the transaction changing it commits"""
+    DeferredInvalidation.business(instance.business_id)
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def invalidate_business_namespace_on_review(sender, instance, **kwargs):
+    """Reviews feed business ratings and analytics"""
+    DeferredInvalidation.business(
+        Booking.objects.filter(id=instance.booking_id).values_list('business_id', flat=True).first()
+    )
+
+
+@receiver(post_save, sender=BusinessProfile)
+@receiver(post_delete, sender=BusinessProfile)
+def invalidate_namespaces_on_business_profile(sender, instance, **kwargs):
+    """Profiles are cached under both the business and its owner"""
+    DeferredInvalidation.business(instance.id)
+    DeferredInvalidation.user(instance.user_id)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_namespace(sender, instance, update_fields=None, **kwargs):
+    """Retire cached user data, ignoring the last_login stamp written on every login"""
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    DeferredInvalidation.user(instance.id)
+
+
+@receiver(post_save, sender=Subscription)
+@receiver(post_delete, sender=Subscription)
+def invalidate_user_namespace_on_subscription(sender, instance, **kwargs):
+    """Subscription status is cached per user"""
+    DeferredInvalidation.user(instance.user_id)
@@ -0,0 +1,829 @@
+# test_booking_manager.py - Booking engine tests
+import threading
+from datetime import time, timedelta
+from unittest.mock import patch
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils import timezone
+
+from ..booking_manager import BookingManager
+from ..cache_manager import OccupancyCacheManager, ScheduleCacheManager, SlotHoldCacheManager
+from ..schedule import BusinessSchedule
+from ..models import Service, Booking, Customer, BusinessHours, BusinessHoursException
+from accounts.models import BusinessProfile
+
+User = get_user_model()
+
+
+class BookingManagerTestMixin:
+    """Shared fixtures for booking engine tests"""
+
+    def create_business(self, email='owner@example.com'):
+        user = User.objects.create_user(
+            email=email,
+            password='testpass123',
+            business_name='Test Barber',
+            phone_number='+966501234567'
+        )
+        return BusinessProfile.objects.create(
+            user=user,
+            service_type='barber',
+            address='Riyadh'
+        )
+
+    def create_service(self, business, minutes=60, price=100):
+        return Service.objects.create(
+            business=business,
+            name=f'Service {minutes}',
+            price=price,
+            duration=timedelta(minutes=minutes)
+        )
+
+    def create_booking(self, business, service, date, start, status='confirmed', phone='+966500000001'):
+        customer, _ = Customer.objects.get_or_create(
+            phone_number=phone,
+            name=f'Customer {phone[-4:]}'
+        )
+        return Booking.objects.create(
+            business=business,
+            service=service,
+            customer=customer,
+            appointment_date=date,
+            appointment_time=start,
+            total_price=service.price,
+            status=status
+        )
+
+
+class AvailableSlotsTest(BookingManagerTestMixin, TestCase):
+    """Test the interval-sweep slot engine"""
+
+    def setUp(self):
+        cache.clear()
+        self.business = self.create_business()
+        self.service = self.create_service(self.business, minutes=60)
+        self.short_service = self.create_service(self.business, minutes=30)
+        self.date = timezone.now().date() + timedelta(days=7)
+        BusinessHours.objects.create(
+            business=self.business,
+            day=self.date.strftime('%A').lower(),
+            open_time=time(9, 0),
+            close_time=time(13, 0)
+        )
+
+    def get_slots(self, service=None):
+        result = BookingManager.get_available_slots(
+            self.business.id, (service or self.service).id, self.date.strftime('%Y-%m-%d')
+        )
+        self.assertTrue(result['success'])
+        return result['available_slots']
+
+    def test_slots_without_bookings(self):
+        """Every step between open and close is free"""
+        self.assertEqual(
+            self.get_slots(),
+            ['09:00', '09:30', '10:00', '10:30', '11:00', '11:30', '12:00', '12:30']
+        )
+
+    def test_slots_exclude_overlapping_bookings(self):
+        """Bookings block every slot whose interval overlaps them"""
+        self.create_booking(self.business, self.service, self.date, time(10, 0))
+        self.create_booking(self.business, self.short_service, self.date, time(12, 0))
+        self.create_booking(
+            self.business, self.service, self.date, time(9, 0), status='cancelled'
+        )
+
+        self.assertEqual(self.get_slots(), ['09:00', '11:00', '12:30'])
+        self.assertEqual(
+            self.get_slots(self.short_service),
+            ['09:00', '09:30', '11:00', '11:30', '12:30']
+        )
+
+    def test_sweep_matches_per_slot_conflict_check(self):
+        """The sweep returns exactly the slots the conflict check accepts"""
+        for start in [time(9, 30), time(10, 45), time(12, 15)]:
+            self.create_booking(self.business, self.short_service, self.date, start)
+
+        expected = []
+        for minute in range(9 * 60, 13 * 60, BookingManager.SLOT_INTERVAL_MINUTES):
+            slot = time(minute // 60, minute % 60)
+            check = BookingManager._check_booking_conflicts(
+                self.business, self.service, self.date, slot
+            )
+            if not check['has_conflict']:
+                expected.append(slot.strftime('%H:%M'))
+
+        self.assertEqual(self.get_slots(), expected)
+
+    def test_slot_lookup_query_count(self):
+        """Slot lookup cost does not grow with the number of slots or bookings"""
+        for start in [time(9, 0), time(11, 0), time(12, 30)]:
+            self.create_booking(self.business, self.short_service, self.date, start)
+
+        with self.assertNumQueries(5):
+            self.get_slots()
+
+
+class OccupancyIndexTest(BookingManagerTestMixin, TestCase):
+    """Test the cached occupancy index and its in-place maintenance"""
+
+    def setUp(self):
+        cache.clear()
+        self.business = self.create_business()
+        self.service = self.create_service(self.business, minutes=60)
+        self.date = timezone.now().date() + timedelta(days=7)
+        BusinessHours.objects.create(
+            business=self.business,
+            day=self.date.strftime('%A').lower(),
+            open_time=time(9, 0),
+            close_time=time(12, 0)
+        )
+
+    def get_slots(self, date=None):
+        return BookingManager.get_available_slots(
+            self.business.id, self.service.id, (date or self.date).strftime('%Y-%m-%d')
+        )['available_slots']
+
+    def test_cached_lookups_skip_booking_query(self):
+        """A warm index answers slot and conflict lookups without the bookings query"""
+        self.create_booking(self.business, self.service, self.date, time(10, 0))
+        self.get_slots()
+
+        with self.assertNumQueries(2):
+            self.assertEqual(self.get_slots(), ['09:00', '11:00', '11:30'])
+
+        with self.assertNumQueries(0):
+            check = BookingManager._check_booking_conflicts(
+                self.business, self.service, self.date, time(10, 30)
+            )
+        self.assertTrue(check['has_conflict'])
+
+    def test_index_patched_on_create_cancel_and_reschedule(self):
+        """Booking changes are applied to the warm index in place"""
+        self.assertEqual(len(self.get_slots()), 6)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            booking = self.create_booking(self.business, self.service, self.date, time(9, 0))
+        with self.assertNumQueries(2):
+            self.assertEqual(self.get_slots(), ['10:00', '10:30', '11:00', '11:30'])
+
+        other_date = self.date + timedelta(days=7)
+        self.get_slots(other_date)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            booking = Booking.objects.get(pk=booking.pk)
+            booking.appointment_date = other_date
+            booking.appointment_time = time(11, 0)
+            booking.save()
+        self.assertEqual(len(self.get_slots()), 6)
+        self.assertEqual(self.get_slots(other_date), ['09:00', '09:30', '10:00'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            booking.status = 'cancelled'
+            booking.save()
+        self.assertEqual(len(self.get_slots(other_date)), 6)
+
+    def test_service_change_rebuilds_index(self):
+        """Changing a service duration drops the cached days of its business"""
+        self.create_booking(self.business, self.service, self.date, time(10, 0))
+        self.get_slots()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.service.duration = timedelta(minutes=30)
+            self.service.save()
+
+        with self.assertNumQueries(3):
+            self.assertEqual(self.get_slots(), ['09:00', '09:30', '10:30', '11:00', '11:30'])
+
+    def test_lost_generation_never_revives_old_days(self):
+        """A generation counter lost to eviction restarts above earlier generations"""
+        self.create_booking(self.business, self.service, self.date, time(10, 0))
+        self.get_slots()
+        OccupancyCacheManager.invalidate_business(self.business.id)
+        cache.delete(OccupancyCacheManager._generation_key(self.business.id))
+
+        with patch('base.cache_manager.time.time', return_value=timezone.now().timestamp() + 60):
+            self.assertIsNone(OccupancyCacheManager.get_intervals(self.business.id, self.date))
+
+
+@patch('base.booking_manager.BookingManager._send_booking_notifications')
+class ConcurrentBookingTest(BookingManagerTestMixin, TransactionTestCase):
+    """Benchmark N concurrent bookers racing for one slot"""
+
+    BOOKERS = 10
+
+    def setUp(self):
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            self.skipTest('Concurrent bookers need a file-backed or server database')
+        cache.clear()
+        self.business = self.create_business()
+        self.service = self.create_service(self.business, minutes=60)
+        self.date = timezone.now().date() + timedelta(days=7)
+
+    def booking_data(self, index, appointment_time='10:00'):
+        return {
+            'business_id': self.business.id,
+            'service_id': self.service.id,
+            'customer_name': f'Customer {index}',
+            'customer_phone': f'+9665000000{index:02d}',
+            'appointment_date': self.date.strftime('%Y-%m-%d'),
+            'appointment_time': appointment_time,
+        }
+
+    def run_bookers(self, payloads):
+        barrier = threading.Barrier(len(payloads))
+        results = [None] * len(payloads)
+
+        def book(index, payload):
+            try:
+                barrier.wait()
+                results[index] = BookingManager.create_anonymous_booking(payload)
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=book, args=(index, payload))
+            for index, payload in enumerate(payloads)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_single_slot_accepts_exactly_one_booking(self, mock_notifications):
+        """Only one of N simultaneous requests for the same slot succeeds"""
+        results = self.run_bookers([self.booking_data(i) for i in range(self.BOOKERS)])
+
+        successes = [result for result in results if result['success']]
+        conflicts = [result for result in results if result.get('error_code') == 'TIME_CONFLICT']
+        self.assertEqual(len(successes), 1)
+        self.assertEqual(len(conflicts), self.BOOKERS - 1)
+        self.assertEqual(
+            Booking.objects.filter(business=self.business, appointment_date=self.date).count(),
+            1
+        )
+
+    def test_distinct_slots_all_succeed(self, mock_notifications):
+        """Bookers for non-overlapping slots are all accepted"""
+        payloads = [
+            self.booking_data(i, f'{9 + i}:00') for i in range(4)
+        ]
+        results = self.run_bookers(payloads)
+
+        self.assertTrue(all(result['success'] for result in results))
+
+
+class AvailableSlotsRangeTest(BookingManagerTestMixin, TestCase):
+    """Test the multi-day availability calendar"""
+
+    def setUp(self):
+        cache.clear()
+        self.business = self.create_business()
+        self.service = self.create_service(self.business, minutes=60)
+        self.start_date = timezone.now().date() + timedelta(days=1)
+        self.end_date = self.start_date + timedelta(days=13)
+
+        closed_day = self.start_date + timedelta(days=2)
+        BusinessHours.objects.create(
+            business=self.business,
+            day=closed_day.strftime('%A').lower(),
+            open_time=time(9, 0),
+            close_time=time(17, 0),
+            is_closed=True
+        )
+        for offset in range(0, 14, 3):
+            self.create_booking(
+                self.business, self.service,
+                self.start_date + timedelta(days=offset), time(10, 0)
+            )
+
+    def get_range(self):
+        return BookingManager.get_available_slots_range(
+            self.business.id, self.service.id,
+            self.start_date.strftime('%Y-%m-%d'), self.end_date.strftime('%Y-%m-%d')
+        )
+
+    def test_range_matches_single_day_lookups(self):
+        """Each day in the range equals the single-day slot lookup"""
+        result = self.get_range()
+        self.assertTrue(result['success'])
+        self.assertEqual(len(result['days']), 14)
+
+        for day in result['days']:
+            single = BookingManager.get_available_slots(
+                self.business.id, self.service.id, day['date']
+            )
+            self.assertEqual(day['available_slots'], single['available_slots'])
+
+        closed = result['days'][2]
+        self.assertTrue(closed['is_closed'])
+        self.assertEqual(closed['available_slots'], [])
+
+    def test_range_query_count(self):
+        """Hours and bookings are loaded once for the whole window"""
+        with self.assertNumQueries(5):
+            self.get_range()
+
+    def test_range_validation(self):
+        """Reversed and oversized windows are rejected"""
+        reversed_range = BookingManager.get_available_slots_range(
+            self.business.id, self.service.id,
+            self.end_date.strftime('%Y-%m-%d'), self.start_date.strftime('%Y-%m-%d')
+        )
+        self.assertFalse(reversed_range['success'])
+
+        too_long = BookingManager.get_available_slots_range(
+            self.business.id, self.service.id,
+            self.start_date.strftime('%Y-%m-%d'),
+            (self.start_date + timedelta(days=BookingManager.MAX_RANGE_DAYS)).strftime('%Y-%m-%d')
+        )
+        self.assertFalse(too_long['success'])
+
+    def test_range_endpoint(self):
+        """The public endpoint requires both bounds"""
+        url = f'/api/base/public/business/{self.business.id}/service/{self.service.id}/slots/range/'
+
+        response = self.client.get(url, {'from': self.start_date.strftime('%Y-%m-%d')})
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.get(url, {
+            'from': self.start_date.strftime('%Y-%m-%d'),
+            'to': self.end_date.strftime('%Y-%m-%d')
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['days']), 14)
+
+
+@patch('base.booking_manager.BookingManager._send_booking_notifications')
+class SlotHoldTest(BookingManagerTestMixin, TestCase):
+    """Test temporary slot holds during checkout"""
+
+    def setUp(self):
+        cache.clear()
+        self.business = self.create_business()
+        self.service = self.create_service(self.business, minutes=60)
+        self.date = timezone.now().date() + timedelta(days=7)
+        BusinessHours.objects.create(
+            business=self.business,
+            day=self.date.strftime('%A').lower(),
+            open_time=time(9, 0),
+            close_time=time(12, 0)
+        )
+
+    def slot_data(self, appointment_time='10:00', **extra):
+        return {
+            'business_id': self.business.id,
+            'service_id': self.service.id,
+            'appointment_date': self.date.strftime('%Y-%m-%d'),
+            'appointment_time': appointment_time,
+            **extra
+        }
+
+    def booking_data(self, phone, **extra):
+        return self.slot_data(
+            customer_name='Customer', customer_phone=phone, **extra
+        )
+
+    def get_slots(self):
+        return BookingManager.get_available_slots(
+            self.business.id, self.service.id, self.date.strftime('%Y-%m-%d')
+        )['available_slots']
+
+    def test_held_slot_hidden_and_exclusive(self, mock_notifications):
+        """A held interval disappears from listings and cannot be held twice"""
+        hold = BookingManager.hold_slot(self.slot_data())
+        self.assertTrue(hold['success'])
+        self.assertEqual(self.get_slots(), ['09:00', '11:00', '11:30'])
+
+        range_result = BookingManager.get_available_slots_range(
+            self.business.id, self.service.id,
+            self.date.strftime('%Y-%m-%d'), self.date.strftime('%Y-%m-%d')
+        )
+        self.assertEqual(range_result['days'][0]['available_slots'], ['09:00', '11:00', '11:30'])
+
+        second = BookingManager.hold_slot(self.slot_data('10:30'))
+        self.assertFalse(second['success'])
+        self.assertEqual(second['error_code'], 'TIME_CONFLICT')
+
+        self.assertTrue(BookingManager.release_slot_hold(hold['hold_token'])['success'])
+        self.assertEqual(len(self.get_slots()), 6)
+
+    def test_booking_respects_hold_token(self, mock_notifications):
+        """Only the holder can book a held slot, and booking consumes the hold"""
+        hold = BookingManager.hold_slot(self.slot_data())
+
+        other = BookingManager.create_anonymous_booking(self.booking_data('+966500000002'))
+        self.assertFalse(other['success'])
+        self.assertEqual(other['error_code'], 'TIME_CONFLICT')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            result = BookingManager.create_anonymous_booking(
+                self.booking_data('+966500000003', hold_token=hold['hold_token'])
+            )
+        self.assertTrue(result['success'])
+        self.assertIsNone(SlotHoldCacheManager.get_hold(hold['hold_token']))
+
+    def test_hold_endpoints(self, mock_notifications):
+        """The public hold endpoints report conflicts with 409"""
+        response = self.client.post('/api/base/public/slots/hold/', self.slot_data())
+        self.assertEqual(response.status_code, 201)
+        token = response.json()['hold_token']
+
+        response = self.client.post('/api/base/public/slots/hold/', self.slot_data())
+        self.assertEqual(response.status_code, 409)
+
+        response = self.client.post('/api/base/public/slots/hold/release/', {'hold_token': token})
+        self.assertEqual(response.status_code, 200)
+        response = self.client.post('/api/base/public/slots/hold/release/', {'hold_token': token})
+        self.assertEqual(response.status_code, 404)
+
+
+class AppointmentSpanTest(BookingManagerTestMixin, TestCase):
+    """Test stored appointment spans and SQL-side overlap detection"""
+
+    def setUp(self):
+        cache.clear()
+        self.business = self.create_business()
+        self.service = self.create_service(self.business, minutes=60)
+        self.date = timezone.now().date() + timedelta(days=7)
+
+    def test_span_maintained_on_save(self):
+        """Start and end follow the appointment time and service duration"""
+        booking = self.create_booking(self.business, self.service, self.date, time(10, 0))
+        start, end = Booking.compute_span(self.date, time(10, 0), timedelta(minutes=60))
+        self.assertEqual((booking.appointment_start, booking.appointment_end), (start, end))
+
+        booking.appointment_time = time(11, 0)
+        booking.save(update_fields=['appointment_time'])
+        booking.refresh_from_db()
+        self.assertEqual(booking.appointment_end - booking.appointment_start, timedelta(minutes=60))
+        self.assertEqual(timezone.localtime(booking.appointment_start).time(), time(11, 0))
+
+        service = Service.objects.get(pk=self.service.pk)
+        service.duration = timedelta(minutes=90)
+        service.save()
+        booking.refresh_from_db()
+        self.assertEqual(booking.appointment_end - booking.appointment_start, timedelta(minutes=90))
+
+    def test_uncached_conflict_check_is_one_query(self):
+        """The authoritative conflict check is a single EXISTS query"""
+        self.create_booking(self.business, self.service, self.date, time(10, 0))
+        self.create_booking(
+            self.business, self.service, self.date, time(12, 0), status='cancelled'
+        )
+
+        expectations = {time(9, 0): False, time(9, 30): True, time(10, 0): True,
+                        time(10, 59): True, time(11, 0): False, time(12, 0): False}
+        for slot, has_conflict in expectations.items():
+            with self.assertNumQueries(1):
+                check = BookingManager._check_booking_conflicts(
+                    self.business, self.service, self.date, slot, use_cache=False
+                )
+            self.assertEqual(check['has_conflict'], has_conflict, slot)
+
+    def test_create_serializer_rejects_overlap(self):
+        """Owner-side booking validation rejects overlapping appointments"""
+        from rest_framework.exceptions import ValidationError
+        from ..serializers import BookingCreateSerializer
+
+        self.create_booking(self.business, self.service, self.date, time(10, 0))
+        attrs = {'service': self.service, 'appointment_date': self.date}
+
+        with self.assertRaises(ValidationError) as raised:
+            BookingCreateSerializer().validate({**attrs, 'appointment_time': time(10, 30)})
+        self.assertIn('appointment_time', raised.exception.detail)
+
+        validated = BookingCreateSerializer().validate({**attrs, 'appointment_time': time(11, 0)})
+        self.assertEqual(validated['appointment_time'], time(11, 0))
+
+
+@patch('base.booking_manager.BookingManager._send_series_notifications')
+class BookingSeriesTest(BookingManagerTestMixin, TestCase):
+    """Test recurring booking series"""
+
+    def setUp(self):
+        cache.clear()
+        self.business = self.create_business()
+        self.service = self.create_service(self.business, minutes=60)
+        self.date = timezone.now().date() + timedelta(days=7)
+
+    def series_data(self, occurrences=4, **extra):
+        return {
+            'business_id': self.business.id,
+            'service_id': self.service.id,
+            'customer_name': 'Member',
+            'customer_phone': '+966500000050',
+            'appointment_date': self.date.strftime('%Y-%m-%d'),
+            'appointment_time': '10:00',
+            'frequency': 'weekly',
+            'occurrences': occurrences,
+            **extra
+        }
+
+    def test_series_created_with_single_notification(self, mock_notifications):
+        """Occurrences are expanded, inserted together and announced once"""
+        with self.captureOnCommitCallbacks(execute=True):
+            result = BookingManager.create_booking_series(self.series_data())
+
+        self.assertTrue(result['success'])
+        self.assertEqual(
+            [booking['appointment_date'] for booking in result['bookings']],
+            [(self.date + timedelta(weeks=week)).strftime('%Y-%m-%d') for week in range(4)]
+        )
+        bookings = Booking.objects.filter(series__series_id=result['series_id'])
+        self.assertEqual(bookings.count(), 4)
+        self.assertTrue(all(booking.appointment_start for booking in bookings))
+        mock_notifications.assert_called_once()
+
+        check = BookingManager._check_booking_conflicts(
+            self.business, self.service, self.date + timedelta(weeks=3), time(10, 30)
+        )
+        self.assertTrue(check['has_conflict'])
+
+    def test_unavailable_occurrences(self, mock_notifications):
+        """Conflicts and closed days reject the series unless skipping is requested"""
+        self.create_booking(self.business, self.service, self.date + timedelta(weeks=1), time(10, 30))
+        hours = BusinessHours.objects.create(
+            business=self.business,
+            day=self.date.strftime('%A').lower(),
+            open_time=time(9, 0),
+            close_time=time(17, 0),
+            is_closed=True
+        )
+
+        result = BookingManager.create_booking_series(self.series_data())
+        self.assertFalse(result['success'])
+        self.assertEqual(result['error_code'], 'TIME_CONFLICT')
+        self.assertEqual(len(result['unavailable']), 4)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            hours.is_closed = False
+            hours.save()
+        result = BookingManager.create_booking_series(self.series_data(skip_conflicts=True))
+        self.assertTrue(result['success'])
+        self.assertEqual(len(result['bookings']), 3)
+        self.assertEqual(
+            result['skipped'],
+            [{'date': (self.date + timedelta(weeks=1)).strftime('%Y-%m-%d'),
+              'reason': 'Time slot conflicts with another booking'}]
+        )
+
+    def test_series_query_count_is_flat(self, mock_notifications):
+        """Validation and inserts do not add queries per occurrence"""
+        def count_queries(occurrences, phone):
+            with CaptureQueriesContext(connection) as queries:
+                result = BookingManager.create_booking_series(
+                    self.series_data(occurrences, customer_phone=phone)
+                )
+            self.assertTrue(result['success'])
+            Booking.objects.all().delete()
+            return len(queries)
+
+        BusinessSchedule.for_business(self.business.id)
+        self.assertEqual(count_queries(2, '+966500000051'), count_queries(12, '+966500000052'))
+
+
+class BusinessScheduleTest(BookingManagerTestMixin, TestCase):
+    """Test the compiled weekly schedule and dated exceptions"""
+
+    def setUp(self):
+        cache.clear()
+        self.business = self.create_business()
+        self.service = self.create_service(self.business, minutes=60)
+        self.date = timezone.now().date() + timedelta(days=7)
+        self.hours = BusinessHours.objects.create(
+            business=self.business,
+            day=self.date.strftime('%A').lower(),
+            open_time=time(9, 0),
+            close_time=time(12, 0)
+        )
+
+    def test_cached_schedule_answers_hours_checks(self):
+        """Open-hours checks stop querying once the schedule is compiled"""
+        BusinessSchedule.for_business(self.business.id)
+
+        with self.assertNumQueries(0):
+            check = BookingManager._check_business_availability(self.business, self.date, time(13, 0))
+        self.assertFalse(check['available'])
+
+    def test_exceptions_override_weekly_hours(self):
+        """Holiday closures and special hours replace the weekly hours on their dates"""
+        with self.captureOnCommitCallbacks(execute=True):
+            BusinessHoursException.objects.create(
+                business=self.business, start_date=self.date, end_date=self.date, is_closed=True,
+                reason='Eid'
+            )
+            BusinessHoursException.objects.create(
+                business=self.business,
+                start_date=self.date + timedelta(days=7),
+                end_date=self.date + timedelta(days=36),
+                open_time=time(20, 0),
+                close_time=time(22, 0),
+                reason='Ramadan'
+            )
+
+        closed = BookingManager.get_available_slots(
+            self.business.id, self.service.id, self.date.strftime('%Y-%m-%d')
+        )
+        self.assertEqual(closed['available_slots'], [])
+
+        ramadan = BookingManager.get_available_slots(
+            self.business.id, self.service.id, (self.date + timedelta(days=7)).strftime('%Y-%m-%d')
+        )
+        self.assertEqual(ramadan['available_slots'], ['20:00', '20:30', '21:00', '21:30'])
+
+        after = BookingManager.get_available_slots(
+            self.business.id, self.service.id, (self.date + timedelta(days=42)).strftime('%Y-%m-%d')
+        )
+        self.assertEqual(after['available_slots'][0], '09:00')
+
+    def test_hours_change_invalidates_schedule(self):
+        """Saving business hours retires the cached schedule"""
+        self.assertIsNotNone(BusinessSchedule.for_business(self.business.id).hours_for(self.date))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.hours.is_closed = True
+            self.hours.save()
+
+        self.assertTrue(BusinessSchedule.for_business(self.business.id).hours_for(self.date).is_closed)
+
+    def test_lost_version_never_revives_old_schedule(self):
+        """A schedule version lost to eviction restarts above earlier versions"""
+        BusinessSchedule.for_business(self.business.id)
+        ScheduleCacheManager.invalidate_business(self.business.id)
+        cache.delete(ScheduleCacheManager._version_key(self.business.id))
+
+        with patch('base.cache_manager.time.time', return_value=timezone.now().timestamp() + 60):
+            self.assertIsNone(ScheduleCacheManager.get_schedule(self.business.id)[1])
+
+
+@patch('base.booking_manager.BookingManager._send_booking_notifications')
+class CapacitySlotsTest(BookingManagerTestMixin, TestCase):
+    """Test slot granularity and parallel booking capacity"""
+
+    def setUp(self):
+        cache.clear()
+        self.business = self.create_business()
+        self.business.booking_capacity = 2
+        self.business.save()
+        self.service = self.create_service(self.business, minutes=60)
+        self.date = timezone.now().date() + timedelta(days=7)
+        BusinessHours.objects.create(
+            business=self.business,
+            day=self.date.strftime('%A').lower(),
+            open_time=time(9, 0),
+            close_time=time(12, 0)
+        )
+
+    def slot_data(self, appointment_time='10:00', **extra):
+        return {
+            'business_id': self.business.id,
+            'service_id': self.service.id,
+            'appointment_date': self.date.strftime('%Y-%m-%d'),
+            'appointment_time': appointment_time,
+            **extra
+        }
+
+    def get_slots(self, service=None):
+        return BookingManager.get_available_slots(
+            self.business.id, (service or self.service).id, self.date.strftime('%Y-%m-%d')
+        )['available_slots']
+
+    def test_slot_granularity(self, mock_notifications):
+        """Slots step by the business interval unless the service overrides it"""
+        self.business.slot_interval = 45
+        self.business.save()
+        self.assertEqual(self.get_slots(), ['09:00', '09:45', '10:30', '11:15'])
+
+        self.service.slot_interval = 60
+        self.service.save()
+        self.assertEqual(self.get_slots(), ['09:00', '10:00', '11:00'])
+
+    def test_parallel_bookings_up_to_capacity(self, mock_notifications):
+        """Overlapping bookings are accepted until every seat is taken"""
+        for phone in ['+966500000061', '+966500000062']:
+            result = BookingManager.create_anonymous_booking(
+                self.slot_data(customer_name='Customer', customer_phone=phone)
+            )
+            self.assertTrue(result['success'])
+
+        third = BookingManager.create_anonymous_booking(
+            self.slot_data('10:30', customer_name='Customer', customer_phone='+966500000063')
+        )
+        self.assertFalse(third['success'])
+        self.assertEqual(third['error'], 'Time slot is fully booked')
+
+        self.assertEqual(self.get_slots(), ['09:00', '11:00', '11:30'])
+
+    def test_sweep_respects_capacity(self, mock_notifications):
+        """A slot stays free until the peak of parallel bookings reaches capacity"""
+        short_service = self.create_service(self.business, minutes=30)
+        self.create_booking(self.business, short_service, self.date, time(9, 30))
+        self.create_booking(self.business, short_service, self.date, time(10, 30))
+        self.create_booking(self.business, self.service, self.date, time(10, 30))
+
+        with self.assertNumQueries(5):
+            slots = self.get_slots()
+        self.assertEqual(slots, ['09:00', '09:30', '11:00', '11:30'])
+
+    def test_holds_take_seats(self, mock_notifications):
+        """Holds fill the seats left beside existing bookings"""
+        self.create_booking(self.business, self.service, self.date, time(10, 0))
+
+        hold = BookingManager.hold_slot(self.slot_data())
+        self.assertTrue(hold['success'])
+        self.assertEqual(self.get_slots(), ['09:00', '11:00', '11:30'])
+        self.assertFalse(BookingManager.hold_slot(self.slot_data('10:30'))['success'])
+
+        result = BookingManager.create_anonymous_booking(self.slot_data(
+            customer_name='Customer', customer_phone='+966500000064',
+            hold_token=hold['hold_token']
+        ))
+        self.assertTrue(result['success'])
+
+
+class BookingLookupCacheTest(BookingManagerTestMixin, TestCase):
+    """Test the read-through cache behind public booking lookups"""
+
+    def setUp(self):
+        cache.clear()
+        self.business = self.create_business()
+        self.service = self.create_service(self.business, minutes=60)
+        self.date = timezone.now().date() + timedelta(days=7)
+        self.booking = self.create_booking(self.business, self.service, self.date, time(10, 0))
+        self.url = f'/api/base/public/booking/{self.booking.booking_id}/'
+
+    def lookup(self):
+        return BookingManager.get_booking_by_id(str(self.booking.booking_id))
+
+    def test_repeat_lookup_skips_database(self):
+        """Only the first lookup runs the joined query"""
+        with self.assertNumQueries(1):
+            first = self.lookup()
+        with self.assertNumQueries(0):
+            second = self.lookup()
+
+        self.assertEqual(first, second)
+        self.assertIsNone(BookingManager.get_booking_by_id('not-a-uuid'))
+
+    def test_related_changes_refresh_lookup(self):
+        """Changes to the booking, its service or its business are visible at once"""
+        self.lookup()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.service.name = 'Beard Trim'
+            self.service.save()
+        self.assertEqual(self.lookup()['service_name'], 'Beard Trim')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.business.address = 'Jeddah'
+            self.business.save()
+        self.assertEqual(self.lookup()['business_address'], 'Jeddah')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.business.user.business_name = 'Renamed Barber'
+            self.business.user.save()
+        self.assertEqual(self.lookup()['business_name'], 'Renamed Barber')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.booking.status = 'completed'
+            self.booking.save()
+        self.assertEqual(self.lookup()['status'], 'completed')
+
+    def test_unrelated_changes_keep_lookup(self):
+        """Other services and bookings of the business leave the entry cached"""
+        self.lookup()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            other = self.create_service(self.business, minutes=30)
+            other.name = 'Other'
+            other.save()
+            self.create_booking(self.business, other, self.date, time(14, 0), phone='+966500000091')
+
+        with self.assertNumQueries(0):
+            self.lookup()
+
+    def test_endpoint_honours_etag(self):
+        """Clients revalidating with a matching ETag get 304 without a body"""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        self.assertEqual(response['Cache-Control'], 'private, no-cache')
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.booking.notes = 'Running late'
+            self.booking.save()
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json()['booking']['notes'], 'Running late')
@@ -0,0 +1,125 @@
+# test_daily_stats_manager.py - Daily booking rollup tests
+import io
+from datetime import time, timedelta
+from decimal import Decimal
+from unittest.mock import patch
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from ..daily_stats_manager import DailyStatsManager
+from ..models import Booking, BusinessDailyStats
+from ..views import _build_business_analytics
+from utils.notification_manager import NotificationManager
+from .test_booking_manager import BookingManagerTestMixin
+
+
+class DailyStatsTest(BookingManagerTestMixin, TestCase):
+    """Test that booking changes keep the daily rollups in step with the bookings"""
+
+    def setUp(self):
+        cache.clear()
+        self.today = timezone.localdate()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.business = self.create_business()
+            self.service = self.create_service(self.business, minutes=60, price=100)
+            self.booking = self.create_booking(self.business, self.service, self.today, time(10, 0))
+
+    def stats(self, day=None):
+        return BusinessDailyStats.objects.get(business=self.business, date=day or self.today)
+
+    def assertInStep(self, date_from, date_to):
+        """The rollup rows of the range equal a rebuild from the bookings"""
+        self.assertEqual(DailyStatsManager.rebuild(self.business.id, date_from, date_to), 0)
+
+    def test_created_booking_counted(self):
+        """A new booking adds to its status, hour and the new customers"""
+        stats = self.stats()
+        self.assertEqual((stats.confirmed_bookings, stats.total_bookings), (1, 1))
+        self.assertEqual(stats.hourly_bookings[10], 1)
+        self.assertEqual((stats.new_customers, stats.revenue), (1, 0))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_booking(self.business, self.service, self.today, time(14, 0))
+        stats = self.stats()
+        self.assertEqual((stats.confirmed_bookings, stats.new_customers), (2, 1))
+        self.assertInStep(self.today, self.today)
+
+    def test_status_change_moves_revenue(self):
+        """Completing a booking moves it between status counts and adds its price"""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.booking.status = 'completed'
+            self.booking.save()
+
+        stats = self.stats()
+        self.assertEqual((stats.confirmed_bookings, stats.completed_bookings), (0, 1))
+        self.assertEqual(stats.revenue, Decimal('100'))
+        self.assertInStep(self.today, self.today)
+
+    def test_rescheduled_and_deleted_bookings(self):
+        """Moving a booking changes both days, deleting it empties its day"""
+        tomorrow = self.today + timedelta(days=1)
+        with self.captureOnCommitCallbacks(execute=True):
+            booking = Booking.objects.get(id=self.booking.id)
+            booking.appointment_date = tomorrow
+            booking.appointment_time = time(15, 0)
+            booking.save()
+
+        self.assertEqual(self.stats().total_bookings, 0)
+        self.assertEqual(self.stats(tomorrow).hourly_bookings[15], 1)
+        self.assertInStep(self.today, tomorrow)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            booking.delete()
+        self.assertEqual(self.stats(tomorrow).total_bookings, 0)
+        self.assertEqual(DailyStatsManager.compute(self.business.id, tomorrow, tomorrow), {})
+
+    def test_reconcile_command_repairs_drift(self):
+        """The command rewrites drifted rows and backfill recreates missing ones"""
+        BusinessDailyStats.objects.filter(business=self.business).update(confirmed_bookings=5)
+
+        out = io.StringIO()
+        call_command('reconcile_daily_stats', stdout=out)
+        self.assertIn('corrected 1 rows', out.getvalue())
+        self.assertEqual(self.stats().confirmed_bookings, 1)
+
+        BusinessDailyStats.objects.all().delete()
+        call_command('reconcile_daily_stats', '--backfill', stdout=io.StringIO())
+        self.assertEqual(self.stats().total_bookings, 1)
+        self.assertInStep(self.today, self.today)
+
+    def test_bulk_writes_rebuild_their_days(self):
+        """Bulk creates bypass the signals and rebuild the touched days on commit"""
+        future = self.today + timedelta(days=30)
+        with self.captureOnCommitCallbacks(execute=True):
+            Booking.objects.bulk_create([Booking(
+                business=self.business, service=self.service, customer=self.booking.customer,
+                appointment_date=future, appointment_time=time(9, 0), total_price=100
+            )])
+            DailyStatsManager.rebuild_on_commit(self.business.id, [future])
+
+        self.assertEqual(self.stats(future).pending_bookings, 1)
+
+    def test_analytics_read_rollups(self):
+        """Status breakdown, peak hours and new customers come from the rollup rows"""
+        BusinessDailyStats.objects.filter(business=self.business).update(cancelled_bookings=3)
+
+        analytics = _build_business_analytics(self.business, 'today', False)
+        self.assertEqual(analytics['status_breakdown'], {'confirmed': 1, 'cancelled': 3})
+        self.assertEqual(analytics['cancellation_rate'], 75.0)
+        self.assertEqual(analytics['peak_hours'], [{'hour': 10, 'count': 1}])
+        self.assertEqual(analytics['customer_insights']['new_customers'], 1)
+
+    @patch('utils.whatsapp.send_whatsapp_message', return_value={'success': True})
+    def test_daily_summary_reads_rollups(self, send_whatsapp_message):
+        """The WhatsApp summary counts today's and upcoming bookings from the rollups"""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_booking(
+                self.business, self.service, self.today + timedelta(days=2), time(11, 0),
+                status='pending'
+            )
+
+        self.assertTrue(NotificationManager.send_business_daily_summary(self.business.user))
+        summary = send_whatsapp_message.call_args.kwargs['summary_data']
+        self.assertEqual((summary['today_bookings'], summary['upcoming_count']), (1, 1))
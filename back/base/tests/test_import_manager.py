@@ -0,0 +1,141 @@
+# test_import_manager.py - Bulk booking import tests
+import io
+import os
+import tempfile
+from datetime import time, timedelta
+from unittest.mock import patch
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from ..import_manager import BookingImportManager
+from ..models import Booking, Customer
+from .test_booking_manager import BookingManagerTestMixin
+
+
+class BookingImportTest(BookingManagerTestMixin, TestCase):
+    """Test streaming bulk booking imports"""
+
+    def setUp(self):
+        cache.clear()
+        self.business = self.create_business()
+        self.service = self.create_service(self.business, minutes=60)
+        self.date = timezone.now().date() + timedelta(days=7)
+        self.create_booking(self.business, self.service, self.date, time(9, 0))
+
+    def row(self, index, start, **extra):
+        return {
+            'customer_name': f'Imported {index}',
+            'customer_phone': f'+9665100{index:05d}',
+            'service_id': self.service.id,
+            'appointment_date': self.date.strftime('%Y-%m-%d'),
+            'appointment_time': start,
+            **extra
+        }
+
+    def test_import_reports_row_errors(self):
+        """Valid rows are imported and every rejected row is reported"""
+        rows = [
+            self.row(1, '10:00'),
+            self.row(2, '10:30'),
+            self.row(3, '09:00'),
+            self.row(4, '11:00', customer_phone='0501234567'),
+            self.row(5, '12:00', service_id='', service_name='missing'),
+            self.row(6, '25:00'),
+            self.row(7, '10:00', status='completed'),
+            self.row(1, '13:00'),
+        ]
+
+        report = BookingImportManager.import_bookings(self.business, rows)
+
+        self.assertTrue(report['success'])
+        self.assertEqual((report['total_rows'], report['imported'], report['failed']), (8, 3, 5))
+        self.assertEqual(
+            [(error['row'], error['error_code']) for error in report['errors']],
+            [(4, 'INVALID_PHONE'), (5, 'SERVICE_NOT_FOUND'), (6, 'INVALID_DATETIME'),
+             (2, 'TIME_CONFLICT'), (3, 'TIME_CONFLICT')]
+        )
+
+        imported = Booking.objects.filter(customer__name__startswith='Imported')
+        self.assertEqual(imported.count(), 3)
+        self.assertEqual(Customer.objects.filter(name='Imported 1').count(), 1)
+        for booking in imported:
+            self.assertFalse(booking.qr_code)
+            self.assertEqual(booking.appointment_end - booking.appointment_start, timedelta(hours=1))
+
+    def test_queries_do_not_grow_with_rows(self):
+        """Customers, conflicts and inserts cost a fixed number of queries per chunk"""
+        def import_count(count, offset):
+            rows = [
+                self.row(offset + i, '10:00', appointment_date=(
+                    self.date + timedelta(days=offset + i)
+                ).strftime('%Y-%m-%d'))
+                for i in range(count)
+            ]
+            with CaptureQueriesContext(connection) as queries:
+                report = BookingImportManager.import_bookings(self.business, rows)
+            self.assertEqual(report['imported'], count)
+            return len(queries)
+
+        self.assertEqual(import_count(10, 1), import_count(40, 100))
+
+    def test_customer_created_concurrently(self):
+        """A customer inserted between the lookup and the insert is reused, not a failure"""
+        bulk_create = Customer.objects.bulk_create
+
+        def racing_bulk_create(objs, **kwargs):
+            Customer.objects.create(phone_number='+966510000001', name='Imported 1')
+            return bulk_create(objs, **kwargs)
+
+        with patch.object(Customer.objects, 'bulk_create', side_effect=racing_bulk_create):
+            report = BookingImportManager.import_bookings(
+                self.business, [self.row(1, '10:00'), self.row(2, '11:00')]
+            )
+
+        self.assertEqual((report['imported'], report['failed']), (2, 0))
+        self.assertEqual(Customer.objects.filter(name='Imported 1').count(), 1)
+        self.assertEqual(Booking.objects.filter(customer__name__startswith='Imported').count(), 2)
+
+    def test_dry_run_detects_conflicts_without_writing(self):
+        """A dry run validates the whole file but writes nothing"""
+        rows = [self.row(1, '10:00'), self.row(2, '10:00')]
+
+        report = BookingImportManager.import_bookings(self.business, rows, dry_run=True)
+
+        self.assertEqual((report['imported'], report['failed']), (1, 1))
+        self.assertEqual(Booking.objects.count(), 1)
+
+    def test_csv_command_and_endpoint(self):
+        """The management command and owner endpoint both stream CSV files"""
+        csv_data = (
+            'customer_name,customer_phone,service_name,appointment_date,appointment_time\n'
+            f'Ali,+966511111111,{self.service.name},{self.date:%Y-%m-%d},10:00\n'
+            f'Sara,+966522222222,{self.service.name},{self.date:%Y-%m-%d},11:00\n'
+        )
+
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as handle:
+            handle.write(csv_data)
+        try:
+            out = io.StringIO()
+            call_command('import_bookings', self.business.id, handle.name, stdout=out)
+        finally:
+            os.unlink(handle.name)
+        self.assertIn('Imported 2 of 2 bookings', out.getvalue())
+
+        user = self.business.user
+        user.role = 'business_owner'
+        user.is_verified = True
+        user.save()
+        client = APIClient()
+        client.force_authenticate(user)
+
+        upload = SimpleUploadedFile('bookings.csv', csv_data.encode('utf-8'))
+        response = client.post('/api/base/bookings/import/', {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['imported'], 0)
+        self.assertEqual(response.json()['failed'], 2)
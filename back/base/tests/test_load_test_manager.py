@@ -0,0 +1,73 @@
+# test_load_test_manager.py - Booking load test harness tests
+import io
+import json
+from datetime import time
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TransactionTestCase
+
+from ..load_test_manager import LoadTestManager
+from ..models import Booking, Customer, OutboxMessage
+
+User = get_user_model()
+
+
+class LoadTestManagerTest(TransactionTestCase):
+    """Test the concurrent booking load test"""
+
+    def setUp(self):
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            self.skipTest('Concurrent customers need a file-backed or server database')
+        cache.clear()
+
+    def test_rush_never_double_books(self):
+        """Customers racing for a few slots fill each slot at most once"""
+        fixture = LoadTestManager.create_fixture(duration=60, close_time=time(12, 0))
+        report = LoadTestManager.run(
+            fixture['business'], fixture['service'], fixture['date'],
+            customers=12, concurrency=6, cancel_rate=0, seed=7
+        )
+
+        self.assertEqual(report['double_bookings'], 0)
+        self.assertEqual(report['server_errors'], 0)
+        # Customers give up after BOOKING_ATTEMPTS, so a slot may stay free
+        self.assertGreater(report['booked'], 0)
+        self.assertLessEqual(report['booked'], 3)
+        self.assertEqual(Booking.objects.filter(business=fixture['business']).count(), report['booked'])
+        self.assertGreaterEqual(report['endpoints']['slots']['requests'], 12)
+        self.assertGreater(report['endpoints']['book']['queries_per_request'], 0)
+        self.assertFalse(OutboxMessage.objects.exists())
+
+        LoadTestManager.remove_fixture(fixture['business'], customers=12)
+        self.assertFalse(Booking.objects.exists())
+        self.assertFalse(Customer.objects.exists())
+
+    def test_remove_fixture_keeps_other_businesses(self):
+        """Cleanup only removes customers the run created for its business"""
+        fixture = LoadTestManager.create_fixture()
+        other = LoadTestManager.create_fixture()
+        customer = Customer.objects.create(
+            phone_number=LoadTestManager._phone(0), name=f'{LoadTestManager.CUSTOMER_NAME} 0'
+        )
+        Booking.objects.create(
+            business=other['business'], service=other['service'], customer=customer,
+            appointment_date=other['date'], appointment_time=time(10, 0), total_price=50
+        )
+
+        LoadTestManager.remove_fixture(fixture['business'], customers=1)
+        self.assertTrue(Customer.objects.filter(id=customer.id).exists())
+        self.assertEqual(Booking.objects.filter(business=other['business']).count(), 1)
+
+    def test_command_reports_and_cleans_up(self):
+        """The command prints the JSON report and leaves the configured database untouched"""
+        out = io.StringIO()
+        call_command('load_test_booking', '--customers', '8', '--concurrency', '4', '--json', stdout=out)
+
+        report = json.loads(out.getvalue().split('\n', 1)[1])
+        self.assertEqual(report['customers'], 8)
+        self.assertEqual(report['double_bookings'], 0)
+        self.assertIn('p99_ms', report['endpoints']['book'])
+        self.assertFalse(User.objects.filter(email__startswith='loadtest-').exists())
+        self.assertFalse(Booking.objects.exists())
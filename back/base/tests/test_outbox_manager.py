@@ -0,0 +1,117 @@
+# test_outbox_manager.py - Transactional outbox tests
+import io
+from datetime import time, timedelta
+from unittest.mock import patch
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from ..booking_manager import BookingManager
+from ..models import Booking, BusinessHours, Notification, OutboxMessage
+from ..outbox_manager import OutboxManager
+from .test_booking_manager import BookingManagerTestMixin
+
+
+@patch('utils.whatsapp.send_whatsapp_message')
+class OutboxTest(BookingManagerTestMixin, TestCase):
+    """Test that booking notifications go through the outbox"""
+
+    def setUp(self):
+        cache.clear()
+        self.business = self.create_business()
+        self.service = self.create_service(self.business, minutes=60)
+        self.date = timezone.now().date() + timedelta(days=7)
+        BusinessHours.objects.create(
+            business=self.business,
+            day=self.date.strftime('%A').lower(),
+            open_time=time(9, 0),
+            close_time=time(12, 0)
+        )
+
+    def book(self):
+        result = BookingManager.create_anonymous_booking({
+            'business_id': self.business.id,
+            'service_id': self.service.id,
+            'customer_name': 'Customer',
+            'customer_phone': '+966500000081',
+            'appointment_date': self.date.strftime('%Y-%m-%d'),
+            'appointment_time': '10:00'
+        })
+        self.assertTrue(result['success'])
+        return result
+
+    def test_booking_queues_messages_without_sending(self, mock_send):
+        """The booking transaction writes outbox rows and never calls the API"""
+        result = self.book()
+
+        mock_send.assert_not_called()
+        self.assertEqual(
+            sorted(OutboxMessage.objects.values_list('dedup_key', flat=True)),
+            [f"booking_confirmation:{result['booking_id']}", f"new_booking:{result['booking_id']}"]
+        )
+        self.assertEqual(Notification.objects.filter(sent_via_whatsapp=False).count(), 2)
+
+        # Queueing the same notifications again is deduplicated
+        BookingManager._send_booking_notifications(
+            Booking.objects.get(booking_id=result['booking_id'])
+        )
+        self.assertEqual(OutboxMessage.objects.count(), 2)
+
+    def test_worker_sends_and_flags_notifications(self, mock_send):
+        """Delivered messages are marked sent along with their notification records"""
+        mock_send.return_value = {'success': True}
+        self.book()
+
+        report = OutboxManager.drain()
+
+        self.assertEqual((report['claimed'], report['sent']), (2, 2))
+        self.assertEqual(mock_send.call_count, 2)
+        self.assertFalse(OutboxMessage.objects.exclude(status='sent').exists())
+        self.assertEqual(Notification.objects.filter(sent_via_whatsapp=True).count(), 2)
+        self.assertEqual(OutboxManager.drain()['claimed'], 0)
+
+    def test_failures_retry_with_backoff(self, mock_send):
+        """Transport failures are retried later and given up after MAX_ATTEMPTS"""
+        mock_send.return_value = {'success': False, 'message': 'Network error', 'error_code': 'NETWORK_ERROR'}
+        self.book()
+
+        report = OutboxManager.drain()
+        self.assertEqual((report['claimed'], report['retried']), (2, 2))
+
+        message = OutboxMessage.objects.first()
+        self.assertEqual((message.status, message.attempts), ('pending', 1))
+        self.assertGreater(message.available_at, timezone.now())
+        self.assertEqual(message.last_error, 'Network error')
+
+        for _ in range(OutboxManager.MAX_ATTEMPTS - 1):
+            OutboxMessage.objects.update(available_at=timezone.now())
+            OutboxManager.drain()
+
+        self.assertEqual(
+            set(OutboxMessage.objects.values_list('status', 'attempts')),
+            {('failed', OutboxManager.MAX_ATTEMPTS)}
+        )
+
+    def test_permanent_failures_are_not_retried(self, mock_send):
+        """Failures that can never succeed fail the message on the first attempt"""
+        mock_send.side_effect = lambda phone_number, message_type, **kwargs: {
+            'success': False,
+            'message': f'Unknown message type: {message_type}',
+            'error_code': 'UNKNOWN_MESSAGE_TYPE'
+        }
+        self.book()
+
+        report = OutboxManager.drain()
+
+        self.assertEqual((report['claimed'], report['failed'], report['retried']), (2, 2, 0))
+        self.assertEqual(set(OutboxMessage.objects.values_list('status', 'attempts')), {('failed', 1)})
+
+    def test_process_outbox_command(self, mock_send):
+        """The worker command drains the outbox and reports the outcome"""
+        mock_send.return_value = {'success': True}
+        self.book()
+
+        out = io.StringIO()
+        call_command('process_outbox', '--workers', '2', stdout=out)
+        self.assertIn('Sent 2 of 2 messages', out.getvalue())
@@ -1,20 +1,29 @@
 # test_performance.py - Performance and caching tests
+import asyncio
+import threading
 import time
+import zlib
 from datetime import datetime, timedelta
+from decimal import Decimal
 from django.test import TestCase, override_settings
 from django.contrib.auth import get_user_model
 from django.core.cache import cache
-from django.db import connection
+from django.db import connection, transaction
+from django.utils import timezone
 from django.test.utils import override_settings
 from rest_framework.test import APITestCase, APIClient
 from rest_framework import status
+from unittest import skipUnless
 from unittest.mock import patch, MagicMock
+from asgiref.sync import async_to_sync
 
 from ..cache_manager import (
-    CacheManager, QueryCacheManager, SubscriptionCacheManager,
-    AnalyticsCacheManager, DatabaseOptimizer, cache_result
+    CacheCodec, CacheManager, CacheMetrics, QueryCacheManager, SubscriptionCacheManager,
+    AnalyticsCacheManager, DatabaseOptimizer, LocalCache, cache_result
 )
-from ..models import Service, Booking, Customer
+from ..cache_manager import msgpack
+from ..models import Service, Booking, Customer, Notification
+from .test_booking_manager import BookingManagerTestMixin
 from accounts.models import BusinessProfile
 
 User = get_user_model()
@@ -73,16 +82,20 @@ class CacheManagerTest(TestCase):
         business_id = self.business.id
         
         # Set some business-related cache entries
-        CacheManager.set(f'business:{business_id}:data', {'test': 'data'})
-        CacheManager.set(f'service:123:business:{business_id}', {'service': 'data'})
-        CacheManager.set(f'analytics:{business_id}:monthly', {'analytics': 'data'})
+        CacheManager.set(CacheManager.generate_key('business', business_id, 'data'), {'test': 'data'})
+        CacheManager.set(CacheManager.generate_key('service', 123, business_id=business_id), {'service': 'data'})
+        CacheManager.set(CacheManager.generate_key('analytics', business_id, 'monthly'), {'analytics': 'data'})
+        other_key = CacheManager.generate_key('business', business_id + 1, 'data')
+        CacheManager.set(other_key, {'test': 'other'})
         
         # Invalidate business cache
         CacheManager.invalidate_business_cache(business_id)
         
-        # Verify cache entries are removed
-        self.assertIsNone(CacheManager.get(f'business:{business_id}:data'))
-        # Note: Pattern deletion may not work with all cache backends in tests
+        # Keys generated now carry the new namespace version
+        self.assertIsNone(CacheManager.get(CacheManager.generate_key('business', business_id, 'data')))
+        self.assertIsNone(CacheManager.get(CacheManager.generate_key('service', 123, business_id=business_id)))
+        self.assertIsNone(CacheManager.get(CacheManager.generate_key('analytics', business_id, 'monthly')))
+        self.assertEqual(CacheManager.get(other_key), {'test': 'other'})
     
     def test_subscription_cache_manager(self):
         """Test subscription-specific cache operations"""
@@ -136,6 +149,370 @@ class CacheManagerTest(TestCase):
         self.assertIsNone(cached_analytics)
 
 
+class CacheNamespaceTest(TestCase):
+    """Test version-based invalidation of business and user namespaces"""
+    
+    def setUp(self):
+        cache.clear()
+    
+    def test_invalidation_retires_only_its_namespace(self):
+        """One increment retires a business's keys and leaves other namespaces alone"""
+        SubscriptionCacheManager.set_user_subscription(7, {'tier': 'premium'})
+        AnalyticsCacheManager.set_business_analytics(7, {'total_bookings': 3})
+        AnalyticsCacheManager.set_business_analytics(8, {'total_bookings': 5})
+        
+        with self.assertNumQueries(0):
+            CacheManager.invalidate_business_cache(7)
+        
+        self.assertIsNone(AnalyticsCacheManager.get_business_analytics(7))
+        self.assertEqual(AnalyticsCacheManager.get_business_analytics(8), {'total_bookings': 5})
+        self.assertEqual(SubscriptionCacheManager.get_user_subscription(7), {'tier': 'premium'})
+        
+        CacheManager.invalidate_user_cache(7)
+        self.assertIsNone(SubscriptionCacheManager.get_user_subscription(7))
+    
+    def test_lost_counter_never_revives_old_keys(self):
+        """A counter evicted from the cache restarts above the versions in use"""
+        old_key = CacheManager.generate_key('business', 9, 'data')
+        CacheManager.set(old_key, 'stale')
+        
+        cache.delete(CacheManager._namespace_key('business', 9))
+        time.sleep(0.002)
+        
+        self.assertNotEqual(CacheManager.generate_key('business', 9, 'data'), old_key)
+    
+    def test_permission_cache_follows_user_namespace(self):
+        """Invalidating a user drops every cached permission check"""
+        from accounts.role_manager import RoleManager
+        
+        user = User.objects.create_user(email='perm@example.com', password='testpass123')
+        RoleManager.get_user_permissions(user)
+        key = CacheManager.generate_key('permission', user.id, 'all')
+        self.assertIsNotNone(cache.get(key))
+        
+        RoleManager.invalidate_user_cache(user)
+        self.assertNotEqual(CacheManager.generate_key('permission', user.id, 'all'), key)
+
+
+@override_settings(CACHE_LOCAL_TIER=True)
+class LocalCacheTierTest(TestCase):
+    """Test the in-process tier in front of the shared cache"""
+    
+    def setUp(self):
+        cache.clear()
+        CacheManager.local.clear()
+        self.addCleanup(CacheManager.local.clear)
+    
+    def test_hits_skip_shared_cache(self):
+        """Repeated reads are served locally until the short timeout passes"""
+        CacheManager.set('hot', {'tier': 'premium'})
+        self.assertEqual(CacheManager.get_local('hot'), {'tier': 'premium'})
+        
+        with patch('base.cache_manager.cache.get') as mock_get:
+            value = CacheManager.get_local('hot')
+            value['tier'] = 'changed'
+            self.assertEqual(CacheManager.get_local('hot'), {'tier': 'premium'})
+            mock_get.assert_not_called()
+        
+        CacheManager.local.set('hot', 'expired', 0)
+        self.assertEqual(CacheManager.get_local('hot'), {'tier': 'premium'})
+    
+    def test_writes_and_bumps_drop_local_copies(self):
+        """A worker sees its own writes and namespace bumps at once"""
+        CacheManager.set('hot', 1)
+        CacheManager.get_local('hot')
+        CacheManager.set('hot', 2)
+        self.assertEqual(CacheManager.get_local('hot'), 2)
+        
+        user = User.objects.create_user(email='tier@example.com', password='testpass123')
+        key = CacheManager.generate_key('permission', user.id, 'all')
+        CacheManager.invalidate_user_cache(user.id)
+        self.assertNotEqual(CacheManager.generate_key('permission', user.id, 'all'), key)
+    
+    def test_lru_is_bounded(self):
+        """The least recently used entry is evicted at max_entries"""
+        local = LocalCache(max_entries=2)
+        local.set('a', 1, 60)
+        local.set('b', 2, 60)
+        local.get('a')
+        local.set('c', 3, 60)
+        
+        self.assertEqual(len(local), 2)
+        self.assertEqual(local.get('b'), (False, None))
+        self.assertEqual(local.get('a'), (True, 1))
+    
+    @override_settings(CACHE_LOCAL_TIER=None)
+    def test_disabled_in_front_of_locmem(self):
+        """A locmem backend already lives in the process"""
+        self.assertFalse(CacheManager.local_tier_enabled())
+        CacheManager.set('hot', 1)
+        CacheManager.get_local('hot')
+        self.assertEqual(len(CacheManager.local), 0)
+
+
+class StampedeProtectionTest(TestCase):
+    """Test single-flight rebuilds and stale-while-revalidate"""
+    
+    def setUp(self):
+        cache.clear()
+    
+    def test_concurrent_misses_compute_once(self):
+        """Readers racing on a missing key share one computation"""
+        calls = []
+        
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return 'fresh'
+        
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(CacheManager.get_or_set('hot', compute)))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ['fresh'] * 5)
+    
+    def test_stale_value_served_during_one_refresh(self):
+        """A stale value is served while a single background rebuild runs"""
+        CacheManager.set('dashboard', 'old', 'long', soft_timeout=0)
+        pool = MagicMock()
+        
+        with patch('base.cache_manager._get_refresh_pool', return_value=pool):
+            self.assertEqual(CacheManager.get_or_set('dashboard', lambda: 'new', 'long', soft_timeout=60), 'old')
+            self.assertEqual(CacheManager.get_or_set('dashboard', lambda: 'new', 'long', soft_timeout=60), 'old')
+        
+        pool.submit.assert_called_once()
+        pool.submit.call_args[0][0](*pool.submit.call_args[0][1:])
+        self.assertEqual(CacheManager.get_or_set('dashboard', lambda: 'newer', 'long', soft_timeout=60), 'new')
+        self.assertEqual(CacheManager.get('dashboard'), 'new')
+    
+    def test_early_expiration(self):
+        """Slow values may be rebuilt before their soft expiry"""
+        CacheManager.set('report', 'value', 'long', soft_timeout=10, delta=100)
+        
+        with patch('base.cache_manager.random.random', return_value=0.99):
+            self.assertIsNone(CacheManager.get('report', beta=1.0))
+            self.assertEqual(CacheManager.get('report', beta=0), 'value')
+        with patch('base.cache_manager.random.random', return_value=0.0):
+            self.assertEqual(CacheManager.get('report', beta=1.0), 'value')
+    
+    def test_cache_result_soft_timeout(self):
+        """The decorator passes stale-while-revalidate options through"""
+        calls = []
+        
+        @cache_result(timeout='long', soft_timeout=60, key_generator=lambda x: f'double:{x}')
+        def double(x):
+            calls.append(x)
+            return x * 2
+        
+        self.assertEqual(double(2), 4)
+        self.assertEqual(double(2), 4)
+        self.assertEqual(calls, [2])
+        self.assertEqual(CacheCodec.decode(cache.get('double:2')).value, 4)
+
+
+class CacheCodecTest(TestCase):
+    """Test the compact encoding of structured cache values"""
+    
+    def setUp(self):
+        cache.clear()
+    
+    def test_structured_values_carry_header(self):
+        """Structured values are encoded with the versioned header"""
+        rows = [{'id': 1, 'price': Decimal('10.50'), 'date': timezone.now().date()}]
+        CacheManager.set('query:rows', rows)
+        
+        stored = cache.get('query:rows')
+        self.assertTrue(stored.startswith(CacheCodec.MAGIC))
+        self.assertEqual(CacheCodec.HEADER.unpack_from(stored)[1:], (CacheCodec.VERSION, 0, 0))
+        self.assertEqual(CacheManager.get('query:rows'), rows)
+        self.assertEqual(CacheManager.get_many(['query:rows']), {'query:rows': rows})
+    
+    def test_large_values_are_compressed(self):
+        """Values above the threshold are stored compressed"""
+        chart_html = '<div class="chart">' * 10000
+        with patch('base.cache_manager.zlib.compress', wraps=zlib.compress) as compress:
+            CacheManager.set('analytics:chart', chart_html)
+        self.assertEqual(compress.call_args.args[1], 1)  # fast level on the request path
+        
+        stored = cache.get('analytics:chart')
+        self.assertEqual(CacheCodec.HEADER.unpack_from(stored)[3], CacheCodec.COMPRESSORS['zlib'])
+        self.assertLess(len(stored), len(chart_html) / 10)
+        self.assertEqual(CacheManager.get('analytics:chart'), chart_html)
+    
+    def test_scalars_and_old_entries_pass_through(self):
+        """Counters stay raw for incr, and entries written before the codec stay readable"""
+        CacheManager.set('rate_limit:login:1', 3)
+        CacheManager.set('otp:code:1', '123456')
+        cache.incr('rate_limit:login:1')
+        cache.set('legacy', {'written': 'before'})
+        
+        self.assertEqual(CacheManager.get('rate_limit:login:1'), 4)
+        self.assertEqual(cache.get('otp:code:1'), '123456')
+        self.assertEqual(CacheManager.get('legacy'), {'written': 'before'})
+    
+    def test_unreadable_values_are_misses(self):
+        """Values from a newer codec version or corrupted values read as misses"""
+        encoded = CacheCodec.encode({'a': 1})
+        cache.set('future', encoded[:3] + bytes([CacheCodec.VERSION + 1]) + encoded[4:])
+        cache.set('corrupt', encoded[:CacheCodec.HEADER.size] + b'garbage')
+        
+        self.assertEqual(CacheManager.get('future', 'default'), 'default')
+        self.assertIsNone(CacheManager.get('corrupt'))
+        self.assertEqual(CacheManager.get_or_set('future', lambda: 'rebuilt'), 'rebuilt')
+    
+    @skipUnless(msgpack, 'msgpack is not installed')
+    def test_msgpack_round_trip(self):
+        """msgpack keeps types it cannot represent exactly"""
+        value = {'price': Decimal('10.50'), 'slot': (9, 30), 'names': ['a', 'b']}
+        encoded = CacheCodec.encode(value, codec='msgpack')
+        
+        self.assertEqual(CacheCodec.HEADER.unpack_from(encoded)[2], CacheCodec.SERIALIZERS['msgpack'])
+        self.assertEqual(CacheCodec.decode(encoded), value)
+
+
+class CacheMetricsTest(TestCase):
+    """Test per-prefix cache instrumentation"""
+    
+    def setUp(self):
+        cache.clear()
+        CacheMetrics.reset()
+        self.addCleanup(CacheMetrics.reset)
+    
+    def test_counts_per_prefix(self):
+        """Hits, misses, writes and latencies are counted under each key's prefix"""
+        from ..security import RateLimiter
+        
+        CacheManager.set('business:1:data', 'value')
+        CacheManager.get('business:1:data')
+        CacheManager.get('business:2:data')
+        CacheManager.get_many(['business:1:data', 'business:3:data'])
+        CacheManager.delete('business:1:data')
+        RateLimiter.increment_counter('login', '10.0.0.1')
+        CacheManager.get('unlisted:key')
+        
+        stats = CacheMetrics.snapshot()
+        
+        business = stats['business']
+        self.assertEqual(
+            (business['hits'], business['misses'], business['sets'], business['deletes']),
+            (2, 2, 1, 1)
+        )
+        self.assertEqual(business['hit_rate'], 0.5)
+        self.assertEqual(business['get_latency']['count'], 3)
+        self.assertEqual(sum(business['get_latency']['buckets'].values()), 3)
+        self.assertIsNotNone(business['get_latency']['p95_ms'])
+        self.assertEqual((stats['rate_limit']['misses'], stats['rate_limit']['sets']), (1, 1))
+        self.assertEqual(stats['other']['misses'], 1)
+        self.assertNotIn('metrics', stats)
+    
+    def test_counts_are_shared_between_workers(self):
+        """Flushed counts add up in the shared cache"""
+        CacheManager.get('business:1:data')
+        CacheMetrics.flush()
+        CacheManager.get('business:1:data')
+        
+        self.assertEqual(CacheMetrics.snapshot()['business']['misses'], 2)
+        
+        CacheMetrics.reset()
+        self.assertEqual(CacheMetrics.snapshot(), {})
+    
+    def test_local_evictions_counted(self):
+        """LRU evictions from the in-process tier are counted"""
+        local = LocalCache(max_entries=1)
+        local.set('permission:1:all', 1, 60)
+        local.set('permission:2:all', 2, 60)
+        
+        self.assertEqual(CacheMetrics.snapshot()['permission']['evictions'], 1)
+    
+    def test_endpoint_is_admin_only(self):
+        """Only admins can read and reset the statistics"""
+        client = APIClient()
+        owner = User.objects.create_user(email='owner@example.com', password='testpass123')
+        admin = User.objects.create_user(email='admin@example.com', password='testpass123', role='admin')
+        CacheManager.get('business:1:data')
+        
+        client.force_authenticate(owner)
+        self.assertEqual(client.get('/api/base/cache-stats/').status_code, status.HTTP_403_FORBIDDEN)
+        
+        client.force_authenticate(admin)
+        response = client.get('/api/base/cache-stats/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['prefixes']['business']['misses'], 1)
+        
+        self.assertEqual(client.delete('/api/base/cache-stats/').status_code, status.HTTP_204_NO_CONTENT)
+        self.assertNotIn('business', CacheMetrics.snapshot())
+    
+    def test_command(self):
+        """The command prints a row per prefix and can reset the counters"""
+        import io
+        from django.core.management import call_command
+        
+        CacheManager.set('booking:1', 'value')
+        CacheManager.get('booking:1')
+        
+        out = io.StringIO()
+        call_command('cache_stats', '--reset', stdout=out)
+        self.assertRegex(out.getvalue(), r'booking\s+1\s+0\s+100\.0%')
+        self.assertEqual(CacheMetrics.snapshot(), {})
+
+
+class DeferredInvalidationTest(BookingManagerTestMixin, TestCase):
+    """Test that model changes bump each namespace once per transaction"""
+    
+    def setUp(self):
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.business = self.create_business()
+            self.service = self.create_service(self.business)
+        self.date = timezone.now().date() + timedelta(days=7)
+    
+    @patch('base.cache_manager.CacheManager.bump_namespace')
+    def test_one_bump_per_business_per_transaction(self, mock_bump):
+        """Fifty booking saves in one transaction bump the business once"""
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                for index in range(50):
+                    self.create_booking(
+                        self.business, self.service, self.date,
+                        (datetime(2000, 1, 1, 8) + timedelta(minutes=15 * index)).time(),
+                        phone=f'+9665000{index:05d}'
+                    )
+        
+        mock_bump.assert_called_once_with('business', self.business.id)
+    
+    @patch('base.cache_manager.CacheManager.bump_namespace')
+    def test_rollback_and_unrelated_saves_bump_nothing(self, mock_bump):
+        """Rolled back changes, notifications and login stamps leave the cache alone"""
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    self.service.name = 'Renamed'
+                    self.service.save()
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+            
+            Notification.objects.create(
+                user=self.business.user, notification_type='booking_confirmation',
+                title='Booked', message='Booked'
+            )
+            self.business.user.last_login = timezone.now()
+            self.business.user.save(update_fields=['last_login'])
+        
+        mock_bump.assert_not_called()
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            self.service.save()
+        mock_bump.assert_called_once_with('business', self.business.id)
+
+
 class DatabaseOptimizerTest(TestCase):
     """Test database optimization utilities"""
     
@@ -407,6 +784,102 @@ class CacheFunctionDecoratorTest(TestCase):
         # Verify custom key is used
         cached_value = cache.get("custom:key:2:3")
         self.assertEqual(cached_value, 6)
+    
+    def test_keys_are_canonical(self):
+        """Positional and keyword calls share a key, classes are keyed by path"""
+        
+        class Report:
+            @classmethod
+            @cache_result(timeout='short')
+            def build(cls, period, rows=10):
+                return [period] * rows
+        
+        self.assertEqual(
+            Report.build.cache_key(Report, 'day'),
+            Report.build.cache_key(Report, period='day', rows=10)
+        )
+        self.assertNotEqual(Report.build.cache_key(Report, 'day'), Report.build.cache_key(Report, 'week'))
+        self.assertNotIn('0x', Report.build.cache_key(Report, 'day'))
+    
+    def test_model_instances_keyed_by_pk(self):
+        """Separately loaded copies of a row share a key, other rows do not"""
+        with self.captureOnCommitCallbacks(execute=True):
+            first = User.objects.create_user(email='first@example.com', password='pass')
+            second = User.objects.create_user(email='second@example.com', password='pass')
+        
+        @cache_result(timeout='short')
+        def describe(user):
+            return user.email
+        
+        self.assertEqual(describe.cache_key(first), describe.cache_key(User.objects.get(pk=first.pk)))
+        self.assertNotEqual(describe.cache_key(first), describe.cache_key(second))
+    
+    def test_unstable_arguments_bypass_cache(self):
+        """Arguments without a stable form are not cached"""
+        calls = []
+        
+        @cache_result(timeout='short')
+        def identity(value):
+            calls.append(value)
+            return 'result'
+        
+        marker = object()
+        self.assertIsNone(identity.cache_key(marker))
+        identity(marker)
+        identity(marker)
+        self.assertEqual(len(calls), 2)
+    
+    def test_none_is_cached(self):
+        """A None result is a hit, unless negative caching is off"""
+        calls = []
+        
+        @cache_result(timeout='short')
+        def lookup(x):
+            calls.append(x)
+            return None
+        
+        @cache_result(timeout='short', cache_none=False)
+        def uncached_lookup(x):
+            calls.append(x)
+            return None
+        
+        self.assertIsNone(lookup(1))
+        self.assertIsNone(lookup(1))
+        self.assertEqual(calls, [1])
+        
+        uncached_lookup(2)
+        uncached_lookup(2)
+        self.assertEqual(calls, [1, 2, 2])
+    
+    def test_timeout_from_result(self):
+        """A callable timeout is resolved from the computed value"""
+        
+        @cache_result(timeout=lambda value: 0 if value < 0 else 'short')
+        def balance(x):
+            return x
+        
+        balance(5)
+        balance(-5)
+        self.assertIsNotNone(cache.get(balance.cache_key(5)))
+        self.assertIsNone(cache.get(balance.cache_key(-5)))
+    
+    def test_async_functions(self):
+        """Coroutine functions get an async wrapper that caches results"""
+        calls = []
+        
+        @cache_result(timeout='short')
+        async def fetch(x):
+            calls.append(x)
+            return x * 2
+        
+        self.assertTrue(asyncio.iscoroutinefunction(fetch))
+        self.assertEqual(async_to_sync(fetch)(3), 6)
+        self.assertEqual(async_to_sync(fetch)(3), 6)
+        self.assertEqual(calls, [3])
+        
+        fetch.invalidate(3)
+        self.assertEqual(async_to_sync(fetch)(3), 6)
+        self.assertEqual(calls, [3, 3])
 
 
 class LoadTest(TestCase):
@@ -1,10 +1,11 @@
 # test_security.py - Comprehensive security tests
 import json
-from datetime import datetime, timedelta
+from datetime import datetime, time, timedelta
 from django.test import TestCase, override_settings
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 from django.core.cache import cache
+from django.utils import timezone
 from rest_framework.test import APITestCase, APIClient
 from rest_framework import status
 from unittest.mock import patch, MagicMock
@@ -13,8 +14,10 @@ from ..security import (
     SecurityValidator, RateLimiter, AuditLogger, 
     SubscriptionSecurity, DataEncryption
 )
-from ..models import Service, Booking, Customer
+from ..booking_manager import BookingManager
+from ..models import Service, Booking, Customer, BusinessHours
 from accounts.models import BusinessProfile
+from .test_booking_manager import BookingManagerTestMixin
 
 User = get_user_model()
 
@@ -543,4 +546,69 @@ class SecurityIntegrationTest(APITestCase):
         
         # Should not crash and services should still exist
         self.assertIn(response.status_code, [200, 400, 401, 403])
-        self.assertTrue(Service.objects.count() >= 3)
\ No newline at end of file
+        self.assertTrue(Service.objects.count() >= 3)
+
+
+@patch('base.booking_manager.BookingManager._send_booking_notifications')
+class IdempotencyTest(BookingManagerTestMixin, TestCase):
+    """Test Idempotency-Key replay on the public booking endpoints"""
+
+    def setUp(self):
+        cache.clear()
+        self.business = self.create_business()
+        self.service = self.create_service(self.business, minutes=60)
+        self.date = timezone.now().date() + timedelta(days=7)
+        BusinessHours.objects.create(
+            business=self.business,
+            day=self.date.strftime('%A').lower(),
+            open_time=time(9, 0),
+            close_time=time(12, 0)
+        )
+
+    def booking_data(self, appointment_time='10:00'):
+        return {
+            'business_id': self.business.id,
+            'service_id': self.service.id,
+            'customer_name': 'Customer',
+            'customer_phone': '+966500000091',
+            'appointment_date': self.date.strftime('%Y-%m-%d'),
+            'appointment_time': appointment_time
+        }
+
+    def post(self, url, data, key):
+        return self.client.post(url, data, HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_retried_booking_is_replayed(self, mock_notifications):
+        """A retry with the same key returns the first response without booking again"""
+        first = self.post('/api/base/public/booking/', self.booking_data(), 'retry-1')
+        self.assertEqual(first.status_code, 201)
+
+        with patch.object(BookingManager, 'create_anonymous_booking') as mock_create, \
+                self.assertNumQueries(0):
+            retry = self.post('/api/base/public/booking/', self.booking_data(), 'retry-1')
+        mock_create.assert_not_called()
+
+        self.assertEqual(retry.status_code, 201)
+        self.assertEqual(retry.json(), first.json())
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(Booking.objects.count(), 1)
+
+        reused = self.post('/api/base/public/booking/', self.booking_data('11:00'), 'retry-1')
+        self.assertEqual(reused.status_code, 422)
+
+        other = self.post('/api/base/public/booking/', self.booking_data('11:00'), 'retry-2')
+        self.assertEqual(other.status_code, 201)
+
+    def test_retried_cancel_is_replayed(self, mock_notifications):
+        """Cancelling twice with one key replays the success instead of a not-found"""
+        booking = self.create_booking(
+            self.business, self.service, self.date, time(10, 0), phone='+966500000092'
+        )
+        data = {'booking_id': str(booking.booking_id), 'phone_number': '+966500000092'}
+
+        first = self.post('/api/base/public/booking/cancel/', data, 'cancel-1')
+        retry = self.post('/api/base/public/booking/cancel/', data, 'cancel-1')
+        self.assertEqual((first.status_code, retry.status_code), (200, 200))
+
+        without_key = self.client.post('/api/base/public/booking/cancel/', data)
+        self.assertEqual(without_key.status_code, 404)
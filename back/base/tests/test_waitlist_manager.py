@@ -0,0 +1,191 @@
+# test_waitlist_manager.py - Waitlist tests
+import io
+from datetime import time, timedelta
+from unittest.mock import Mock, patch
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from ..booking_manager import BookingManager
+from ..cache_manager import SlotHoldCacheManager
+from ..models import BusinessHours, OutboxMessage, WaitlistEntry
+from ..outbox_manager import OutboxManager
+from ..waitlist_manager import WaitlistManager
+from .test_booking_manager import BookingManagerTestMixin
+
+
+@patch('utils.notification_manager.NotificationManager.send_waitlist_offer')
+@patch('base.booking_manager.BookingManager._send_cancellation_notifications')
+@patch('base.booking_manager.BookingManager._send_booking_notifications')
+class WaitlistTest(BookingManagerTestMixin, TestCase):
+    """Test waitlist offers for cancelled slots"""
+
+    def setUp(self):
+        cache.clear()
+        self.business = self.create_business()
+        self.service = self.create_service(self.business, minutes=60)
+        self.date = timezone.now().date() + timedelta(days=7)
+        BusinessHours.objects.create(
+            business=self.business,
+            day=self.date.strftime('%A').lower(),
+            open_time=time(9, 0),
+            close_time=time(12, 0)
+        )
+        self.booking = self.create_booking(self.business, self.service, self.date, time(10, 0))
+
+    def waitlist_data(self, phone, window_start='09:00', window_end='11:00'):
+        return {
+            'business_id': self.business.id,
+            'service_id': self.service.id,
+            'customer_name': 'Waiting Customer',
+            'customer_phone': phone,
+            'appointment_date': self.date.strftime('%Y-%m-%d'),
+            'window_start': window_start,
+            'window_end': window_end
+        }
+
+    def cancel(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            result = BookingManager.cancel_booking(
+                str(self.booking.booking_id), self.booking.customer.phone_number
+            )
+        self.assertTrue(result['success'])
+
+    def test_join_and_leave(self, *mocks):
+        """Customers join once per day and leave with their phone number"""
+        joined = WaitlistManager.join_waitlist(self.waitlist_data('+966500000071'))
+        self.assertTrue(joined['success'])
+
+        again = WaitlistManager.join_waitlist(self.waitlist_data('+966500000071'))
+        self.assertEqual(again['error_code'], 'ALREADY_WAITING')
+
+        inverted = WaitlistManager.join_waitlist(
+            self.waitlist_data('+966500000072', window_start='11:00', window_end='09:00')
+        )
+        self.assertEqual(inverted['error_code'], 'INVALID_WINDOW')
+
+        self.assertFalse(WaitlistManager.leave_waitlist(joined['waitlist_id'], '+966500000079')['success'])
+        self.assertTrue(WaitlistManager.leave_waitlist(joined['waitlist_id'], '+966500000071')['success'])
+        self.assertEqual(WaitlistEntry.objects.get().status, 'cancelled')
+
+    def test_cancellation_offers_slot_to_earliest_waiter(self, mock_booking, mock_cancel, mock_offer):
+        """A cancelled slot is held for the first matching waiter and booked with the token"""
+        WaitlistManager.join_waitlist(self.waitlist_data('+966500000073', '11:00', '11:30'))
+        first = WaitlistManager.join_waitlist(self.waitlist_data('+966500000074'))
+        WaitlistManager.join_waitlist(self.waitlist_data('+966500000075'))
+
+        self.cancel()
+
+        entry = WaitlistEntry.objects.get(waitlist_id=first['waitlist_id'])
+        self.assertEqual(entry.offered_time, time(10, 0))
+        self.assertTrue(SlotHoldCacheManager.get_hold(entry.hold_token))
+        mock_offer.assert_called_once()
+        self.assertEqual(WaitlistEntry.objects.exclude(hold_token='').count(), 1)
+
+        slots = BookingManager.get_available_slots(
+            self.business.id, self.service.id, self.date.strftime('%Y-%m-%d')
+        )['available_slots']
+        self.assertNotIn('10:00', slots)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            result = BookingManager.create_anonymous_booking({
+                'business_id': self.business.id,
+                'service_id': self.service.id,
+                'customer_name': 'Waiting Customer',
+                'customer_phone': '+966500000074',
+                'appointment_date': self.date.strftime('%Y-%m-%d'),
+                'appointment_time': '10:00',
+                'hold_token': entry.hold_token
+            })
+        self.assertTrue(result['success'])
+
+        entry.refresh_from_db()
+        self.assertEqual(entry.status, 'booked')
+        self.assertEqual(str(entry.booking.booking_id), result['booking_id'])
+
+    def test_expired_offer_moves_to_next_waiter(self, mock_booking, mock_cancel, mock_offer):
+        """An unclaimed offer is passed on once, never back to a waiter who let it lapse"""
+        first = WaitlistManager.join_waitlist(self.waitlist_data('+966500000081'))
+        second = WaitlistManager.join_waitlist(self.waitlist_data('+966500000082'))
+        self.cancel()
+        lapsed = WaitlistEntry.objects.get(waitlist_id=first['waitlist_id'])
+
+        self.assertEqual(WaitlistManager.reoffer_expired(), {'expired': 0, 'reoffered': 0})
+
+        WaitlistEntry.objects.update(offer_expires_at=timezone.now())
+        out = io.StringIO()
+        call_command('expire_waitlist_offers', stdout=out)
+        self.assertIn('Re-offered 1 of 1 expired waitlist offers', out.getvalue())
+
+        self.assertFalse(SlotHoldCacheManager.get_hold(lapsed.hold_token))
+        self.assertEqual(WaitlistEntry.objects.get(waitlist_id=first['waitlist_id']).hold_token, '')
+        entry = WaitlistEntry.objects.get(waitlist_id=second['waitlist_id'])
+        self.assertEqual(entry.offered_time, time(10, 0))
+        self.assertTrue(SlotHoldCacheManager.get_hold(entry.hold_token))
+        self.assertEqual(mock_offer.call_count, 2)
+
+        WaitlistEntry.objects.update(offer_expires_at=timezone.now())
+        self.assertEqual(WaitlistManager.reoffer_expired(), {'expired': 1, 'reoffered': 0})
+        self.assertEqual(mock_offer.call_count, 2)
+
+    def test_no_offer_outside_window(self, mock_booking, mock_cancel, mock_offer):
+        """Waiters whose window misses the freed slot are left alone"""
+        WaitlistManager.join_waitlist(self.waitlist_data('+966500000076', '10:30', '11:30'))
+
+        self.cancel()
+
+        mock_offer.assert_not_called()
+        self.assertEqual(WaitlistEntry.objects.get().hold_token, '')
+
+    def test_waitlist_endpoints(self, *mocks):
+        """The public endpoints join and leave the waitlist"""
+        response = self.client.post('/api/base/public/waitlist/', self.waitlist_data('+966500000077'))
+        self.assertEqual(response.status_code, 201)
+        waitlist_id = response.json()['waitlist_id']
+
+        response = self.client.post('/api/base/public/waitlist/', self.waitlist_data('+966500000077'))
+        self.assertEqual(response.status_code, 409)
+
+        response = self.client.post('/api/base/public/waitlist/leave/', {
+            'waitlist_id': waitlist_id, 'phone_number': '+966500000077'
+        })
+        self.assertEqual(response.status_code, 200)
+
+
+@override_settings(WHATSAPP_API_URL='https://whatsapp.invalid', WHATSAPP_ACCESS_TOKEN='token')
+@patch('base.booking_manager.BookingManager._send_cancellation_notifications')
+@patch('base.booking_manager.BookingManager._send_booking_notifications')
+class WaitlistOfferDeliveryTest(BookingManagerTestMixin, TestCase):
+    """Test that waitlist offers reach the WhatsApp API through the outbox"""
+
+    @patch('utils.whatsapp.requests.post', return_value=Mock(status_code=200))
+    def test_offer_is_delivered(self, mock_post, *mocks):
+        """The queued offer is sent with the waitlist template and marked sent"""
+        cache.clear()
+        business = self.create_business()
+        service = self.create_service(business, minutes=60)
+        date = timezone.now().date() + timedelta(days=7)
+        booking = self.create_booking(business, service, date, time(10, 0))
+        WaitlistManager.join_waitlist({
+            'business_id': business.id,
+            'service_id': service.id,
+            'customer_name': 'Waiting Customer',
+            'customer_phone': '+966500000083',
+            'appointment_date': date.strftime('%Y-%m-%d'),
+            'window_start': '09:00',
+            'window_end': '11:00'
+        })
+
+        with self.captureOnCommitCallbacks(execute=True):
+            BookingManager.cancel_booking(str(booking.booking_id), booking.customer.phone_number)
+
+        self.assertEqual(OutboxManager.drain()['sent'], 1)
+        message = OutboxMessage.objects.get()
+        self.assertEqual((message.status, message.notification.sent_via_whatsapp), ('sent', True))
+        template = mock_post.call_args.kwargs['json']['template']
+        self.assertEqual(template['name'], 'waitlist_offer')
+        self.assertEqual(
+            template['components'][0]['parameters'][-1]['text'],
+            WaitlistEntry.objects.get().hold_token
+        )
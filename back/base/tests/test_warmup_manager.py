@@ -0,0 +1,125 @@
+# test_warmup_manager.py - Cache warmup and dashboard snapshot tests
+import io
+from datetime import time, timedelta
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from ..booking_manager import BookingManager
+from ..cache_manager import DatabaseOptimizer
+from ..dashboard_manager import DashboardManager
+from ..models import Booking, BusinessHours, Review
+from ..schedule import BusinessSchedule
+from ..warmup_manager import WarmupManager
+from .test_booking_manager import BookingManagerTestMixin
+
+
+class WarmupTest(BookingManagerTestMixin, TestCase):
+    """Test that warm_caches leaves nothing for the first requests to compute"""
+
+    def setUp(self):
+        cache.clear()
+        self.today = timezone.now().date()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.business = self.create_business()
+            self.service = self.create_service(self.business, minutes=60)
+            BusinessHours.objects.create(
+                business=self.business,
+                day=self.today.strftime('%A').lower(),
+                open_time=time(9, 0),
+                close_time=time(17, 0)
+            )
+            self.create_booking(self.business, self.service, self.today, time(10, 0))
+            self.create_booking(
+                self.business, self.service, self.today + timedelta(days=1), time(11, 0),
+                status='completed', phone='+966500000002'
+            )
+
+    def test_run_warms_every_cache(self):
+        """Dashboard, analytics and availability are served without queries afterwards"""
+        report = WarmupManager.run(workers=1)
+
+        self.assertEqual((report['businesses'], report['warmed'], report['failed']), (1, 1, 0))
+        with self.assertNumQueries(0):
+            dashboard = DashboardManager.get_dashboard(self.business)
+            analytics = DatabaseOptimizer.optimize_analytics_queries(self.business.id, 'month')
+            BusinessSchedule.for_business(self.business.id)
+            intervals = BookingManager._get_booked_intervals_range(
+                self.business, self.today, self.today + timedelta(days=1)
+            )
+
+        self.assertEqual(dashboard['total_bookings'], 2)
+        self.assertEqual(dashboard['completed_bookings'], 1)
+        self.assertEqual(len(dashboard['upcoming_bookings']), 1)
+        self.assertIn('period_bookings', analytics)
+        self.assertEqual(list(intervals), [self.today])
+
+    def test_time_budget_skips_remaining_batches(self):
+        """No batch starts once the budget is spent"""
+        report = WarmupManager.run(workers=1, time_budget=0)
+        self.assertEqual((report['warmed'], report['skipped']), (0, 1))
+
+    def test_busiest_businesses_first(self):
+        """Businesses with bookings in the warmed window come first"""
+        idle = self.create_business(email='idle@example.com')
+        self.assertEqual(
+            [business.id for business in WarmupManager.active_businesses()],
+            [self.business.id, idle.id]
+        )
+        self.assertEqual(
+            [business.id for business in WarmupManager.active_businesses([idle.id])],
+            [idle.id]
+        )
+
+    def test_dashboard_snapshot_follows_bookings(self):
+        """The dashboard endpoint serves the snapshot until a booking changes"""
+        client = APIClient()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.business.user.is_verified = True
+            self.business.user.save()
+        client.force_authenticate(self.business.user)
+
+        response = client.get('/api/base/dashboard/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['total_bookings'], 2)
+        self.assertEqual(response.data['total_customers'], 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_booking(self.business, self.service, self.today, time(14, 0), phone='+966500000003')
+
+        self.assertEqual(client.get('/api/base/dashboard/').data['total_bookings'], 3)
+
+    def test_dashboard_aggregates_in_few_queries(self):
+        """Counts, revenue, customers and reviews take one query each"""
+        with self.captureOnCommitCallbacks(execute=True):
+            completed = Booking.objects.get(business=self.business, status='completed')
+            Review.objects.create(booking=completed, rating=4)
+            self.create_booking(self.business, self.service, self.today, time(15, 0), status='cancelled')
+
+        with self.assertNumQueries(7):
+            dashboard = DashboardManager.build_dashboard(self.business)
+
+        self.assertEqual(dashboard['total_bookings'], 3)
+        self.assertEqual(
+            [dashboard[f'{booking_status}_bookings'] for booking_status in DashboardManager.STATUSES],
+            [0, 1, 1, 1]
+        )
+        self.assertEqual(float(dashboard['total_revenue']), float(self.service.price))
+        self.assertEqual(dashboard['total_customers'], 2)
+        self.assertEqual(dashboard['customer_retention_rate'], 50.0)
+        self.assertEqual((dashboard['average_rating'], dashboard['total_reviews']), (4.0, 1))
+
+    def test_dashboard_snapshot_is_cached(self):
+        """Only the first load of the day queries the database"""
+        dashboard = DashboardManager.get_dashboard(self.business)
+        with self.assertNumQueries(0):
+            self.assertEqual(DashboardManager.get_dashboard(self.business), dashboard)
+
+    def test_warm_caches_command(self):
+        """The command reports how many businesses were warmed"""
+        out = io.StringIO()
+        call_command('warm_caches', '--workers', '1', stdout=out)
+        self.assertIn('Warmed 1 of 1 businesses', out.getvalue())
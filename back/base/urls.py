@@ -12,6 +12,7 @@ urlpatterns = [
     path('bookings/', views.BookingListCreateView.as_view(), name='booking_list_create'),
     path('bookings/<int:pk>/', views.BookingDetailView.as_view(), name='booking_detail'),
     path('bookings/bulk-update/', views.bulk_update_bookings, name='bulk_update_bookings'),
+    path('bookings/import/', views.import_bookings, name='import_bookings'),
     
     # Customers
     path('customers/', views.CustomerListView.as_view(), name='customer_list'),
@@ -23,6 +24,11 @@ urlpatterns = [
     # Business hours
     path('business-hours/', views.BusinessHoursListCreateView.as_view(), name='business_hours_list_create'),
     path('business-hours/<int:pk>/', views.BusinessHoursDetailView.as_view(), name='business_hours_detail'),
+    path('business-hours/exceptions/', views.BusinessHoursExceptionListCreateView.as_view(), name='business_hours_exception_list_create'),
+    path('business-hours/exceptions/<int:pk>/', views.BusinessHoursExceptionDetailView.as_view(), name='business_hours_exception_detail'),
+    
+    # Waitlist
+    path('waitlist/', views.WaitlistEntryListView.as_view(), name='waitlist_list'),
     
     # Notifications
     path('notifications/', views.NotificationListView.as_view(), name='notification_list'),
@@ -35,6 +41,7 @@ urlpatterns = [
     path('analytics/', views.business_analytics, name='business_analytics'),
     path('subscription-status/', views.subscription_status, name='subscription_status'),
     path('permissions/', views.user_permissions, name='user_permissions'),
+    path('cache-stats/', views.cache_stats, name='cache_stats'),
     
     # QR Code generation endpoints
     path('qr/business/', views.generate_business_qr, name='generate_business_qr'),
@@ -43,7 +50,13 @@ urlpatterns = [
     
     # Public endpoints (Customer-facing, no authentication required)
     path('public/booking/', views.PublicBookingCreateView.as_view(), name='public_booking_create'),
-    path('public/booking/<str:booking_id>/', views.public_booking_lookup, name='public_booking_lookup'),
+    path('public/booking/series/', views.public_booking_series_create, name='public_booking_series_create'),
     path('public/booking/cancel/', views.public_booking_cancel, name='public_booking_cancel'),
+    path('public/booking/<str:booking_id>/', views.public_booking_lookup, name='public_booking_lookup'),
+    path('public/slots/hold/', views.public_slot_hold, name='public_slot_hold'),
+    path('public/slots/hold/release/', views.public_slot_hold_release, name='public_slot_hold_release'),
+    path('public/waitlist/', views.public_waitlist_join, name='public_waitlist_join'),
+    path('public/waitlist/leave/', views.public_waitlist_leave, name='public_waitlist_leave'),
     path('public/business/<int:business_id>/service/<int:service_id>/slots/', views.public_available_slots, name='public_available_slots'),
+    path('public/business/<int:business_id>/service/<int:service_id>/slots/range/', views.public_available_slots_range, name='public_available_slots_range'),
 ]
\ No newline at end of file
@@ -5,29 +5,39 @@ from django.contrib.auth import get_user_model
 from django.db.models import Count, Sum, Avg, Q, F, Min, Max
 from django.utils import timezone
 from datetime import datetime, timedelta
+import io
 try:
     from django_filters.rest_framework import DjangoFilterBackend
 except ImportError:
     DjangoFilterBackend = None
 from rest_framework.pagination import PageNumberPagination
-from .models import Service, Customer, Booking, Review, BusinessHours, Notification
+from .models import (
+    Service, Customer, Booking, Review, BusinessHours, BusinessHoursException, Notification,
+    WaitlistEntry
+)
 from .serializers import (
     ServiceSerializer, CustomerSerializer, BookingCreateSerializer,
     BookingSerializer, BookingUpdateSerializer, ReviewSerializer,
-    BusinessHoursSerializer, NotificationSerializer, BusinessDashboardSerializer,
-    ServiceCreateUpdateSerializer, BusinessAnalyticsSerializer, CustomerDetailSerializer
+    BusinessHoursSerializer, BusinessHoursExceptionSerializer, NotificationSerializer, BusinessDashboardSerializer,
+    ServiceCreateUpdateSerializer, BusinessAnalyticsSerializer, CustomerDetailSerializer,
+    WaitlistEntrySerializer
 )
 from accounts.permissions import (
     IsBusinessOwner, IsVerifiedUser, IsOwnerOrReadOnly, BusinessResourcePermission,
-    RoleBasedPermission, SubscriptionRequired, FeaturePermission
+    RoleBasedPermission, SubscriptionRequired, FeaturePermission, IsAdminOrSuperAdmin
 )
 from accounts.role_manager import RoleManager, Resource, Action, RolePermissionMixin
 from accounts.subscription_manager import SubscriptionManager, SubscriptionEnforcementMixin
 from .booking_manager import BookingManager
+from .daily_stats_manager import DailyStatsManager
+from .dashboard_manager import DashboardManager
+from .import_manager import BookingImportManager
+from .waitlist_manager import WaitlistManager
+from .cache_manager import BookingLookupCacheManager, CacheManager, CacheMetrics, OccupancyCacheManager
 from utils.notification_manager import NotificationManager
 from .security import (
     SecurityValidator, RateLimiter, AuditLogger, SubscriptionSecurity,
-    rate_limit, require_subscription
+    rate_limit, require_subscription, idempotent
 )
 
 
@@ -182,6 +192,7 @@ class PublicBookingCreateView(generics.CreateAPIView):
     """Public endpoint for customers to create bookings without registration"""
     permission_classes = [permissions.AllowAny]
     
+    @idempotent('public_booking_create')
     def post(self, request, *args, **kwargs):
         """Create booking using BookingManager"""
         result = BookingManager.create_anonymous_booking(request.data)
@@ -239,6 +250,48 @@ class BusinessHoursDetailView(generics.RetrieveUpdateDestroyAPIView):
             return BusinessHours.objects.none()
 
 
+class BusinessHoursExceptionListCreateView(generics.ListCreateAPIView):
+    serializer_class = BusinessHoursExceptionSerializer
+    permission_classes = [IsBusinessOwner, IsVerifiedUser]
+    
+    def get_queryset(self):
+        try:
+            return BusinessHoursException.objects.filter(
+                business=self.request.user.business_profile
+            ).order_by('start_date')
+        except:
+            return BusinessHoursException.objects.none()
+    
+    def perform_create(self, serializer):
+        serializer.save(business=self.request.user.business_profile)
+
+
+class BusinessHoursExceptionDetailView(generics.RetrieveUpdateDestroyAPIView):
+    serializer_class = BusinessHoursExceptionSerializer
+    permission_classes = [IsBusinessOwner, IsVerifiedUser]
+    
+    def get_queryset(self):
+        try:
+            return BusinessHoursException.objects.filter(business=self.request.user.business_profile)
+        except:
+            return BusinessHoursException.objects.none()
+
+
+class WaitlistEntryListView(generics.ListAPIView):
+    serializer_class = WaitlistEntrySerializer
+    permission_classes = [IsBusinessOwner, IsVerifiedUser]
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['status', 'date', 'service']
+    
+    def get_queryset(self):
+        try:
+            return WaitlistEntry.objects.filter(
+                business=self.request.user.business_profile
+            ).select_related('customer', 'service').order_by('date', 'created_at')
+        except:
+            return WaitlistEntry.objects.none()
+
+
 class NotificationListView(generics.ListAPIView):
     serializer_class = NotificationSerializer
     permission_classes = [IsVerifiedUser]
@@ -252,64 +305,7 @@ class NotificationListView(generics.ListAPIView):
 def business_dashboard(request):
     """Business dashboard with statistics"""
     try:
-        business_profile = request.user.business_profile
-        
-        # Date filters
-        today = timezone.now().date()
-        this_month_start = today.replace(day=1)
-        
-        # Booking statistics
-        bookings = Booking.objects.filter(business=business_profile)
-        
-        total_bookings = bookings.count()
-        pending_bookings = bookings.filter(status='pending').count()
-        completed_bookings = bookings.filter(status='completed').count()
-        cancelled_bookings = bookings.filter(status='cancelled').count()
-        
-        # Revenue statistics
-        completed_bookings_qs = bookings.filter(status='completed')
-        total_revenue = completed_bookings_qs.aggregate(
-            total=Sum('total_price')
-        )['total'] or 0
-        
-        monthly_revenue = completed_bookings_qs.filter(
-            appointment_date__gte=this_month_start
-        ).aggregate(
-            total=Sum('total_price')
-        )['total'] or 0
-        
-        # Review statistics
-        reviews = Review.objects.filter(booking__business=business_profile)
-        average_rating = reviews.aggregate(avg=Avg('rating'))['avg'] or 0
-        total_reviews = reviews.count()
-        
-        # Upcoming bookings (next 7 days)
-        upcoming_bookings = bookings.filter(
-            appointment_date__gte=today,
-            appointment_date__lte=today + timedelta(days=7),
-            status__in=['pending', 'confirmed']
-        ).select_related('customer', 'service')[:5]
-        
-        # Recent reviews
-        recent_reviews = reviews.select_related(
-            'booking__customer', 'booking__service'
-        ).order_by('-created_at')[:5]
-        
-        dashboard_data = {
-            'total_bookings': total_bookings,
-            'pending_bookings': pending_bookings,
-            'completed_bookings': completed_bookings,
-            'cancelled_bookings': cancelled_bookings,
-            'total_revenue': total_revenue,
-            'monthly_revenue': monthly_revenue,
-            'average_rating': round(float(average_rating), 2) if average_rating else 0,
-            'total_reviews': total_reviews,
-            'upcoming_bookings': upcoming_bookings,
-            'recent_reviews': recent_reviews,
-        }
-        
-        serializer = BusinessDashboardSerializer(dashboard_data)
-        return Response(serializer.data)
+        return Response(DashboardManager.get_dashboard(request.user.business_profile))
         
     except Exception as e:
         logger.error(f"Dashboard error for user {request.user.id}: {str(e)}")
@@ -319,23 +315,26 @@ def business_dashboard(request):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-
-
-
-
-
-
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
 def public_booking_lookup(request, booking_id):
     """Look up booking details by booking ID (for customers)"""
-    booking_details = BookingManager.get_booking_by_id(booking_id)
+    lookup = BookingManager.get_booking_lookup(booking_id)
     
-    if booking_details:
-        return Response({
-            'success': True,
-            'booking': booking_details
-        })
+    if lookup:
+        etag = f'"{lookup["etag"]}"'
+        if_none_match = request.headers.get('If-None-Match', '')
+        if if_none_match.strip() == '*' or etag in [tag.strip() for tag in if_none_match.split(',')]:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response({
+                'success': True,
+                'booking': lookup['data']
+            })
+        response['ETag'] = etag
+        # Clients may keep the body but must revalidate before reusing it
+        response['Cache-Control'] = 'private, no-cache'
+        return response
     else:
         return Response({
             'success': False,
@@ -346,6 +345,7 @@ def public_booking_lookup(request, booking_id):
 
 @api_view(['POST'])
 @permission_classes([permissions.AllowAny])
+@idempotent('public_booking_cancel')
 def public_booking_cancel(request):
     """Cancel booking using booking ID and phone verification"""
     booking_id = request.data.get('booking_id')
@@ -369,9 +369,104 @@ def public_booking_cancel(request):
             status_code = status.HTTP_404_NOT_FOUND
         elif result.get('error_code') == 'TOO_LATE_TO_CANCEL':
             status_code = status.HTTP_409_CONFLICT
-            
+
+        return Response(result, status=status_code)
+
+
+@api_view(['POST'])
+@permission_classes([permissions.AllowAny])
+def public_booking_series_create(request):
+    """Create a recurring booking series without registration"""
+    result = BookingManager.create_booking_series(request.data)
+
+    if result['success']:
+        return Response(result, status=status.HTTP_201_CREATED)
+    else:
+        status_code = status.HTTP_400_BAD_REQUEST
+        if result.get('error_code') == 'TIME_CONFLICT':
+            status_code = status.HTTP_409_CONFLICT
+        elif result.get('error_code') == 'NOT_FOUND':
+            status_code = status.HTTP_404_NOT_FOUND
+
+        return Response(result, status=status_code)
+
+
+@api_view(['POST'])
+@permission_classes([permissions.AllowAny])
+def public_slot_hold(request):
+    """Temporarily hold a time slot while the customer completes the booking"""
+    result = BookingManager.hold_slot(request.data)
+
+    if result['success']:
+        return Response(result, status=status.HTTP_201_CREATED)
+    else:
+        status_code = status.HTTP_400_BAD_REQUEST
+        if result.get('error_code') in ('NOT_AVAILABLE', 'TIME_CONFLICT'):
+            status_code = status.HTTP_409_CONFLICT
+        elif result.get('error_code') == 'HOLD_ERROR':
+            status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
+
         return Response(result, status=status_code)
 
+
+@api_view(['POST'])
+@permission_classes([permissions.AllowAny])
+def public_slot_hold_release(request):
+    """Release a slot hold the customer no longer needs"""
+    hold_token = request.data.get('hold_token')
+
+    if not hold_token:
+        return Response({
+            'success': False,
+            'error': 'Hold token is required',
+            'error_code': 'MISSING_FIELDS'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    result = BookingManager.release_slot_hold(hold_token)
+
+    if result['success']:
+        return Response(result)
+    return Response(result, status=status.HTTP_404_NOT_FOUND)
+
+
+@api_view(['POST'])
+@permission_classes([permissions.AllowAny])
+def public_waitlist_join(request):
+    """Join the waitlist for a fully booked day"""
+    result = WaitlistManager.join_waitlist(request.data)
+
+    if result['success']:
+        return Response(result, status=status.HTTP_201_CREATED)
+    else:
+        status_code = status.HTTP_400_BAD_REQUEST
+        if result.get('error_code') == 'ALREADY_WAITING':
+            status_code = status.HTTP_409_CONFLICT
+        elif result.get('error_code') == 'WAITLIST_ERROR':
+            status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
+
+        return Response(result, status=status_code)
+
+
+@api_view(['POST'])
+@permission_classes([permissions.AllowAny])
+def public_waitlist_leave(request):
+    """Leave the waitlist using waitlist ID and phone verification"""
+    waitlist_id = request.data.get('waitlist_id')
+    phone_number = request.data.get('phone_number')
+
+    if not waitlist_id or not phone_number:
+        return Response({
+            'success': False,
+            'error': 'Waitlist ID and phone number are required',
+            'error_code': 'MISSING_FIELDS'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    result = WaitlistManager.leave_waitlist(waitlist_id, phone_number)
+
+    if result['success']:
+        return Response(result)
+    return Response(result, status=status.HTTP_404_NOT_FOUND)
+
 # New endpoints for enhanced functionality
 
 class CustomerListView(generics.ListAPIView):
@@ -441,168 +536,177 @@ class CustomerDetailView(generics.RetrieveAPIView):
         
         return Response(data)
 
+def _daily_revenue_trend(days):
+    """Completed bookings and revenue per day from daily stats rows"""
+    return [
+        {'appointment_date': day.date, 'revenue': day.revenue, 'bookings': day.completed_bookings}
+        for day in days if day.completed_bookings
+    ]
+
+def _build_business_analytics(business_profile, period, include_charts):
+    """Compute the analytics dashboard payload for a business"""
+    from utils.premium_analytics import PremiumAnalytics
+    
+    # Date range calculation
+    today = timezone.now().date()
+    if period == 'week':
+        start_date = today - timedelta(days=today.weekday())
+        end_date = start_date + timedelta(days=6)
+    elif period == 'month':
+        start_date = today.replace(day=1)
+        if start_date.month == 12:
+            end_date = start_date.replace(year=start_date.year + 1, month=1) - timedelta(days=1)
+        else:
+            end_date = start_date.replace(month=start_date.month + 1) - timedelta(days=1)
+    elif period == 'year':
+        start_date = today.replace(month=1, day=1)
+        end_date = today.replace(month=12, day=31)
+    else:
+        start_date = end_date = today
+    
+    # Comprehensive analytics
+    bookings = Booking.objects.filter(business=business_profile)
+    
+    # Counts, revenue and hours come from the daily rollup rows
+    stats = DailyStatsManager.summary(business_profile.id, start_date, end_date)
+    
+    # Revenue trends (by day/week/month)
+    if period == 'week':
+        revenue_trend = _daily_revenue_trend(stats['days'])
+    else:
+        months = {}
+        for day in stats['days']:
+            if day.completed_bookings:
+                month = months.setdefault(
+                    day.date.replace(day=1), {'period': day.date.replace(day=1), 'revenue': 0, 'bookings': 0}
+                )
+                month['revenue'] += day.revenue
+                month['bookings'] += day.completed_bookings
+        revenue_trend = list(months.values())
+    
+    # Service performance
+    service_performance = bookings.filter(
+        appointment_date__range=[start_date, end_date],
+        status='completed'
+    ).values('service__name').annotate(
+        revenue=Sum('total_price'),
+        bookings=Count('id'),
+        avg_rating=Avg('review__rating')
+    ).order_by('-revenue')
+    
+    # Customer insights
+    customer_insights = {
+        'new_customers': stats['new_customers'],
+        'repeat_rate': Customer.objects.filter(
+            booking__business=business_profile
+        ).annotate(
+            booking_count=Count('booking')
+        ).filter(booking_count__gt=1).count(),
+        'avg_bookings_per_customer': bookings.values('customer').annotate(
+            booking_count=Count('id')
+        ).aggregate(avg=Avg('booking_count'))['avg'] or 0
+    }
+    
+    # Peak hours analysis
+    peak_hours = sorted(
+        ({'hour': hour, 'count': count} for hour, count in enumerate(stats['hourly_bookings']) if count),
+        key=lambda row: -row['count']
+    )[:5]
+    
+    # Cancellation analysis
+    status_breakdown = {status: count for status, count in stats['status_counts'].items() if count}
+    total_period_bookings = stats['total_bookings']
+    cancellation_rate = 0
+    if total_period_bookings > 0:
+        cancellation_rate = (status_breakdown.get('cancelled', 0) / total_period_bookings) * 100
+    
+    analytics_data = {
+        'period': period,
+        'date_range': {'start': start_date, 'end': end_date},
+        'revenue_trend': revenue_trend,
+        'service_performance': list(service_performance),
+        'customer_insights': customer_insights,
+        'peak_hours': peak_hours,
+        'cancellation_rate': round(cancellation_rate, 2),
+        'status_breakdown': status_breakdown
+    }
+    
+    # Generate premium Plotly visualizations if requested
+    if include_charts:
+        try:
+            # Get booking data for heatmap
+            booking_data = list(bookings.filter(
+                appointment_date__range=[start_date, end_date]
+            ).values('appointment_date', 'status', 'total_price'))
+            
+            # Generate premium charts
+            analytics_data['activity_heatmap'] = PremiumAnalytics.generate_activity_heatmap(
+                booking_data, period
+            )
+            
+            analytics_data['revenue_chart'] = PremiumAnalytics.generate_revenue_chart(
+                list(revenue_trend), period
+            )
+            
+            analytics_data['service_performance_chart'] = PremiumAnalytics.generate_service_performance_chart(
+                list(service_performance)
+            )
+            
+            # Calculate growth metrics
+            if period != 'day':
+                # Get previous period data for comparison
+                if period == 'week':
+                    prev_start = start_date - timedelta(days=7)
+                    prev_end = start_date - timedelta(days=1)
+                elif period == 'month':
+                    if start_date.month == 1:
+                        prev_start = start_date.replace(year=start_date.year - 1, month=12, day=1)
+                        prev_end = start_date.replace(year=start_date.year - 1, month=12, day=31)
+                    else:
+                        prev_start = start_date.replace(month=start_date.month - 1, day=1)
+                        prev_end = start_date - timedelta(days=1)
+                else:  # year
+                    prev_start = start_date.replace(year=start_date.year - 1)
+                    prev_end = end_date.replace(year=end_date.year - 1)
+                
+                prev_revenue_trend = _daily_revenue_trend(
+                    DailyStatsManager.summary(business_profile.id, prev_start, prev_end)['days']
+                )
+                
+                analytics_data['growth_metrics'] = PremiumAnalytics.calculate_growth_metrics(
+                    list(revenue_trend), prev_revenue_trend
+                )
+            
+        except Exception as chart_error:
+            logger.error(f"Chart generation error: {str(chart_error)}")
+            # Don't fail the entire request if charts fail
+            analytics_data['chart_error'] = 'Chart generation temporarily unavailable'
+    
+    return analytics_data
+
+
 @api_view(['GET'])
 @permission_classes([IsBusinessOwner, IsVerifiedUser])
 def business_analytics(request):
     """Advanced business analytics endpoint with premium Plotly visualizations"""
     try:
-        from utils.premium_analytics import PremiumAnalytics
-        
         business_profile = request.user.business_profile
         period = request.query_params.get('period', 'month')
         include_charts = request.query_params.get('charts', 'true').lower() == 'true'
         
-        # Date range calculation
-        today = timezone.now().date()
-        if period == 'week':
-            start_date = today - timedelta(days=today.weekday())
-            end_date = start_date + timedelta(days=6)
-        elif period == 'month':
-            start_date = today.replace(day=1)
-            if start_date.month == 12:
-                end_date = start_date.replace(year=start_date.year + 1, month=1) - timedelta(days=1)
-            else:
-                end_date = start_date.replace(month=start_date.month + 1) - timedelta(days=1)
-        elif period == 'year':
-            start_date = today.replace(month=1, day=1)
-            end_date = today.replace(month=12, day=31)
-        else:
-            start_date = end_date = today
-        
-        # Comprehensive analytics
-        bookings = Booking.objects.filter(business=business_profile)
-        
-        # Revenue trends (by day/week/month)
-        if period == 'week':
-            revenue_trend = bookings.filter(
-                appointment_date__range=[start_date, end_date],
-                status='completed'
-            ).values('appointment_date').annotate(
-                revenue=Sum('total_price'),
-                bookings=Count('id')
-            ).order_by('appointment_date')
-        else:
-            revenue_trend = bookings.filter(
-                appointment_date__range=[start_date, end_date],
-                status='completed'
-            ).extra(
-                select={'period': "DATE_TRUNC('month', appointment_date)"}
-            ).values('period').annotate(
-                revenue=Sum('total_price'),
-                bookings=Count('id')
-            ).order_by('period')
-        
-        # Service performance
-        service_performance = bookings.filter(
-            appointment_date__range=[start_date, end_date],
-            status='completed'
-        ).values('service__name').annotate(
-            revenue=Sum('total_price'),
-            bookings=Count('id'),
-            avg_rating=Avg('review__rating')
-        ).order_by('-revenue')
-        
-        # Customer insights
-        customer_insights = {
-            'new_customers': Customer.objects.filter(
-                booking__business=business_profile,
-                created_at__range=[start_date, end_date]
-            ).distinct().count(),
-            'repeat_rate': Customer.objects.filter(
-                booking__business=business_profile
-            ).annotate(
-                booking_count=Count('booking')
-            ).filter(booking_count__gt=1).count(),
-            'avg_bookings_per_customer': bookings.values('customer').annotate(
-                booking_count=Count('id')
-            ).aggregate(avg=Avg('booking_count'))['avg'] or 0
-        }
-        
-        # Peak hours analysis
-        peak_hours = bookings.filter(
-            appointment_date__range=[start_date, end_date]
-        ).extra(
-            select={'hour': "EXTRACT(hour FROM appointment_time)"}
-        ).values('hour').annotate(
-            count=Count('id')
-        ).order_by('-count')[:5]
-        
-        # Cancellation analysis
-        cancellation_stats = bookings.filter(
-            appointment_date__range=[start_date, end_date]
-        ).values('status').annotate(count=Count('id'))
-        
-        total_period_bookings = sum(stat['count'] for stat in cancellation_stats)
-        cancellation_rate = 0
-        if total_period_bookings > 0:
-            cancelled = next((stat['count'] for stat in cancellation_stats if stat['status'] == 'cancelled'), 0)
-            cancellation_rate = (cancelled / total_period_bookings) * 100
-        
-        analytics_data = {
-            'period': period,
-            'date_range': {'start': start_date, 'end': end_date},
-            'revenue_trend': list(revenue_trend),
-            'service_performance': list(service_performance),
-            'customer_insights': customer_insights,
-            'peak_hours': list(peak_hours),
-            'cancellation_rate': round(cancellation_rate, 2),
-            'status_breakdown': {stat['status']: stat['count'] for stat in cancellation_stats}
-        }
-        
-        # Generate premium Plotly visualizations if requested
-        if include_charts:
-            try:
-                # Get booking data for heatmap
-                booking_data = list(bookings.filter(
-                    appointment_date__range=[start_date, end_date]
-                ).values('appointment_date', 'status', 'total_price'))
-                
-                # Generate premium charts
-                analytics_data['activity_heatmap'] = PremiumAnalytics.generate_activity_heatmap(
-                    booking_data, period
-                )
-                
-                analytics_data['revenue_chart'] = PremiumAnalytics.generate_revenue_chart(
-                    list(revenue_trend), period
-                )
-                
-                analytics_data['service_performance_chart'] = PremiumAnalytics.generate_service_performance_chart(
-                    list(service_performance)
-                )
-                
-                # Calculate growth metrics
-                if period != 'day':
-                    # Get previous period data for comparison
-                    if period == 'week':
-                        prev_start = start_date - timedelta(days=7)
-                        prev_end = start_date - timedelta(days=1)
-                    elif period == 'month':
-                        if start_date.month == 1:
-                            prev_start = start_date.replace(year=start_date.year - 1, month=12, day=1)
-                            prev_end = start_date.replace(year=start_date.year - 1, month=12, day=31)
-                        else:
-                            prev_start = start_date.replace(month=start_date.month - 1, day=1)
-                            prev_end = start_date - timedelta(days=1)
-                    else:  # year
-                        prev_start = start_date.replace(year=start_date.year - 1)
-                        prev_end = end_date.replace(year=end_date.year - 1)
-                    
-                    prev_revenue_trend = bookings.filter(
-                        appointment_date__range=[prev_start, prev_end],
-                        status='completed'
-                    ).values('appointment_date').annotate(
-                        revenue=Sum('total_price'),
-                        bookings=Count('id')
-                    ).order_by('appointment_date')
-                    
-                    analytics_data['growth_metrics'] = PremiumAnalytics.calculate_growth_metrics(
-                        list(revenue_trend), list(prev_revenue_trend)
-                    )
-                
-            except Exception as chart_error:
-                logger.error(f"Chart generation error: {str(chart_error)}")
-                # Don't fail the entire request if charts fail
-                analytics_data['chart_error'] = 'Chart generation temporarily unavailable'
+        # Served from cache: one worker rebuilds a stale dashboard in the
+        # background while the others keep serving the previous copy
+        cache_key = CacheManager.generate_key(
+            CacheManager.PREFIXES['analytics'],
+            business_profile.id,
+            f"dashboard:{period}:{int(include_charts)}:{timezone.now().date()}"
+        )
+        analytics_data = CacheManager.get_or_set(
+            cache_key,
+            lambda: _build_business_analytics(business_profile, period, include_charts),
+            'long',
+            soft_timeout='short'
+        )
         
         return Response(analytics_data)
         
@@ -640,7 +744,21 @@ def bulk_update_bookings(request):
             }, status=status.HTTP_400_BAD_REQUEST)
         
         # Perform bulk update
+        touched_dates = set(bookings.values_list('appointment_date', flat=True))
         updated_count = bookings.update(**update_data)
+        touched_dates.update(bookings.values_list('appointment_date', flat=True))
+        
+        # Bulk updates bypass Booking.save, so refresh the stored spans
+        if Booking.SPAN_FIELDS & set(update_data):
+            BookingManager.refresh_appointment_spans(bookings)
+        
+        # Bulk updates bypass model signals, so drop the occupancy index
+        OccupancyCacheManager.invalidate_business(request.user.business_profile.id)
+        CacheManager.invalidate_business_cache(request.user.business_profile.id)
+        BookingLookupCacheManager.invalidate_bookings(
+            bookings.values_list('booking_id', flat=True)
+        )
+        DailyStatsManager.rebuild_on_commit(request.user.business_profile.id, touched_dates)
         
         return Response({
             'message': f'{updated_count} bookings updated successfully',
@@ -654,6 +772,59 @@ def bulk_update_bookings(request):
             'error_code': 'BULK_UPDATE_ERROR'
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+@api_view(['POST'])
+@permission_classes([IsBusinessOwner, IsVerifiedUser])
+def import_bookings(request):
+    """Import existing bookings from an uploaded CSV/JSON file or a JSON list"""
+    upload = request.FILES.get('file')
+    rows = request.data.get('bookings') if upload is None else None
+    dry_run = str(request.data.get('dry_run', '')).lower() in ('1', 'true', 'yes')
+
+    if upload is None and not isinstance(rows, list):
+        return Response({
+            'error': 'Upload a file or provide a bookings list',
+            'error_code': 'MISSING_FIELDS'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        if upload is not None:
+            file_format = request.data.get('format') or upload.name.rsplit('.', 1)[-1].lower()
+            if file_format not in BookingImportManager.FORMATS:
+                return Response({
+                    'error': f'Unsupported import format: {file_format}',
+                    'error_code': 'INVALID_FORMAT'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            stream = io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')
+            rows = BookingImportManager.read_rows(stream, file_format)
+
+        report = BookingImportManager.import_bookings(
+            request.user.business_profile, rows, dry_run=dry_run
+        )
+
+        AuditLogger.log_security_event(
+            'BULK_OPERATION',
+            request.user.id,
+            RateLimiter.get_client_ip(request),
+            {
+                'resource': 'bookings',
+                'action': 'import',
+                'imported': report['imported'],
+                'failed': report['failed'],
+                'dry_run': dry_run
+            }
+        )
+
+        if not report['success']:
+            return Response(report, status=status.HTTP_400_BAD_REQUEST)
+        return Response(report)
+
+    except Exception as e:
+        logger.error(f"Booking import error: {str(e)}")
+        return Response({
+            'error': 'Booking import failed',
+            'error_code': 'IMPORT_ERROR'
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
 @api_view(['DELETE'])
 @permission_classes([IsBusinessOwner, IsVerifiedUser])
 def bulk_delete_services(request):
@@ -740,6 +911,12 @@ def bulk_update_services(request):
         
         # Perform bulk update
         updated_count = services.update(**sanitized_data)
+        CacheManager.invalidate_business_cache(request.user.business_profile.id)
+        
+        # Duration changes move the end of every booking of these services
+        if 'duration' in sanitized_data:
+            BookingManager.refresh_appointment_spans(Booking.objects.filter(service__in=services))
+            OccupancyCacheManager.invalidate_business(request.user.business_profile.id)
         
         # Log the bulk update action
         AuditLogger.log_security_event(
@@ -815,6 +992,24 @@ def public_available_slots(request, business_id, service_id):
     return Response(result)
 
 
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def public_available_slots_range(request, business_id, service_id):
+    """Get available time slots for every day in a date range"""
+    date_from = request.query_params.get('from')
+    date_to = request.query_params.get('to')
+    
+    if not date_from or not date_to:
+        return Response({
+            'success': False,
+            'error': 'from and to parameters are required (YYYY-MM-DD format)',
+            'error_code': 'MISSING_DATE_RANGE'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    result = BookingManager.get_available_slots_range(business_id, service_id, date_from, date_to)
+    return Response(result)
+
+
 @api_view(['GET'])
 @permission_classes([IsBusinessOwner, IsVerifiedUser])
 def subscription_status(request):
@@ -834,6 +1029,20 @@ def user_permissions(request):
     })
 
 
+@api_view(['GET', 'DELETE'])
+@permission_classes([IsAdminOrSuperAdmin])
+def cache_stats(request):
+    """Cache hits, misses and latencies per key prefix; DELETE resets the counters"""
+    if request.method == 'DELETE':
+        CacheMetrics.reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+    
+    return Response({
+        'prefixes': CacheMetrics.snapshot(),
+        'backend': CacheMetrics.backend_stats()
+    })
+
+
 @api_view(['POST'])
 @permission_classes([IsBusinessOwner, IsVerifiedUser])
 def mark_notification_read(request, notification_id):
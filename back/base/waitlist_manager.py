@@ -0,0 +1,256 @@
+# waitlist_manager.py - Waitlist for fully booked slots
+from django.db.models import Q
+from django.utils import timezone
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+import logging
+
+from .booking_manager import BookingManager
+
+logger = logging.getLogger(__name__)
+
+
+class WaitlistManager:
+    """
+    Waitlist that refills cancelled slots
+
+    Customers join with the window of start times they can make on a date.
+    When a booking is cancelled, the earliest matching waiter is found with
+    one lookup on the partial waiting index and offered the freed slot as a
+    slot hold that outlives a checkout hold. The customer books it by passing
+    the hold token like any other hold. Offers left unclaimed are passed on
+    to the next matching waiter by the expire_waitlist_offers command; the
+    waiter who let the offer lapse keeps their place for later cancellations.
+    """
+
+    OFFER_TIMEOUT = 900  # seconds
+
+    @classmethod
+    def join_waitlist(cls, waitlist_data: Dict) -> Dict:
+        """Add a customer to the waitlist of a service on a date"""
+        try:
+            required_fields = [
+                'business_id', 'service_id', 'customer_name', 'customer_phone',
+                'appointment_date', 'window_start', 'window_end'
+            ]
+            for field in required_fields:
+                if field not in waitlist_data or not waitlist_data[field]:
+                    return {
+                        'success': False,
+                        'error': f'Missing required field: {field}',
+                        'error_code': 'MISSING_FIELD'
+                    }
+
+            from .models import Service, Customer, WaitlistEntry
+            from accounts.models import BusinessProfile
+
+            phone = waitlist_data['customer_phone'].strip()
+            if not phone.startswith('+966') or len(phone) != 13:
+                return {
+                    'success': False,
+                    'error': 'Invalid phone number format. Use +966xxxxxxxxx',
+                    'error_code': 'INVALID_PHONE'
+                }
+
+            try:
+                business = BusinessProfile.objects.get(id=waitlist_data['business_id'], is_active=True)
+                service = Service.objects.get(
+                    id=waitlist_data['service_id'], business=business, is_active=True
+                )
+                date = datetime.strptime(waitlist_data['appointment_date'], '%Y-%m-%d').date()
+                window_start = datetime.strptime(waitlist_data['window_start'], '%H:%M').time()
+                window_end = datetime.strptime(waitlist_data['window_end'], '%H:%M').time()
+            except (BusinessProfile.DoesNotExist, Service.DoesNotExist, ValueError):
+                return {
+                    'success': False,
+                    'error': 'Invalid business, service, date or time window',
+                    'error_code': 'INVALID_REQUEST'
+                }
+
+            if window_start > window_end:
+                return {
+                    'success': False,
+                    'error': 'Window start must not be after window end',
+                    'error_code': 'INVALID_WINDOW'
+                }
+
+            if date < timezone.now().date():
+                return {
+                    'success': False,
+                    'error': 'Date must not be in the past',
+                    'error_code': 'PAST_APPOINTMENT'
+                }
+
+            customer, created = Customer.objects.get_or_create(
+                phone_number=phone,
+                name=waitlist_data['customer_name'].strip(),
+                defaults={
+                    'email': waitlist_data.get('customer_email', '').strip()
+                }
+            )
+
+            if WaitlistEntry.objects.filter(
+                customer=customer, service=service, date=date, status='waiting'
+            ).exists():
+                return {
+                    'success': False,
+                    'error': 'Already on the waitlist for this day',
+                    'error_code': 'ALREADY_WAITING'
+                }
+
+            entry = WaitlistEntry.objects.create(
+                business=business,
+                service=service,
+                customer=customer,
+                date=date,
+                window_start=window_start,
+                window_end=window_end
+            )
+
+            return {
+                'success': True,
+                'waitlist_id': str(entry.waitlist_id),
+                'message': 'You will be notified when a slot in your window frees up'
+            }
+
+        except Exception as e:
+            logger.error(f"Waitlist join failed: {str(e)}")
+            return {
+                'success': False,
+                'error': 'Failed to join the waitlist. Please try again.',
+                'error_code': 'WAITLIST_ERROR'
+            }
+
+    @classmethod
+    def leave_waitlist(cls, waitlist_id: str, phone_number: str) -> Dict:
+        """Leave the waitlist using waitlist ID and phone verification"""
+        from .models import WaitlistEntry
+        from .cache_manager import SlotHoldCacheManager
+
+        try:
+            entry = WaitlistEntry.objects.get(
+                waitlist_id=waitlist_id,
+                customer__phone_number=phone_number,
+                status='waiting'
+            )
+        except (WaitlistEntry.DoesNotExist, ValueError):
+            return {
+                'success': False,
+                'error': 'Waitlist entry not found',
+                'error_code': 'WAITLIST_NOT_FOUND'
+            }
+
+        entry.status = 'cancelled'
+        entry.save(update_fields=['status'])
+
+        # Hand an outstanding offer back to other customers
+        if entry.hold_token:
+            SlotHoldCacheManager.release(entry.hold_token)
+
+        return {'success': True, 'message': 'Removed from the waitlist'}
+
+    @classmethod
+    def offer_freed_slot(cls, booking) -> Optional[object]:
+        """
+        Offer the slot of a cancelled booking to the earliest matching waiter
+
+        Waiters already holding a live offer are skipped. Returns the offered
+        entry, or None when nobody matches or the slot is no longer free.
+        """
+        try:
+            return cls._offer_slot(
+                booking.business_id, booking.service_id,
+                booking.appointment_date, booking.appointment_time
+            )
+        except Exception as e:
+            logger.error(f"Waitlist offer failed for booking {booking.id}: {str(e)}")
+            return None
+
+    @classmethod
+    def reoffer_expired(cls) -> Dict:
+        """
+        Pass slots whose offer expired unclaimed on to the next matching waiter
+
+        Each expired offer is claimed by clearing its hold token, so
+        concurrent runs never re-offer it twice. Waiters already offered
+        the same slot are skipped so an unclaimed slot moves down the list.
+        """
+        from .models import WaitlistEntry
+        from .cache_manager import SlotHoldCacheManager
+
+        report = {'expired': 0, 'reoffered': 0}
+        expired = list(WaitlistEntry.objects.filter(
+            status='waiting',
+            offer_expires_at__lte=timezone.now(),
+            date__gte=timezone.localdate()
+        ).exclude(hold_token='').order_by('offer_expires_at'))
+
+        for entry in expired:
+            if not WaitlistEntry.objects.filter(
+                id=entry.id, hold_token=entry.hold_token, status='waiting'
+            ).update(hold_token=''):
+                continue
+            report['expired'] += 1
+            SlotHoldCacheManager.release(entry.hold_token)
+
+            try:
+                if cls._offer_slot(
+                    entry.business_id, entry.service_id, entry.date, entry.offered_time,
+                    skip_offered=True
+                ):
+                    report['reoffered'] += 1
+            except Exception as e:
+                logger.error(f"Waitlist re-offer failed for entry {entry.waitlist_id}: {str(e)}")
+
+        return report
+
+    @classmethod
+    def _offer_slot(cls, business_id, service_id, date, slot_time, skip_offered=False):
+        """Hold a slot for the earliest matching waiter and notify them"""
+        from .models import WaitlistEntry
+
+        now = timezone.now()
+        entries = WaitlistEntry.objects.select_related(
+            'business__user', 'service', 'customer'
+        ).filter(
+            Q(offer_expires_at__isnull=True) | Q(offer_expires_at__lte=now),
+            business_id=business_id,
+            service_id=service_id,
+            date=date,
+            status='waiting',
+            window_start__lte=slot_time,
+            window_end__gte=slot_time
+        )
+        if skip_offered:
+            entries = entries.exclude(offered_time=slot_time)
+
+        entry = entries.order_by('created_at').first()
+        if not entry:
+            return None
+
+        hold = BookingManager.hold_slot({
+            'business_id': entry.business_id,
+            'service_id': entry.service_id,
+            'appointment_date': entry.date,
+            'appointment_time': slot_time
+        }, timeout=cls.OFFER_TIMEOUT)
+        if not hold['success']:
+            return None
+
+        entry.hold_token = hold['hold_token']
+        entry.offered_time = slot_time
+        entry.offer_expires_at = now + timedelta(seconds=cls.OFFER_TIMEOUT)
+        entry.save(update_fields=['hold_token', 'offered_time', 'offer_expires_at'])
+
+        cls._send_offer_notification(entry)
+        return entry
+
+    @classmethod
+    def _send_offer_notification(cls, entry):
+        """Tell the waiter a slot is held for them"""
+        try:
+            from utils.notification_manager import NotificationManager
+
+            NotificationManager.send_waitlist_offer(entry, cls.OFFER_TIMEOUT // 60)
+        except Exception as e:
+            logger.error(f"Failed to send waitlist offer: {str(e)}")
@@ -0,0 +1,122 @@
+# warmup_manager.py - Precompute hot caches before the morning rush
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from django.db import connection
+from django.db.models import Count, Q
+from django.utils import timezone
+from typing import Dict, List
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class WarmupManager:
+    """
+    Warm the caches owners and customers hit first when a business opens
+
+    For every active business the dashboard snapshot, the analytics
+    summaries for ANALYTICS_PERIODS and the schedule and occupancy behind
+    today's and tomorrow's availability are built ahead of time. Businesses
+    are processed busiest first, in batches shared by a pool of threads, and
+    no new batch starts once the run's time budget is spent.
+    """
+
+    BATCH_SIZE = 50
+    WORKERS = 4
+    TIME_BUDGET = 300  # seconds
+    ANALYTICS_PERIODS = ('today', 'week', 'month')
+    AVAILABILITY_DAYS = 2  # today and tomorrow
+
+    @classmethod
+    def active_businesses(cls, business_ids: List[int] = None) -> List:
+        """Active businesses, those with the most bookings in the warmed window first"""
+        from accounts.models import BusinessProfile
+
+        today = timezone.now().date()
+        businesses = BusinessProfile.objects.filter(
+            is_active=True, user__is_active=True
+        ).select_related('user').annotate(
+            upcoming=Count('booking', filter=Q(
+                booking__appointment_date__range=[today, today + timedelta(days=cls.AVAILABILITY_DAYS - 1)]
+            ))
+        ).order_by('-upcoming', 'id')
+
+        if business_ids:
+            businesses = businesses.filter(id__in=business_ids)
+        return list(businesses)
+
+    @classmethod
+    def warm_business(cls, business) -> List[str]:
+        """Warm every cache of one business, returning the parts that failed"""
+        from .booking_manager import BookingManager
+        from .cache_manager import DatabaseOptimizer
+        from .dashboard_manager import DashboardManager
+
+        today = timezone.now().date()
+        steps = {
+            'dashboard': lambda: DashboardManager.get_dashboard(business, background=False),
+            'analytics': lambda: [
+                DatabaseOptimizer.optimize_analytics_queries(business.id, period)
+                for period in cls.ANALYTICS_PERIODS
+            ],
+            'availability': lambda: BookingManager.warm_availability(
+                business, today, today + timedelta(days=cls.AVAILABILITY_DAYS - 1)
+            ),
+        }
+
+        failed = []
+        for name, step in steps.items():
+            try:
+                step()
+            except Exception as e:
+                logger.error(f"Cache warmup of {name} failed for business {business.id}: {str(e)}")
+                failed.append(name)
+        return failed
+
+    @classmethod
+    def run(cls, batch_size: int = None, workers: int = None, time_budget: float = None,
+            business_ids: List[int] = None) -> Dict:
+        """
+        Warm all active businesses within a time budget
+
+        Returns how many businesses were warmed, how many had a failing part
+        and how many were left for the next run when the budget ran out.
+        """
+        batch_size = batch_size or cls.BATCH_SIZE
+        workers = workers or cls.WORKERS
+        time_budget = cls.TIME_BUDGET if time_budget is None else time_budget
+
+        started = time.monotonic()
+        businesses = cls.active_businesses(business_ids)
+        report = {'businesses': len(businesses), 'warmed': 0, 'failed': 0, 'skipped': 0}
+
+        for offset in range(0, len(businesses), batch_size):
+            if time.monotonic() - started >= time_budget:
+                report['skipped'] = len(businesses) - offset
+                logger.warning(
+                    f"Cache warmup stopped after {time_budget} seconds, "
+                    f"{report['skipped']} businesses left cold"
+                )
+                break
+
+            batch = businesses[offset:offset + batch_size]
+            if workers > 1:
+                with ThreadPoolExecutor(max_workers=workers) as pool:
+                    results = list(pool.map(cls._warm_in_thread, batch))
+            else:
+                results = [cls.warm_business(business) for business in batch]
+
+            for failed in results:
+                report['failed' if failed else 'warmed'] += 1
+
+        report['duration'] = time.monotonic() - started
+        return report
+
+    @classmethod
+    def _warm_in_thread(cls, business) -> List[str]:
+        """Warm one business from a pool thread, with its own connection"""
+        try:
+            return cls.warm_business(business)
+        finally:
+            connection.close()
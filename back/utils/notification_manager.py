@@ -41,6 +41,18 @@ class NotificationManager:
             'ar': 'حجز جديد! 🎉\nالعميل: {customer_name}\nالخدمة: {service_name}\nالموعد: {date} - {time}\nالمبلغ: {price} ريال\nرقم الحجز: {booking_id}',
             'en': 'New booking! 🎉\nCustomer: {customer_name}\nService: {service_name}\nAppointment: {date} - {time}\nAmount: {price} SAR\nBooking ID: {booking_id}'
         },
+        'series_confirmation': {
+            'ar': 'مرحباً {customer_name}، تم تأكيد {count} مواعيد متكررة في {business_name} الساعة {time} من {first_date} إلى {last_date}. خدمة: {service_name}. رقم السلسلة: {series_id}',
+            'en': 'Hello {customer_name}, {count} recurring appointments at {business_name} are confirmed at {time} from {first_date} to {last_date}. Service: {service_name}. Series ID: {series_id}'
+        },
+        'new_series_business': {
+            'ar': 'حجوزات متكررة جديدة! 🎉\nالعميل: {customer_name}\nالخدمة: {service_name}\nعدد المواعيد: {count}\nمن {first_date} إلى {last_date} - {time}\nرقم السلسلة: {series_id}',
+            'en': 'New recurring bookings! 🎉\nCustomer: {customer_name}\nService: {service_name}\nAppointments: {count}\nFrom {first_date} to {last_date} - {time}\nSeries ID: {series_id}'
+        },
+        'waitlist_offer': {
+            'ar': 'مرحباً {customer_name}، توفر موعد في {business_name} يوم {date} الساعة {time}. خدمة: {service_name}. الموعد محجوز لك لمدة {minutes} دقيقة، أكمل الحجز برمز: {hold_token}',
+            'en': 'Hello {customer_name}, a slot opened up at {business_name} on {date} at {time}. Service: {service_name}. It is held for you for {minutes} minutes; complete your booking with code: {hold_token}'
+        },
         'booking_cancelled': {
             'ar': 'تم إلغاء حجزك في {business_name}. الخدمة: {service_name}. الموعد: {date} - {time}. سبب الإلغاء: {reason}',
             'en': 'Your booking at {business_name} has been cancelled. Service: {service_name}. Appointment: {date} - {time}. Reason: {reason}'
@@ -55,8 +67,6 @@ class NotificationManager:
     def send_booking_confirmation(cls, booking, language='ar') -> bool:
         """Send booking confirmation to customer"""
         try:
-            from .whatsapp import send_whatsapp_message
-            
             template = cls.TEMPLATES['booking_confirmation'][language]
             message = template.format(
                 customer_name=booking.customer.name,
@@ -68,7 +78,18 @@ class NotificationManager:
                 booking_id=booking.booking_id
             )
             
-            result = send_whatsapp_message(
+            # Create notification record
+            notification = cls._create_notification(
+                user=None,
+                customer=booking.customer,
+                notification_type='booking_confirmation',
+                title='Booking Confirmation' if language == 'en' else 'تأكيد الحجز',
+                message=message
+            )
+            
+            return cls._queue_whatsapp(
+                f"booking_confirmation:{booking.booking_id}",
+                notification,
                 booking.customer.phone_number,
                 'booking_confirmation',
                 booking_details={
@@ -80,18 +101,6 @@ class NotificationManager:
                 }
             )
             
-            # Create notification record
-            cls._create_notification(
-                user=None,
-                customer=booking.customer,
-                notification_type='booking_confirmation',
-                title='Booking Confirmation' if language == 'en' else 'تأكيد الحجز',
-                message=message,
-                sent_via_whatsapp=result.get('success', False)
-            )
-            
-            return result.get('success', False)
-            
         except Exception as e:
             logger.error(f"Failed to send booking confirmation: {str(e)}")
             return False
@@ -147,29 +156,23 @@ class NotificationManager:
         """Send daily summary to business owner"""
         try:
             from .whatsapp import send_whatsapp_message
-            from base.models import Booking, Review
-            from django.db.models import Sum, Avg
-            
-            today = timezone.now().date()
+            from base.daily_stats_manager import DailyStatsManager
+            from base.models import Review
+            from django.db.models import Avg
             
-            # Get today's bookings
-            today_bookings = Booking.objects.filter(
-                business=business_user.business_profile,
-                appointment_date=today
-            )
+            today = timezone.localdate()
+            business_id = business_user.business_profile.id
             
-            # Get upcoming bookings (next 3 days)
-            upcoming_bookings = Booking.objects.filter(
-                business=business_user.business_profile,
-                appointment_date__gt=today,
-                appointment_date__lte=today + timedelta(days=3),
-                status__in=['pending', 'confirmed']
-            )
+            # Today's bookings and revenue, from the daily rollup rows
+            today_stats = DailyStatsManager.summary(business_id, today, today)
+            today_bookings = today_stats['total_bookings']
+            revenue = today_stats['revenue']
             
-            # Calculate revenue
-            revenue = today_bookings.filter(status='completed').aggregate(
-                total=Sum('total_price')
-            )['total'] or 0
+            # Upcoming bookings (next 3 days)
+            upcoming_counts = DailyStatsManager.summary(
+                business_id, today + timedelta(days=1), today + timedelta(days=3)
+            )['status_counts']
+            upcoming_count = upcoming_counts['pending'] + upcoming_counts['confirmed']
             
             # Get average rating
             rating = Review.objects.filter(
@@ -179,8 +182,8 @@ class NotificationManager:
             template = cls.TEMPLATES['business_daily_summary'][language]
             message = template.format(
                 business_name=business_user.business_name,
-                today_bookings=today_bookings.count(),
-                upcoming_count=upcoming_bookings.count(),
+                today_bookings=today_bookings,
+                upcoming_count=upcoming_count,
                 revenue=revenue,
                 rating=round(rating, 1)
             )
@@ -189,8 +192,8 @@ class NotificationManager:
                 business_user.phone_number,
                 'business_summary',
                 summary_data={
-                    'today_bookings': today_bookings.count(),
-                    'upcoming_count': upcoming_bookings.count(),
+                    'today_bookings': today_bookings,
+                    'upcoming_count': upcoming_count,
                     'revenue': str(revenue),
                     'rating': str(round(rating, 1))
                 }
@@ -258,8 +261,6 @@ class NotificationManager:
     def send_new_booking_notification(cls, booking, language='ar') -> bool:
         """Notify business owner of new booking"""
         try:
-            from .whatsapp import send_whatsapp_message
-            
             template = cls.TEMPLATES['new_booking_business'][language]
             message = template.format(
                 customer_name=booking.customer.name,
@@ -270,7 +271,17 @@ class NotificationManager:
                 booking_id=booking.booking_id
             )
             
-            result = send_whatsapp_message(
+            notification = cls._create_notification(
+                user=booking.business.user,
+                customer=None,
+                notification_type='new_booking',
+                title='New Booking' if language == 'en' else 'حجز جديد',
+                message=message
+            )
+            
+            return cls._queue_whatsapp(
+                f"new_booking:{booking.booking_id}",
+                notification,
                 booking.business.user.phone_number,
                 'new_booking',
                 booking_details={
@@ -282,19 +293,132 @@ class NotificationManager:
                 }
             )
             
-            cls._create_notification(
-                user=booking.business.user,
+        except Exception as e:
+            logger.error(f"Failed to send new booking notification: {str(e)}")
+            return False
+    
+    @classmethod
+    def _series_message(cls, template_name, series, bookings, language):
+        """Format a series summary message"""
+        template = cls.TEMPLATES[template_name][language]
+        return template.format(
+            customer_name=series.customer.name,
+            business_name=series.business.user.business_name,
+            service_name=series.service.name_ar if language == 'ar' else series.service.name,
+            count=len(bookings),
+            first_date=bookings[0].appointment_date.strftime('%Y-%m-%d'),
+            last_date=bookings[-1].appointment_date.strftime('%Y-%m-%d'),
+            time=series.appointment_time.strftime('%H:%M'),
+            series_id=series.series_id
+        )
+    
+    @classmethod
+    def send_series_confirmation(cls, series, bookings, language='ar') -> bool:
+        """Send one confirmation covering every booking of a recurring series"""
+        try:
+            message = cls._series_message('series_confirmation', series, bookings, language)
+            
+            notification = cls._create_notification(
+                user=None,
+                customer=series.customer,
+                notification_type='booking_confirmation',
+                title='Booking Confirmation' if language == 'en' else 'تأكيد الحجز',
+                message=message
+            )
+            
+            return cls._queue_whatsapp(
+                f"series_confirmation:{series.series_id}",
+                notification,
+                series.customer.phone_number,
+                'booking_confirmation',
+                booking_details={
+                    'business_name': series.business.user.business_name,
+                    'service_name': series.service.name_ar if language == 'ar' else series.service.name,
+                    'appointment_date': (
+                        f"{bookings[0].appointment_date.strftime('%Y-%m-%d')} - "
+                        f"{bookings[-1].appointment_date.strftime('%Y-%m-%d')} ({len(bookings)})"
+                    ),
+                    'appointment_time': series.appointment_time.strftime('%H:%M'),
+                    'total_price': str(sum(booking.total_price for booking in bookings))
+                }
+            )
+            
+        except Exception as e:
+            logger.error(f"Failed to send series confirmation: {str(e)}")
+            return False
+    
+    @classmethod
+    def send_new_series_notification(cls, series, bookings, language='ar') -> bool:
+        """Notify business owner of a new recurring series with one message"""
+        try:
+            message = cls._series_message('new_series_business', series, bookings, language)
+            
+            notification = cls._create_notification(
+                user=series.business.user,
                 customer=None,
                 notification_type='new_booking',
                 title='New Booking' if language == 'en' else 'حجز جديد',
-                message=message,
-                sent_via_whatsapp=result.get('success', False)
+                message=message
             )
             
-            return result.get('success', False)
+            return cls._queue_whatsapp(
+                f"new_series:{series.series_id}",
+                notification,
+                series.business.user.phone_number,
+                'new_booking',
+                booking_details={
+                    'customer_name': series.customer.name,
+                    'service_name': series.service.name_ar if language == 'ar' else series.service.name,
+                    'appointment_date': bookings[0].appointment_date.strftime('%Y-%m-%d'),
+                    'appointment_time': series.appointment_time.strftime('%H:%M'),
+                    'occurrences': len(bookings)
+                }
+            )
             
         except Exception as e:
-            logger.error(f"Failed to send new booking notification: {str(e)}")
+            logger.error(f"Failed to send new series notification: {str(e)}")
+            return False
+    
+    @classmethod
+    def send_waitlist_offer(cls, entry, minutes, language='ar') -> bool:
+        """Offer a freed slot held for a waitlisted customer"""
+        try:
+            template = cls.TEMPLATES['waitlist_offer'][language]
+            message = template.format(
+                customer_name=entry.customer.name,
+                business_name=entry.business.user.business_name,
+                date=entry.date.strftime('%Y-%m-%d'),
+                time=entry.offered_time.strftime('%H:%M'),
+                service_name=entry.service.name_ar if language == 'ar' else entry.service.name,
+                minutes=minutes,
+                hold_token=entry.hold_token
+            )
+            
+            notification = cls._create_notification(
+                user=None,
+                customer=entry.customer,
+                notification_type='waitlist_offer',
+                title='Slot Available' if language == 'en' else 'موعد متاح',
+                message=message
+            )
+            
+            return cls._queue_whatsapp(
+                f"waitlist_offer:{entry.waitlist_id}:{entry.hold_token}",
+                notification,
+                entry.customer.phone_number,
+                'waitlist_offer',
+                offer_details={
+                    'business_name': entry.business.user.business_name,
+                    'service_name': entry.service.name_ar if language == 'ar' else entry.service.name,
+                    'appointment_date': entry.date.strftime('%Y-%m-%d'),
+                    'appointment_time': entry.offered_time.strftime('%H:%M'),
+                    'minutes': minutes,
+                    'hold_token': entry.hold_token
+                }
+            )
+            
+        except Exception as e:
+            logger.error(f"Failed to send waitlist offer: {str(e)}")
             return False
     
     @classmethod
@@ -304,7 +428,7 @@ class NotificationManager:
         try:
             from base.models import Notification
             
-            Notification.objects.create(
+            return Notification.objects.create(
                 user=user,
                 customer=customer,
                 notification_type=notification_type,
@@ -314,6 +438,28 @@ class NotificationManager:
             )
         except Exception as e:
             logger.error(f"Failed to create notification record: {str(e)}")
+            return None
+    
+    @classmethod
+    def _queue_whatsapp(cls, dedup_key, notification, phone_number, message_type, **kwargs) -> bool:
+        """
+        Queue a WhatsApp message in the outbox
+        
+        The message is written in the caller's transaction and sent by the
+        outbox worker after commit, which also flags the notification record
+        as sent via WhatsApp once delivery succeeds.
+        """
+        from base.outbox_manager import OutboxManager
+        
+        return OutboxManager.enqueue(
+            dedup_key,
+            {
+                'phone_number': phone_number,
+                'message_type': message_type,
+                'kwargs': kwargs,
+            },
+            notification_id=notification.id if notification else None
+        )
     
     @classmethod
     def get_pending_reminders(cls):
@@ -1,7 +1,7 @@
 import secrets
 import logging
-from django.core.cache import cache
 from django.conf import settings
+from base.cache_manager import CacheManager
 from datetime import datetime, timedelta
 
 logger = logging.getLogger(__name__)
@@ -29,8 +29,8 @@ class OTPService:
             dict: Status and message
         """
         # Check rate limiting
-        rate_limit_key = f'otp_requests_{phone_number}'
-        request_count = cache.get(rate_limit_key, 0)
+        rate_limit_key = f'otp:requests:{phone_number}'
+        request_count = CacheManager.get(rate_limit_key, 0)
         
         if request_count >= cls.MAX_OTP_REQUESTS:
             return {
@@ -43,14 +43,14 @@ class OTPService:
         otp = cls.generate_secure_otp()
         
         # Store OTP with expiration
-        otp_key = f'otp_{phone_number}'
-        attempts_key = f'otp_attempts_{phone_number}'
+        otp_key = f'otp:code:{phone_number}'
+        attempts_key = f'otp:attempts:{phone_number}'
         
-        cache.set(otp_key, otp, timeout=cls.OTP_EXPIRY)
-        cache.set(attempts_key, 0, timeout=cls.OTP_EXPIRY)
+        CacheManager.set(otp_key, otp, cls.OTP_EXPIRY)
+        CacheManager.set(attempts_key, 0, cls.OTP_EXPIRY)
         
         # Update rate limiting
-        cache.set(rate_limit_key, request_count + 1, timeout=cls.RATE_LIMIT_WINDOW)
+        CacheManager.set(rate_limit_key, request_count + 1, cls.RATE_LIMIT_WINDOW)
         
         # Log OTP for development and testing (completely free)
         logger.info(f"OTP for {phone_number}: {otp}")
@@ -70,11 +70,11 @@ class OTPService:
         Returns:
             dict: Verification result
         """
-        otp_key = f'otp_{phone_number}'
-        attempts_key = f'otp_attempts_{phone_number}'
+        otp_key = f'otp:code:{phone_number}'
+        attempts_key = f'otp:attempts:{phone_number}'
         
         # Check if OTP exists
-        stored_otp = cache.get(otp_key)
+        stored_otp = CacheManager.get(otp_key)
         if not stored_otp:
             return {
                 'success': False,
@@ -83,11 +83,11 @@ class OTPService:
             }
         
         # Check attempt count
-        attempts = cache.get(attempts_key, 0)
+        attempts = CacheManager.get(attempts_key, 0)
         if attempts >= cls.MAX_ATTEMPTS:
             # Clear OTP after max attempts
-            cache.delete(otp_key)
-            cache.delete(attempts_key)
+            CacheManager.delete(otp_key)
+            CacheManager.delete(attempts_key)
             return {
                 'success': False,
                 'message': 'Maximum OTP attempts exceeded',
@@ -97,15 +97,15 @@ class OTPService:
         # Verify OTP
         if provided_otp == stored_otp:
             # Clear OTP after successful verification
-            cache.delete(otp_key)
-            cache.delete(attempts_key)
+            CacheManager.delete(otp_key)
+            CacheManager.delete(attempts_key)
             return {
                 'success': True,
                 'message': 'OTP verified successfully'
             }
         else:
             # Increment attempt count
-            cache.set(attempts_key, attempts + 1, timeout=cls.OTP_EXPIRY)
+            CacheManager.set(attempts_key, attempts + 1, cls.OTP_EXPIRY)
             remaining_attempts = cls.MAX_ATTEMPTS - (attempts + 1)
             
             return {
@@ -118,8 +118,8 @@ class OTPService:
     @classmethod
     def clear_otp(cls, phone_number: str) -> None:
         """Clear OTP data for phone number"""
-        otp_key = f'otp_{phone_number}'
-        attempts_key = f'otp_attempts_{phone_number}'
+        otp_key = f'otp:code:{phone_number}'
+        attempts_key = f'otp:attempts:{phone_number}'
         
-        cache.delete(otp_key)
-        cache.delete(attempts_key)
\ No newline at end of file
+        CacheManager.delete(otp_key)
+        CacheManager.delete(attempts_key)
\ No newline at end of file
@@ -15,7 +15,7 @@ import json
 from datetime import datetime, timedelta
 from django.utils import timezone
 from django.db.models import Count, Sum, Avg, Q
-from django.core.cache import cache
+from base.cache_manager import CacheManager
 import hashlib
 import logging
 
@@ -61,12 +61,12 @@ class PremiumAnalytics:
     @classmethod
     def _cache_chart(cls, key: str, chart_html: str, timeout: int = 3600):
         """Cache chart HTML with timeout"""
-        cache.set(key, chart_html, timeout)
+        CacheManager.set(key, chart_html, timeout)
     
     @classmethod
     def _get_cached_chart(cls, key: str) -> str:
         """Retrieve cached chart HTML"""
-        return cache.get(key)
+        return CacheManager.get(key)
     
     @classmethod
     def prepare_dataframe(cls, queryset, date_field='created_at', value_field=None):
@@ -106,7 +106,8 @@ class WhatsAppService:
         if not self.api_url or not self.access_token:
             return {
                 'success': False,
-                'message': 'WhatsApp service not available'
+                'message': 'WhatsApp service not available',
+                'error_code': 'SERVICE_UNAVAILABLE'
             }
         
         formatted_phone = phone_number.replace('+', '')
@@ -148,11 +149,75 @@ class WhatsAppService:
                 return {'success': True, 'message': 'Confirmation sent'}
             else:
                 logger.error(f"WhatsApp API error: {response.status_code}")
-                return {'success': False, 'message': 'Failed to send confirmation'}
+                return {'success': False, 'message': 'Failed to send confirmation', 'error_code': 'WHATSAPP_API_ERROR'}
+                
+        except requests.exceptions.RequestException as e:
+            logger.error(f"WhatsApp API request failed: {str(e)}")
+            return {'success': False, 'message': 'Network error', 'error_code': 'NETWORK_ERROR'}
+    
+    def send_waitlist_offer(self, phone_number: str, offer_details: dict) -> dict:
+        """
+        Send a waitlist slot offer via WhatsApp
+        
+        Args:
+            phone_number: Customer phone number
+            offer_details: Offered slot and the hold token to book it with
+            
+        Returns:
+            dict: API response status
+        """
+        if not self.api_url or not self.access_token:
+            return {
+                'success': False,
+                'message': 'WhatsApp service not available',
+                'error_code': 'SERVICE_UNAVAILABLE'
+            }
+        
+        formatted_phone = phone_number.replace('+', '')
+        
+        message_data = {
+            "messaging_product": "whatsapp",
+            "to": formatted_phone,
+            "type": "template",
+            "template": {
+                "name": "waitlist_offer",
+                "language": {
+                    "code": "ar"
+                },
+                "components": [
+                    {
+                        "type": "body",
+                        "parameters": [
+                            {"type": "text", "text": offer_details.get('business_name', '')},
+                            {"type": "text", "text": offer_details.get('service_name', '')},
+                            {"type": "text", "text": offer_details.get('appointment_date', '')},
+                            {"type": "text", "text": offer_details.get('appointment_time', '')},
+                            {"type": "text", "text": str(offer_details.get('minutes', ''))},
+                            {"type": "text", "text": offer_details.get('hold_token', '')}
+                        ]
+                    }
+                ]
+            }
+        }
+        
+        try:
+            response = requests.post(
+                f"{self.api_url}/messages",
+                headers=self.headers,
+                json=message_data,
+                timeout=30
+            )
+            
+            if response.status_code == 200:
+                logger.info(f"Waitlist offer sent to {phone_number}")
+                return {'success': True, 'message': 'Offer sent'}
+            else:
+                logger.error(f"WhatsApp API error: {response.status_code}")
+                return {'success': False, 'message': 'Failed to send offer', 'error_code': 'WHATSAPP_API_ERROR'}
                 
         except requests.exceptions.RequestException as e:
             logger.error(f"WhatsApp API request failed: {str(e)}")
-            return {'success': False, 'message': 'Network error'}
+            return {'success': False, 'message': 'Network error', 'error_code': 'NETWORK_ERROR'}
 
 
 def send_whatsapp_message(phone_number: str, message_type: str, **kwargs) -> dict:
@@ -161,7 +226,7 @@ def send_whatsapp_message(phone_number: str, message_type: str, **kwargs) -> dic
     
     Args:
         phone_number: Recipient phone number
-        message_type: Type of message (otp, booking_confirmation, etc.)
+        message_type: Type of message (otp, booking_confirmation, waitlist_offer, etc.)
         **kwargs: Additional message parameters
         
     Returns:
@@ -173,8 +238,11 @@ def send_whatsapp_message(phone_number: str, message_type: str, **kwargs) -> dic
         return service.send_otp_message(phone_number, kwargs.get('otp'))
     elif message_type == 'booking_confirmation':
         return service.send_booking_confirmation(phone_number, kwargs.get('booking_details', {}))
+    elif message_type == 'waitlist_offer':
+        return service.send_waitlist_offer(phone_number, kwargs.get('offer_details', {}))
     else:
         return {
             'success': False,
-            'message': f'Unknown message type: {message_type}'
+            'message': f'Unknown message type: {message_type}',
+            'error_code': 'UNKNOWN_MESSAGE_TYPE'
         }
\ No newline at end of file